@@ -0,0 +1,216 @@
+# Benchmarks of the analysis pipeline at increasing element counts.
+#
+#   python benchmark/benchmarks.py                        run and print results
+#   python benchmark/benchmarks.py -o results.json        also write results as JSON
+#   python benchmark/benchmarks.py --save-baseline        store results as the regression baseline
+#   python benchmark/benchmarks.py --check                compare against the baseline, exit 1 on regression
+#
+# Every benchmark is timed as the best of a few runs, and then run once more under
+# tracemalloc for its peak memory (Python and numpy allocations).
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from structural.analysis import LinearAnalysis
+from structural.constraints import Constraints
+from structural.elements import Node, BeamFiniteElement
+from structural.loads import add_udl, add_linear_load, add_point_load, add_nodal_profile_load
+from structural.matrices import get_cumulative_discrete_lengths, get_discrete_points, assemble_global_matrix, \
+    set_nodal_boundary_conditions, solve_global_system, compute_element_results, get_element_results, \
+    get_empty_load_matrix, set_udl_between_nodes
+from structural.mesh import BeamMesh
+
+SIZES = [100, 1000, 10000, 100000, 1000000]
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DENSE_LIMIT = 2000  # largest element count for dense matrices, (2n)^2 floats
+OBJECT_LIMIT = 1000000  # largest element count for lists of element objects
+
+
+def get_points(_num_elements):
+    """Returns wall points meshed into about _num_elements elements of 1 cm."""
+    return [0, 0.25 * _num_elements / 100, 0.5 * _num_elements / 100, _num_elements / 100]
+
+
+def get_mesh(_num_elements):
+    return BeamMesh.from_discrete_points(0.01, get_points(_num_elements))
+
+
+def get_elements(_num_elements):
+    _points = get_cumulative_discrete_lengths(0.01, get_points(_num_elements))
+    _nodes = [Node(i, 0, _point) for i, _point in enumerate(_points)]
+    return [BeamFiniteElement(i, _nodes[i], _nodes[i + 1]) for i in range(0, len(_nodes) - 1)]
+
+
+def set_supports(_matrix, _loads, _num_nodes):
+    """Pins both ends of a beam."""
+    _matrix, _loads = set_nodal_boundary_conditions(0, _matrix, _loads, _condition="pinned")
+    return set_nodal_boundary_conditions(_num_nodes - 1, _matrix, _loads, _condition="pinned")
+
+
+def get_constrained(_mesh, _storage):
+    """Returns the constrained global matrix and load vector of a beam under a UDL."""
+    _loads = add_udl(-10, 0, _mesh.y[-1], _mesh, get_empty_load_matrix(_mesh.num_nodes))
+    return set_supports(assemble_global_matrix(_mesh, _storage=_storage), _loads, _mesh.num_nodes)
+
+
+def get_propped_constraints(_mesh, _num_props=10):
+    """Returns Constraints of a beam pinned at both ends, with props at equal spacing in between."""
+    _constraints = Constraints(_mesh.num_nodes).add_support([0, _mesh.num_nodes - 1], "pinned")
+    for _depth in np.linspace(0, _mesh.y[-1], _num_props + 2)[1:-1]:
+        _constraints.add_prop(_mesh, _depth, 1e8)
+    return _constraints
+
+
+def solve_propped(_mesh, _constraints, _storage):
+    """Assembles, constrains, factorises and solves a propped beam under a UDL."""
+    _loads = add_udl(-10, 0, _mesh.y[-1], _mesh, get_empty_load_matrix(_mesh.num_nodes))
+    return LinearAnalysis(_mesh, [], _storage, _constraints).solve(_loads)
+
+
+# name: (setup(n) returning the arguments of run, run, largest element count)
+BENCHMARKS = {
+    "discrete_lengths": (lambda n: (0.01, get_points(n)), get_cumulative_discrete_lengths, None),
+    "discrete_points": (lambda n: (0.01, get_points(n)), get_discrete_points, None),
+    "mesh": (lambda n: (0.01, get_points(n)), BeamMesh.from_discrete_points, None),
+    "element_objects": (lambda n: (n,), get_elements, OBJECT_LIMIT),
+    "assembly_banded": (lambda n: (get_mesh(n), "banded"), assemble_global_matrix, None),
+    "assembly_dense": (lambda n: (get_mesh(n), "dense"), assemble_global_matrix, DENSE_LIMIT),
+    "boundary_conditions_banded": (
+        lambda n: (assemble_global_matrix(get_mesh(n), _storage="banded"), get_empty_load_matrix(n + 1), n + 1),
+        set_supports, None),
+    "boundary_conditions_dense": (
+        lambda n: (assemble_global_matrix(get_mesh(n), _storage="dense"), get_empty_load_matrix(n + 1), n + 1),
+        set_supports, DENSE_LIMIT),
+    "constraints_banded": (
+        lambda n: (get_propped_constraints(get_mesh(n)), assemble_global_matrix(get_mesh(n), _storage="banded")),
+        Constraints.apply, None),
+    "constraints_dense": (
+        lambda n: (get_propped_constraints(get_mesh(n)), assemble_global_matrix(get_mesh(n), _storage="dense")),
+        Constraints.apply, DENSE_LIMIT),
+    "solve_banded": (lambda n: get_constrained(get_mesh(n), "banded"), solve_global_system, None),
+    "solve_dense": (lambda n: get_constrained(get_mesh(n), "dense"), solve_global_system, DENSE_LIMIT),
+    "propped_banded": (lambda n: (get_mesh(n), get_propped_constraints(get_mesh(n)), "banded"), solve_propped, None),
+    "propped_dense": (lambda n: (get_mesh(n), get_propped_constraints(get_mesh(n)), "dense"), solve_propped,
+                      DENSE_LIMIT),
+    "element_results": (
+        lambda n: (solve_global_system(*get_constrained(get_mesh(n), "banded")), get_mesh(n)),
+        compute_element_results, None),
+    "element_results_rounded": (
+        lambda n: (solve_global_system(*get_constrained(get_mesh(n), "banded")), get_mesh(n)),
+        get_element_results, None),
+    "load_udl": (lambda n: (-10, 0, n / 100, get_mesh(n), get_empty_load_matrix(n + 1)), add_udl, None),
+    "load_linear": (lambda n: (-10, 10, 0.1, n / 200, get_mesh(n), get_empty_load_matrix(n + 1)),
+                    add_linear_load, None),
+    "load_points": (lambda n: (np.ones(1000), np.linspace(0, n / 100, 1000), get_mesh(n),
+                               get_empty_load_matrix(n + 1)), add_point_load, None),
+    "load_profile": (lambda n: (np.linspace(0, -10, n + 1), get_mesh(n), get_empty_load_matrix(n + 1)),
+                     add_nodal_profile_load, None),
+    "load_udl_lumped": (lambda n: (-10, 0, n, get_mesh(n), get_empty_load_matrix(n + 1)),
+                        set_udl_between_nodes, None),
+}
+
+
+def run_benchmark(_name, _num_elements, _repeat=3):
+    """Times a benchmark for an element count; returns a result record, or None above its size limit."""
+    _setup, _run, _limit = BENCHMARKS[_name]
+    if _limit is not None and _num_elements > _limit:
+        return None
+
+    _times = []
+    for i in range(0, _repeat):
+        # arguments are rebuilt for every run, as some functions modify them
+        _arguments = _setup(_num_elements)
+        _start = time.perf_counter()
+        _run(*_arguments)
+        _times.append(time.perf_counter() - _start)
+
+    _arguments = _setup(_num_elements)
+    tracemalloc.start()
+    try:
+        _run(*_arguments)
+        _, _peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {"benchmark": _name, "elements": _num_elements, "time": min(_times), "peak_memory": _peak}
+
+
+def run_benchmarks(_names=None, _sizes=SIZES, _repeat=3, _verbose=False):
+    """Runs benchmarks at all sizes; returns a JSON friendly dict of results."""
+    _results = []
+    for _name in _names or BENCHMARKS:
+        for _size in _sizes:
+            _record = run_benchmark(_name, _size, _repeat)
+            if _record is None:
+                continue
+            _results.append(_record)
+            if _verbose:
+                print("{:<28}{:>10} elements {:>12.6f} s {:>12.3f} MB".format(
+                    _name, _size, _record["time"], _record["peak_memory"] / 1e6))
+    return {"python": platform.python_version(), "numpy": np.__version__, "machine": platform.machine(),
+            "results": _results}
+
+
+def check_regressions(_results, _baseline, _tolerance=1.5, _min_time=1e-3):
+    """Compares results with a baseline; returns messages for runs slower (or larger) than tolerance x baseline."""
+    # runs faster than _min_time on both sides are too noisy to compare times
+    _reference = {(_r["benchmark"], _r["elements"]): _r for _r in _baseline["results"]}
+    _messages = []
+    for _record in _results["results"]:
+        _base = _reference.get((_record["benchmark"], _record["elements"]))
+        if _base is None:
+            continue
+        if _record["time"] > _min_time and _record["time"] > _tolerance * _base["time"]:
+            _messages.append("{} ({} elements): {:.6f} s, baseline {:.6f} s".format(
+                _record["benchmark"], _record["elements"], _record["time"], _base["time"]))
+        if _record["peak_memory"] > _tolerance * _base["peak_memory"] + 1e5:
+            _messages.append("{} ({} elements): {} bytes peak, baseline {} bytes".format(
+                _record["benchmark"], _record["elements"], _record["peak_memory"], _base["peak_memory"]))
+    return _messages
+
+
+def main(_arguments=None):
+    _parser = argparse.ArgumentParser(description="Benchmarks of the structural analysis pipeline.")
+    _parser.add_argument("-b", "--benchmark", action="append", choices=sorted(BENCHMARKS),
+                         help="benchmark to run (repeatable); all by default")
+    _parser.add_argument("-s", "--sizes", type=int, nargs="+", default=SIZES, help="element counts")
+    _parser.add_argument("-r", "--repeat", type=int, default=3, help="timed runs per benchmark")
+    _parser.add_argument("-o", "--output", help="JSON file for the results")
+    _parser.add_argument("--baseline", default=BASELINE_PATH, help="JSON file of baseline results")
+    _parser.add_argument("--save-baseline", action="store_true", help="store the results as the baseline")
+    _parser.add_argument("--check", action="store_true", help="exit with status 1 on a regression")
+    _parser.add_argument("--tolerance", type=float, default=1.5, help="allowed ratio to the baseline")
+    _options = _parser.parse_args(_arguments)
+
+    _results = run_benchmarks(_options.benchmark, _options.sizes, _options.repeat, _verbose=True)
+    _results["tolerance"] = _options.tolerance
+
+    if _options.output:
+        with open(_options.output, "w") as _file:
+            json.dump(_results, _file, indent=1)
+    if _options.save_baseline:
+        with open(_options.baseline, "w") as _file:
+            json.dump(_results, _file, indent=1)
+        return 0
+
+    if os.path.exists(_options.baseline):
+        with open(_options.baseline) as _file:
+            _messages = check_regressions(_results, json.load(_file), _options.tolerance)
+        for _message in _messages:
+            print("REGRESSION:", _message)
+        if _messages and _options.check:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
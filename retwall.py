@@ -4,6 +4,8 @@
 from structural.matrices import *
 from structural.elements import *
 from structural.materials import *
+from structural.mesh import *
+from structural.pressure import EarthPressureProfile, add_earth_pressure_load
 
 if __name__ == '__main__':
     import matplotlib.pyplot as plt
@@ -45,8 +47,8 @@ if __name__ == '__main__':
 
     # Define test materials
     structural_code = Aci31814
-    c35 = Concrete(structural_code, "C35/45", 35, 25)
-    c45 = Concrete(structural_code, "C45/55", 45, 25)
+    c35 = get_concrete(structural_code, "C35/45", 35, 25)
+    c45 = get_concrete(structural_code, "C45/55", 45, 25)
 
     # Define test walls ------------------------------------------------------------------
     numberOfSegments = 4  # number of walls
@@ -85,9 +87,9 @@ if __name__ == '__main__':
     print("Significant vertical points: {}".format(verticalPoints))
 
     # define cross sections
-    section150 = RectangularSection(1000, 150)
-    section250 = RectangularSection(1000, 250)
-    section350 = RectangularSection(1000, 350)
+    section150 = get_rectangular_section(1000, 150)
+    section250 = get_rectangular_section(1000, 250)
+    section350 = get_rectangular_section(1000, 350)
     # assign cross sections to wall segments
     wallSegment[0].section = section150
     wallSegment[1].section = section150
@@ -95,34 +97,23 @@ if __name__ == '__main__':
     wallSegment[3].section = section150
 
     maxElementLength = 0.05
-    dlengths = get_cumulative_discrete_lengths(maxElementLength, verticalPoints)
 
+    # array-backed mesh, with every element mapped to its wall segment and soil layer;
+    # nodes and elements are BeamFiniteElement-style views over it
+    mesh = build_wall_mesh(geology, wallSegment, maxElementLength)
+    nodes = mesh.nodes
+    elements = mesh.elements
 
-    nodes = []
-    for i, point in enumerate(dlengths):
-        nodes.append(Node(i, 0, point))
-        if point == 4.7:
-            print("Node ",i)
-
-    elements = []
-    for i, node in enumerate(nodes[:-1]):
-        elements.append(BeamFiniteElement(i, node, nodes[i + 1]))
-
-    height = 0
-    for wall in wallSegment:
-        for element in elements:
-            if element.node1.y >= height:
-                element.section = wall.section
-                element.refresh()
-        height += wall.height
-
-    global_matrix = assemble_global_matrix(elements)
+    # global matrix storage: "dense" or "banded" (block tridiagonal, O(n) memory)
+    matrixStorage = "banded"
+    global_matrix = assemble_global_matrix(mesh, _storage=matrixStorage)
 
     # define a load matrix [V1, M1, V2, M2... Vn, Mn]
     load = get_empty_load_matrix(len(nodes))  # first create an empty load matrix
     load = set_udl_between_nodes(-10, 0, len(nodes) - 1, elements, load)  # then, apply UDL from node 0 to last node
     # load = set_linear_load_between_nodes(10, - 10, 0, len(nodes) - 1, elements, load)
     # load = set_point_force(-2 * 10, int(2 * len(nodes) / 3), load)
+    # load = add_earth_pressure_load(EarthPressureProfile(geology), mesh, load, "active", -1.0)
 
     load_bc = load.copy()
     # Assign boundary conditions to global stiffness matrix and load matrix END 1
@@ -131,18 +122,22 @@ if __name__ == '__main__':
     global_matrix, load_bc = set_nodal_boundary_conditions(len(nodes)-1, global_matrix, load_bc, _condition='pinned')
 
     # solve matrix
-    result = np.linalg.solve(global_matrix, load_bc)
-
-    # extract element results and separate them
-    x, y, theta, element_moments, nodal_moments, shears = get_element_results(result, elements)
-    # convert displacements to mm (*1000) and round to 3 decimals
-    y = list(map(lambda _k: round(1000 * _k, 3), y))
-
-    # output to screen
+    result = solve_global_system(global_matrix, load_bc)
+
+    # extract element results as float arrays
+    results = compute_element_results(result, mesh)
+    x = results.x
+    theta = results.rotation
+    nodal_moments = results.nodal_moments
+    shears = results.nodal_shears
+    # convert displacements to mm (*1000)
+    y = 1000 * results.deflection
+
+    # output to screen, rounded to 3 decimals
     print("************** RESULTS SUMMARY ***************")
-    print("Moment maxima: \t{} kNm and {} kNm".format(max(nodal_moments), min(nodal_moments)))
-    print("Shear maxima: \t{} kN and {} kN".format(max(shears), min(shears)))
-    print("Deflection maxima: \t{} mm and {} mm".format(max(y), min(y)))
+    print("Moment maxima: \t{} kNm and {} kNm".format(round(max(nodal_moments), 3), round(min(nodal_moments), 3)))
+    print("Shear maxima: \t{} kN and {} kN".format(round(max(shears), 3), round(min(shears), 3)))
+    print("Deflection maxima: \t{} mm and {} mm".format(round(max(y), 3), round(min(y), 3)))
     print("Sum of applied load: \t{} kN".format(round(sum(load) / 1000, 3)))
     print("**********************************************")
 
@@ -0,0 +1,4 @@
+import sys
+from structural.cli import main
+
+sys.exit(main())
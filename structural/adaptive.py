@@ -0,0 +1,111 @@
+import numpy as np
+from structural.matrices import get_discrete_points
+from structural.mesh import build_wall_mesh_from_points, get_wall_points
+
+
+def get_shear_jumps(_results):
+    """Returns the jump of the average element shear at every node between the two elements meeting there, in kN."""
+    # average element shears are those at element midpoints, so a jump is the load between
+    # two midpoints: distributed loads, point loads, soil springs and props
+    _jumps = np.zeros(len(_results.nodal_shears))
+    _jumps[1:-1] = np.abs(np.diff(_results.element_shears))
+    return _jumps
+
+
+def get_element_errors(_results):
+    """Estimates a relative error of every element from the shear jumps at its nodes."""
+    # moments at nodes are exact with consistent loads (see compute_element_results), but
+    # between nodes the moment bends away from the straight line through them by about
+    # g L^2 / 8, for a shear gradient g (a jump over the distance between the midpoints)
+    _lengths = np.diff(_results.x)
+    _spans = np.ones(len(_results.x))
+    _spans[1:-1] = 0.5 * (_lengths[:-1] + _lengths[1:])
+    _gradients = get_shear_jumps(_results) / _spans
+    _scale = max(np.max(np.abs(_results.nodal_moments)), 1e-12)
+    return np.maximum(_gradients[:-1], _gradients[1:]) * _lengths ** 2 / 8 / _scale
+
+
+def interpolate_displacements(_positions, _displacements, _new_positions):
+    """Interpolates [y1, theta1, ... yn, thetan] of a mesh onto other node positions with the beam shape functions."""
+    _y = _displacements[0::2]
+    _theta = _displacements[1::2]
+    _ids = np.clip(np.searchsorted(_positions, _new_positions, side="right") - 1, 0, len(_positions) - 2)
+    _L = _positions[_ids + 1] - _positions[_ids]
+    _xi = np.clip((_new_positions - _positions[_ids]) / _L, 0, 1)
+
+    # cubic Hermite functions and their derivatives along the element
+    _n = (1 - 3 * _xi ** 2 + 2 * _xi ** 3, _L * (_xi - 2 * _xi ** 2 + _xi ** 3),
+          3 * _xi ** 2 - 2 * _xi ** 3, _L * (-_xi ** 2 + _xi ** 3))
+    _dn = ((-6 * _xi + 6 * _xi ** 2) / _L, 1 - 4 * _xi + 3 * _xi ** 2,
+           (6 * _xi - 6 * _xi ** 2) / _L, -2 * _xi + 3 * _xi ** 2)
+    _values = (_y[_ids], _theta[_ids], _y[_ids + 1], _theta[_ids + 1])
+
+    _result = np.empty(2 * len(_new_positions))
+    _result[0::2] = sum(_a * _b for _a, _b in zip(_n, _values))
+    _result[1::2] = sum(_a * _b for _a, _b in zip(_dn, _values))
+    return _result
+
+
+class AdaptiveRefinement:
+    """Error-driven mesh refinement of a WallModel, in place of a uniform max_element_length."""
+    # Starting from a coarse mesh, elements whose estimated error exceeds the tolerance
+    # are bisected and the model is solved again, until no element exceeds it. The
+    # error of an element is how far the moment between its nodes departs from a
+    # straight line, g L^2 / 8 for the shear gradient g from the jumps of the element
+    # shears at its nodes, relative to the largest moment (see get_element_errors).
+    # Every mesh has nodes at the mandatory points of the model
+    # (supports, props, dredge level and load ends) and every refinement keeps the
+    # existing nodes. The previous solution is carried onto the new mesh by Hermite
+    # interpolation; it starts the iterations of cracked sections and nonlinear soil
+    # springs, and records how much each refinement changed the displacements.
+
+    def __init__(self, _model, _tolerance=0.01):
+        self.model = _model  # WallModel
+        self.tolerance = _tolerance  # largest acceptable element error, relative to the largest moment
+        self.initial_element_length = 0.5  # in m
+        self.min_element_length = 0.001  # elements are not split below this length, in m
+        self.max_iterations = 20
+        self.mesh = None
+        self.displacements = None
+        self.results = None
+        self.history = []  # (number of nodes, largest element error, change from previous solution) per iteration
+
+    def run(self):
+        """Refines the mesh until the tolerance is met; returns ElementResults on the final mesh."""
+        _geology = self.model.geology
+        _segments = self.model.segments
+        _mandatory = np.union1d(get_wall_points(_geology, _segments), self.model.get_mandatory_points())
+        _mesh = build_wall_mesh_from_points(_geology, _segments,
+                                            get_discrete_points(self.initial_element_length, _mandatory))
+        _previous = None
+
+        for _iteration in range(0, self.max_iterations):
+            # the previous solution, interpolated onto this mesh
+            _guess = None
+            if _previous is not None:
+                _guess = interpolate_displacements(_previous[0], _previous[1], _mesh.y)
+            _displacements, _results = self.model.solve_mesh(_mesh, _guess)
+
+            _change = np.inf
+            if _guess is not None:
+                _scale = max(np.max(np.abs(_displacements[0::2])), 1e-300)
+                _change = np.max(np.abs(_displacements[0::2] - _guess[0::2])) / _scale
+
+            _errors = get_element_errors(_results)
+            self.history.append((_mesh.num_nodes, float(np.max(_errors)), float(_change)))
+            self.mesh, self.displacements, self.results = _mesh, _displacements, _results
+
+            _marked = (_errors > self.tolerance) & (_mesh.lengths > 2 * self.min_element_length)
+            if not np.any(_marked):
+                break
+
+            # bisect marked elements; the new mesh keeps all existing nodes, the mandatory points among them
+            _previous = (_mesh.y, _displacements)
+            _points = np.union1d(_mesh.y, _mesh.get_midpoints()[_marked])
+            _mesh = build_wall_mesh_from_points(_geology, _segments, _points)
+
+        return self.results
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,327 @@
+import numpy as np
+from structural.banded import BlockTridiagonalMatrix, factorize_banded_matrix
+from structural.constraints import Constraints
+from structural.instrument import stage
+from structural.matrices import assemble_global_matrix, assemble_local_matrices, compute_element_results
+
+# scipy.linalg, once imported (or None without scipy), see _get_scipy_linalg
+_scipy = {}
+
+
+def _get_scipy_linalg():
+    """Returns scipy.linalg, or None without scipy; imported on first use, as it is slow to import."""
+    # scipy is optional; it provides LU/Cholesky factors that can be reused for dense matrices
+    if "linalg" not in _scipy:
+        try:
+            from scipy import linalg
+        except ImportError:
+            linalg = None
+        _scipy["linalg"] = linalg
+    return _scipy["linalg"]
+
+
+def solve_cholesky(_lower, _loads):
+    """Solves L L^T x = b by forward and back substitution, for one load vector or a (2n x k) block."""
+    # one row per step, for all load cases at once: O(n^2) per load case, as scipy's cho_solve
+    _y = np.array(_loads, dtype=float)
+    _num_dofs = len(_y)
+    for i in range(0, _num_dofs):
+        _y[i] = (_y[i] - _lower[i, :i] @ _y[:i]) / _lower[i, i]
+    for i in range(_num_dofs - 1, -1, -1):
+        _y[i] = (_y[i] - _lower[i + 1:, i] @ _y[i + 1:]) / _lower[i, i]
+    return _y
+
+
+def factorize_lu(_matrix):
+    """Returns LU factors with partial pivoting of a dense matrix, (LU, row order), as scipy's lu_factor."""
+    # one column per step, eliminating below the pivot by a rank-1 update of the remaining block
+    _lu = np.array(_matrix, dtype=float)
+    _num_dofs = len(_lu)
+    _order = np.arange(_num_dofs)
+    for k in range(0, _num_dofs):
+        _pivot = k + int(np.argmax(np.abs(_lu[k:, k])))
+        if _lu[_pivot, k] == 0:
+            raise np.linalg.LinAlgError("Singular matrix")
+        if _pivot != k:
+            _lu[[k, _pivot]] = _lu[[_pivot, k]]
+            _order[[k, _pivot]] = _order[[_pivot, k]]
+        _lu[k + 1:, k] /= _lu[k, k]
+        _lu[k + 1:, k + 1:] -= np.outer(_lu[k + 1:, k], _lu[k, k + 1:])
+    return _lu, _order
+
+
+def solve_lu(_factors, _loads):
+    """Solves with factors of factorize_lu, for one load vector or a (2n x k) block."""
+    _lu, _order = _factors
+    _y = np.array(_loads, dtype=float)[_order]
+    _num_dofs = len(_y)
+    for i in range(1, _num_dofs):
+        _y[i] = _y[i] - _lu[i, :i] @ _y[:i]
+    for i in range(_num_dofs - 1, -1, -1):
+        _y[i] = (_y[i] - _lu[i, i + 1:] @ _y[i + 1:]) / _lu[i, i]
+    return _y
+
+
+class DenseFactorization:
+    """Reusable factorisation of a dense constrained stiffness matrix."""
+    # Cholesky is used when the matrix is symmetric positive definite, LU otherwise.
+    # Without scipy, numpy's Cholesky factor (or the LU factors of factorize_lu) are kept
+    # and solved by substitution, so the matrix is still factorised only once.
+
+    def __init__(self, _matrix):
+        self.method = None
+        self.factors = None
+        self.linalg = _get_scipy_linalg()
+        _symmetric = np.allclose(_matrix, _matrix.T)
+        if self.linalg is not None:
+            if _symmetric:
+                try:
+                    self.factors = self.linalg.cho_factor(_matrix)
+                    self.method = "cholesky"
+                except np.linalg.LinAlgError:
+                    self.factors = None
+            if self.factors is None:
+                self.factors = self.linalg.lu_factor(_matrix)
+                self.method = "lu"
+        else:
+            if _symmetric:
+                try:
+                    self.factors = np.linalg.cholesky(_matrix)
+                    self.method = "cholesky"
+                except np.linalg.LinAlgError:
+                    self.factors = None
+            if self.factors is None:
+                self.factors = factorize_lu(_matrix)
+                self.method = "lu"
+
+    def solve(self, _loads):
+        """Solves for one load vector, or for a (2n x k) block of them."""
+        if self.linalg is None:
+            if self.method == "cholesky":
+                return solve_cholesky(self.factors, _loads)
+            return solve_lu(self.factors, _loads)
+        if self.method == "cholesky":
+            return self.linalg.cho_solve(self.factors, _loads)
+        return self.linalg.lu_solve(self.factors, _loads)
+
+
+class BandedCholeskyFactorization:
+    """LAPACK banded Cholesky factors of a symmetric positive definite block tridiagonal matrix (needs scipy)."""
+
+    def __init__(self, _banded_matrix, _linalg):
+        self.linalg = _linalg
+        self.factors = _linalg.cholesky_banded(_banded_matrix.to_upper_band())
+
+    def solve(self, _loads):
+        """Solves for one load vector, or for a (2n x k) block of them."""
+        return self.linalg.cho_solve_banded((self.factors, False), _loads)
+
+
+class LowRankUpdate:
+    """Woodbury correction of a factorisation for a stiffness change confined to a few dofs."""
+    # (K + E C E^T)^-1 b = y - Z (I + C Z_S)^-1 C y_S,  with y = K^-1 b, Z = K^-1 E
+    # where E selects the changed dofs S and C is the (unsymmetric, possibly singular) change.
+
+    def __init__(self, _factorization, _num_dofs, _dofs, _change):
+        self.dofs = _dofs
+        self.change = _change
+        _selection = np.zeros((_num_dofs, len(_dofs)))
+        _selection[_dofs, np.arange(len(_dofs))] = 1
+        self.z = _factorization.solve(_selection)
+        self.capacitance = np.eye(len(_dofs)) + _change @ self.z[_dofs]
+
+    def correct(self, _y):
+        """Corrects solutions y = K^-1 b of the unchanged matrix."""
+        return _y - self.z @ np.linalg.solve(self.capacitance, self.change @ _y[self.dofs])
+
+
+class LinearAnalysis:
+    """Linear static analysis of a chain of beam elements, factorised once and solved for many load cases."""
+    # Supports and any further Constraints are applied symmetrically, so the matrix of
+    # a restrained wall is symmetric positive definite and factorised by Cholesky when
+    # scipy is available. Element changes made through update_elements are applied to
+    # the cached factorisation as a low-rank update, until more than max_update_dofs
+    # dofs have changed, at which point the matrix is refactorised.
+
+    def __init__(self, _beam_elements, _supports, _storage="banded", _constraints=None):
+        self.elements = _beam_elements  # list of BeamFiniteElement, or a BeamMesh
+        self.supports = list(_supports)  # list of (node, condition) pairs, condition: fixed, pinned, guided, free
+        self.storage = _storage  # dense, banded
+        self.constraints = _constraints  # Constraints: props, springs and prescribed displacements
+        self.global_matrix = None  # global stiffness matrix with boundary conditions applied
+        self.restrained_dofs = []  # dofs eliminated by boundary conditions
+        self.prescribed = None  # prescribed displacements per dof, None when all are zero
+        self.prescribed_loads = None  # loads of the prescribed displacements, see Constraints.apply
+        self.factorization = None
+        self.num_factorizations = 0
+        self.max_update_dofs = 200  # largest low-rank update before refactorising
+        self.stiffness_changes = []  # (dofs, stiffness changes) of elements and springs since the last factorisation
+        self.update = None
+
+    def assemble(self):
+        """Assembles the global stiffness matrix and applies the supports."""
+        with stage("assembly", self._get_num_elements()):
+            _matrix = assemble_global_matrix(self.elements, _storage=self.storage)
+        _num_nodes = _matrix.shape[-1] // 2
+        with stage("boundary_conditions", len(self.supports)):
+            _constraints = Constraints(_num_nodes) if self.constraints is None else self.constraints.copy()
+            for _node, _condition in self.supports:
+                _constraints.add_support(_node, _condition)
+            _matrix, _loads = _constraints.apply(_matrix)
+        self.global_matrix = _matrix
+        self.restrained_dofs = _constraints.restrained_dofs
+        _prescribed = _constraints.get_prescribed_displacements()
+        self.prescribed = _prescribed if np.any(_prescribed) else None
+        self.prescribed_loads = _loads if np.any(_prescribed) else None
+        self.factorization = None
+        self.stiffness_changes = []
+        self.update = None
+        return self.global_matrix
+
+    def factorize(self):
+        """Factorises the constrained stiffness matrix; the factors are cached until the model changes."""
+        if self.global_matrix is None:
+            self.assemble()
+        with stage("factorization", self.global_matrix.shape[-1]):
+            if isinstance(self.global_matrix, BlockTridiagonalMatrix):
+                self.factorization = self._factorize_banded()
+            else:
+                self.factorization = DenseFactorization(self.global_matrix)
+        self.num_factorizations += 1
+        self.stiffness_changes = []
+        self.update = None
+        return self.factorization
+
+    def _factorize_banded(self):
+        """Factorises a banded matrix by LAPACK Cholesky when possible, by block cyclic reduction otherwise."""
+        _linalg = _get_scipy_linalg()
+        if _linalg is not None and self.global_matrix.diagonal.ndim == 3 and self.global_matrix.is_symmetric():
+            try:
+                return BandedCholeskyFactorization(self.global_matrix, _linalg)
+            except np.linalg.LinAlgError:
+                pass  # not positive definite, e.g. a wall free to move as a rigid body
+        return factorize_banded_matrix(self.global_matrix)
+
+    def get_constrained_loads(self, _loads):
+        """Returns loads with the rows of restrained dofs replaced, see Constraints.apply."""
+        _loads = np.array(_loads, dtype=float)
+        _loads[self.restrained_dofs] = 0
+        if self.prescribed_loads is not None:
+            _loads += self.prescribed_loads if _loads.ndim == 1 else self.prescribed_loads[:, np.newaxis]
+        return _loads
+
+    def solve(self, _loads):
+        """Solves for a load vector [V1, M1, ... Vn, Mn], or for a (2n x k) block with one load case per column."""
+        if self.factorization is None:
+            self.factorize()
+        _loads = self.get_constrained_loads(_loads)
+        with stage("solve", _loads.size):
+            _results = self.factorization.solve(_loads)
+            if self.update is not None:
+                _results = self.update.correct(_results)
+        return _results
+
+    def update_elements(self, _elements, _section=None, _material=None):
+        """Assigns a new section and/or material to some elements and updates the analysis incrementally."""
+        # _elements: list of element indices, a slice or a boolean mask
+        _ids = np.arange(self._get_num_elements())[_elements]
+        _old = self._get_local_matrices(_ids)
+
+        if hasattr(self.elements, "set_section"):
+            # BeamMesh
+            if _material is not None:
+                self.elements.set_material(_material, _ids)
+            if _section is not None:
+                self.elements.set_section(_section, _ids)
+        else:
+            for i in _ids:
+                if _material is not None:
+                    self.elements[i].material = _material
+                if _section is not None:
+                    self.elements[i].section = _section
+                self.elements[i].refresh()
+
+        if self.global_matrix is not None:
+            self._add_stiffness_change(_ids, self._get_local_matrices(_ids) - _old)
+
+    def set_moments_of_inertia(self, _elements, _I):
+        """Overrides moments of inertia (m4) of some elements of a BeamMesh and updates the analysis incrementally."""
+        # used for stiffness that is not a property of the section, e.g. cracked concrete; the
+        # section of the elements is kept, so BeamMesh.refresh restores the gross values
+        _ids = np.arange(self._get_num_elements())[_elements]
+        _old = self._get_local_matrices(_ids)
+        self.elements.I[_ids] = _I
+        if self.global_matrix is not None:
+            self._add_stiffness_change(_ids, self._get_local_matrices(_ids) - _old)
+
+    def _get_num_elements(self):
+        if hasattr(self.elements, "num_elements"):
+            return self.elements.num_elements
+        return len(self.elements)
+
+    def _get_local_matrices(self, _ids):
+        if hasattr(self.elements, "EI"):
+            return assemble_local_matrices(self.elements.lengths[_ids], self.elements.EI[_ids])
+        return np.array([self.elements[i].get_stiffness_matrix() for i in _ids], dtype=float)
+
+    def _add_stiffness_change(self, _ids, _change):
+        """Adds element stiffness changes to the constrained matrix and to the cached factorisation."""
+        # rows and columns of restrained dofs stay as they are; the columns move to the
+        # loads of prescribed displacements instead
+        _dofs = 2 * _ids[:, np.newaxis] + np.arange(4)
+        if self.prescribed is not None:
+            np.add.at(self.prescribed_loads, _dofs, -np.einsum("eij,ej->ei", _change, self.prescribed[_dofs]))
+            self.prescribed_loads[self.restrained_dofs] = self.prescribed[self.restrained_dofs]
+        _restrained = np.isin(_dofs, self.restrained_dofs)
+        _change = np.where(_restrained[:, :, np.newaxis] | _restrained[:, np.newaxis, :], 0, _change)
+
+        if isinstance(self.global_matrix, BlockTridiagonalMatrix):
+            np.add.at(self.global_matrix.diagonal, _ids, _change[:, 0:2, 0:2])
+            np.add.at(self.global_matrix.diagonal, _ids + 1, _change[:, 2:4, 2:4])
+            np.add.at(self.global_matrix.upper, _ids, _change[:, 0:2, 2:4])
+            np.add.at(self.global_matrix.lower, _ids + 1, _change[:, 2:4, 0:2])
+        else:
+            np.add.at(self.global_matrix, (_dofs[:, :, np.newaxis], _dofs[:, np.newaxis, :]), _change)
+
+        if self.factorization is not None:
+            self._update_factorization(_dofs, _change)
+
+    def add_spring_stiffness(self, _stiffness):
+        """Adds lateral spring stiffness (N/m, one value per node, negative to remove), updating incrementally."""
+        # the springs are part of the constrained matrix until it is assembled again
+        if self.global_matrix is None:
+            self.assemble()
+        _nodes = np.flatnonzero(_stiffness)
+        _dofs = 2 * _nodes
+        _change = np.where(np.isin(_dofs, self.restrained_dofs), 0, np.asarray(_stiffness, dtype=float)[_nodes])
+        if isinstance(self.global_matrix, BlockTridiagonalMatrix):
+            self.global_matrix.diagonal[_nodes, 0, 0] += _change
+        else:
+            self.global_matrix[_dofs, _dofs] += _change
+        if self.factorization is not None and len(_nodes) > 0:
+            self._update_factorization(_dofs[:, np.newaxis], _change[:, np.newaxis, np.newaxis])
+
+    def _update_factorization(self, _dofs, _change):
+        """Applies stiffness changes (m x d dofs, m x d x d changes) to the cached factorisation."""
+        self.stiffness_changes.append((_dofs, _change))
+        _all_dofs = np.unique(np.concatenate([_d.ravel() for _d, _ in self.stiffness_changes]))
+        if len(_all_dofs) > self.max_update_dofs:
+            # too many changes for a low-rank update to pay off
+            self.factorize()
+            return
+
+        # gather all changes since the last factorisation onto the changed dofs
+        _matrix = np.zeros((len(_all_dofs), len(_all_dofs)))
+        for _d, _c in self.stiffness_changes:
+            _p = np.searchsorted(_all_dofs, _d)
+            np.add.at(_matrix, (_p[:, :, np.newaxis], _p[:, np.newaxis, :]), _c)
+        self.update = LowRankUpdate(self.factorization, self.global_matrix.shape[-1], _all_dofs, _matrix)
+
+    def get_element_results(self, _results, _fixed_end_forces=None):
+        """Post-processes solver results of all load cases together, see compute_element_results."""
+        with stage("post_processing", np.size(_results)):
+            return compute_element_results(_results, self.elements, _fixed_end_forces)
+
+
+if __name__ == '__main__':
+    pass
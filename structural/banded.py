@@ -0,0 +1,277 @@
+import numpy as np
+
+
+class BlockTridiagonalMatrix:
+    """Global stiffness matrix stored as 2x2 nodal blocks on three diagonals."""
+    # A chain of beam elements only couples neighbouring nodes, so the global
+    # matrix is fully described by:
+    #   diagonal[i] = K[2i:2i+2, 2i:2i+2]          (node i with itself)
+    #   upper[i]    = K[2i:2i+2, 2i+2:2i+4]        (node i with node i+1)
+    #   lower[i]    = K[2i:2i+2, 2i-2:2i]          (node i with node i-1)
+    # upper[-1] and lower[0] are always zero; they are kept so that all three
+    # arrays share the same (n, 2, 2) shape. Any leading axes are batch axes.
+
+    def __init__(self, _lower, _diagonal, _upper):
+        self.lower = _lower
+        self.diagonal = _diagonal
+        self.upper = _upper
+
+    @property
+    def num_nodes(self):
+        return self.diagonal.shape[-3]
+
+    @property
+    def shape(self):
+        return self.diagonal.shape[:-3] + (self.num_nodes * 2, self.num_nodes * 2)
+
+    def copy(self):
+        return BlockTridiagonalMatrix(self.lower.copy(), self.diagonal.copy(), self.upper.copy())
+
+    def to_dense(self):
+        """Expands the block storage into a full (2n x 2n) array."""
+        _n = self.num_nodes
+        _dense = np.zeros(self.shape)
+        for i in range(0, _n):
+            _i = i * 2
+            _dense[..., _i:_i + 2, _i:_i + 2] = self.diagonal[..., i, :, :]
+            if i > 0:
+                _dense[..., _i:_i + 2, _i - 2:_i] = self.lower[..., i, :, :]
+            if i < _n - 1:
+                _dense[..., _i:_i + 2, _i + 2:_i + 4] = self.upper[..., i, :, :]
+        return _dense
+
+    def is_symmetric(self):
+        """Checks whether the matrix equals its transpose exactly, as assembled matrices do."""
+        return bool(np.array_equal(self.diagonal[..., 0, 1], self.diagonal[..., 1, 0]) and
+                    np.array_equal(self.lower[..., 1:, :, :], np.swapaxes(self.upper[..., :-1, :, :], -1, -2)))
+
+    def to_upper_band(self):
+        """Returns the upper triangle in LAPACK symmetric band storage, a (4, 2n) array (3 superdiagonals)."""
+        # band[3 - k, j] = K[j - k, j]; dof 2i + r is row r of node i
+        _n = self.num_nodes
+        _band = np.zeros((4, 2 * _n))
+        _band[3, 0::2] = self.diagonal[:, 0, 0]
+        _band[3, 1::2] = self.diagonal[:, 1, 1]
+        _band[2, 1::2] = self.diagonal[:, 0, 1]
+        _band[2, 2::2] = self.upper[:-1, 1, 0]
+        _band[1, 2::2] = self.upper[:-1, 0, 0]
+        _band[1, 3::2] = self.upper[:-1, 1, 1]
+        _band[0, 3::2] = self.upper[:-1, 0, 1]
+        return _band
+
+    def dot(self, _vector):
+        """Multiplies the matrix by a vector [V1, M1, ... Vn, Mn] (or by a column block of them)."""
+        _x, _single = _to_node_blocks(_vector, self.num_nodes, self.diagonal.ndim - 3)
+        _y = self.diagonal @ _x
+        _y[..., 1:, :, :] += self.lower[..., 1:, :, :] @ _x[..., :-1, :, :]
+        _y[..., :-1, :, :] += self.upper[..., :-1, :, :] @ _x[..., 1:, :, :]
+        return _from_node_blocks(_y, _single)
+
+
+def get_empty_banded_matrix(_num_nodes, _batch_shape=()):
+    """Creates a block tridiagonal matrix of zeros for a given number of nodes (and optional batch shape)."""
+    _shape = tuple(_batch_shape) + (_num_nodes, 2, 2)
+    return BlockTridiagonalMatrix(np.zeros(_shape), np.zeros(_shape), np.zeros(_shape))
+
+
+def assemble_banded_matrix(_local_matrices):
+    """Assembles a block tridiagonal global matrix from stacked (n_elem, 4, 4) local matrices."""
+    # leading axes of (..., n_elem, 4, 4) local matrices give a batch of global matrices
+    _local_matrices = np.asarray(_local_matrices, dtype=float)
+    _num_nodes = _local_matrices.shape[-3] + 1
+    _banded = get_empty_banded_matrix(_num_nodes, _local_matrices.shape[:-3])
+
+    # element i joins node i (local dofs 0, 1) and node i + 1 (local dofs 2, 3)
+    _banded.diagonal[..., :-1, :, :] += _local_matrices[..., 0:2, 0:2]
+    _banded.diagonal[..., 1:, :, :] += _local_matrices[..., 2:4, 2:4]
+    _banded.upper[..., :-1, :, :] = _local_matrices[..., 0:2, 2:4]
+    _banded.lower[..., 1:, :, :] = _local_matrices[..., 2:4, 0:2]
+
+    return _banded
+
+
+def set_banded_restrained_rows(_banded_matrix, _restrained):
+    """Replaces rows of restrained dofs by unit rows; _restrained is a boolean (..., 2n) array."""
+    # batch form of set_banded_nodal_boundary_conditions, with one mask per matrix
+    _rows = np.asarray(_restrained, dtype=bool).reshape(_banded_matrix.diagonal.shape[:-1])[..., np.newaxis]
+    _banded_matrix.lower = np.where(_rows, 0.0, _banded_matrix.lower)
+    _banded_matrix.upper = np.where(_rows, 0.0, _banded_matrix.upper)
+    _banded_matrix.diagonal = np.where(_rows, np.eye(2), _banded_matrix.diagonal)
+    return _banded_matrix
+
+
+def set_banded_restrained_dofs(_banded_matrix, _restrained):
+    """Replaces rows and columns of restrained dofs by those of the identity; _restrained is a boolean 2n array."""
+    # symmetric form of set_banded_restrained_rows, for a single matrix
+    _mask = np.asarray(_restrained, dtype=bool).reshape(_banded_matrix.num_nodes, 2)
+    _rows = _mask[:, :, np.newaxis]
+    _columns = _mask[:, np.newaxis, :]
+    _banded_matrix.diagonal = np.where(_rows | _columns, 0.0, _banded_matrix.diagonal)
+    _banded_matrix.upper = np.where(_rows, 0.0, _banded_matrix.upper)
+    _banded_matrix.upper[:-1] = np.where(_columns[1:], 0.0, _banded_matrix.upper[:-1])
+    _banded_matrix.lower = np.where(_rows, 0.0, _banded_matrix.lower)
+    _banded_matrix.lower[1:] = np.where(_columns[:-1], 0.0, _banded_matrix.lower[1:])
+    _nodes, _dofs = np.nonzero(_mask)
+    _banded_matrix.diagonal[_nodes, _dofs, _dofs] = 1
+    return _banded_matrix
+
+
+def set_banded_nodal_boundary_conditions(_node, _banded_matrix, _loads, _condition="fixed"):
+    """Sets boundary conditions to a block tridiagonal global stiffness matrix"""
+    # mirrors set_nodal_boundary_conditions: restrained rows are replaced by unit rows
+    # condition: fixed, pinned, free
+
+    if 0 <= _node < _banded_matrix.num_nodes:
+        # for a fixed condition, restrain both displacements and rotations
+        if _condition == "fixed":
+            _rows = [0, 1]
+        # for a pinned condition, restrain only displacements
+        elif _condition == "pinned":
+            _rows = [0]
+        else:
+            _rows = []
+
+        for _row in _rows:
+            _banded_matrix.lower[_node, _row] = 0
+            _banded_matrix.upper[_node, _row] = 0
+            _banded_matrix.diagonal[_node, _row] = 0
+            _banded_matrix.diagonal[_node, _row, _row] = 1
+            _loads[_node * 2 + _row] = 0
+    else:
+        raise ValueError("Failed to assign boundary conditions at node {} of {}.".format(_node,
+                                                                                        _banded_matrix.num_nodes))
+
+    return _banded_matrix, _loads
+
+
+def solve_banded_system(_banded_matrix, _loads):
+    """Solves a block tridiagonal system for one load vector, or for a (2n x k) block of them."""
+    return factorize_banded_matrix(_banded_matrix).solve(_loads)
+
+
+def factorize_banded_matrix(_banded_matrix):
+    """Factorises a block tridiagonal matrix by block cyclic reduction, for repeated solves."""
+    return BandedFactorization(_banded_matrix)
+
+
+class BandedFactorization:
+    """Block cyclic reduction factors of a block tridiagonal matrix."""
+    # The odd-numbered nodes are eliminated from the equations of their even
+    # neighbours, which halves the system. The reduced (even) system has the same
+    # block tridiagonal form and is reduced again, down to a single node. The
+    # eliminated blocks of every level are kept, so a new load vector only needs
+    # the cheap forward and back substitution passes. Every step works on all
+    # nodes of a level at once: O(n) arithmetic in O(log n) vectorised passes.
+
+    def __init__(self, _banded_matrix):
+        self.num_nodes = _banded_matrix.num_nodes
+        self.batch_ndim = _banded_matrix.diagonal.ndim - 3
+        self.levels = []
+
+        _lower = _banded_matrix.lower
+        _diagonal = _banded_matrix.diagonal
+        _upper = _banded_matrix.upper
+        while _diagonal.shape[-3] > 1:
+            _level = _ReductionLevel(_lower, _diagonal, _upper)
+            self.levels.append(_level)
+            _lower, _diagonal, _upper = _level.reduce()
+        self.last_diagonal = _diagonal.copy()
+
+    def solve(self, _loads):
+        """Solves for one load vector, or for a (2n x k) block of them."""
+        _b, _single = _to_node_blocks(_loads, self.num_nodes, self.batch_ndim)
+
+        # forward reduction of the load vectors
+        _reduced = []
+        for _level in self.levels:
+            _xb, _b = _level.reduce_loads(_b)
+            _reduced.append(_xb)
+
+        _x = np.linalg.solve(self.last_diagonal, _b)
+
+        # back substitution, level by level
+        for _level, _xb in zip(reversed(self.levels), reversed(_reduced)):
+            _x = _level.back_substitute(_x, _xb)
+
+        return _from_node_blocks(_x, _single)
+
+
+class _ReductionLevel:
+    """One level of block cyclic reduction."""
+
+    def __init__(self, _lower, _diagonal, _upper):
+        _n = _diagonal.shape[-3]
+        self.num_nodes = _n
+        self.num_even = (_n + 1) // 2
+        self.num_odd = _n // 2
+
+        # D_odd^-1 [L | U], in a single batched solve; blocks are copied, so that
+        # later edits of the matrix do not leak into the factors
+        self.odd_diagonal = _diagonal[..., 1::2, :, :].copy()
+        _x = np.linalg.solve(self.odd_diagonal,
+                             np.concatenate((_lower[..., 1::2, :, :], _upper[..., 1::2, :, :]), axis=-1))
+        self.xl = _x[..., 0:2]
+        self.xu = _x[..., 2:4]
+
+        self.even_lower = _lower[..., 0::2, :, :].copy()
+        self.even_upper = _upper[..., 0::2, :, :].copy()
+        self.even_diagonal = _diagonal[..., 0::2, :, :].copy()
+
+    def reduce(self):
+        """Returns the block diagonals of the reduced (even node) system."""
+        _m = self.num_even - 1
+        _k = self.num_odd
+        _le = self.even_lower
+        _ue = self.even_upper
+        _diagonal = self.even_diagonal.copy()
+        _lower = np.zeros_like(_diagonal)
+        _upper = np.zeros_like(_diagonal)
+
+        # eliminate the left (odd) neighbour of every even node but the first
+        _diagonal[..., 1:, :, :] -= _le[..., 1:, :, :] @ self.xu[..., :_m, :, :]
+        _lower[..., 1:, :, :] = -_le[..., 1:, :, :] @ self.xl[..., :_m, :, :]
+        # eliminate the right (odd) neighbour, where there is one
+        _diagonal[..., :_k, :, :] -= _ue[..., :_k, :, :] @ self.xl
+        _upper[..., :_k, :, :] = -_ue[..., :_k, :, :] @ self.xu
+
+        return _lower, _diagonal, _upper
+
+    def reduce_loads(self, _b):
+        """Returns D_odd^-1 b_odd and the loads of the reduced system."""
+        _m = self.num_even - 1
+        _k = self.num_odd
+        _xb = np.linalg.solve(self.odd_diagonal, _b[..., 1::2, :, :])
+        _new_b = _b[..., 0::2, :, :].copy()
+        _new_b[..., 1:, :, :] -= self.even_lower[..., 1:, :, :] @ _xb[..., :_m, :, :]
+        _new_b[..., :_k, :, :] -= self.even_upper[..., :_k, :, :] @ _xb
+        return _xb, _new_b
+
+    def back_substitute(self, _x_even, _xb):
+        """Recovers the odd nodes and interleaves them with the even ones."""
+        _m = self.num_even - 1
+        _x_odd = _xb - self.xl @ _x_even[..., :self.num_odd, :, :]
+        _x_odd[..., :_m, :, :] -= self.xu[..., :_m, :, :] @ _x_even[..., 1:, :, :]
+
+        _x = np.empty(_x_even.shape[:-3] + (self.num_nodes,) + _x_even.shape[-2:])
+        _x[..., 0::2, :, :] = _x_even
+        _x[..., 1::2, :, :] = _x_odd
+        return _x
+
+
+def _to_node_blocks(_vector, _num_nodes, _batch_ndim=0):
+    """Reshapes [..., 2n] or [..., 2n, k] into [..., n, 2, k] nodal blocks."""
+    _vector = np.asarray(_vector, dtype=float)
+    if _vector.ndim == _batch_ndim + 1:
+        # a single vector per matrix
+        return _vector.reshape(_vector.shape[:-1] + (_num_nodes, 2, 1)), True
+    return _vector.reshape(_vector.shape[:-2] + (_num_nodes, 2, _vector.shape[-1])), False
+
+
+def _from_node_blocks(_blocks, _single):
+    if _single:
+        return _blocks.reshape(_blocks.shape[:-3] + (-1,))
+    return _blocks.reshape(_blocks.shape[:-3] + (-1, _blocks.shape[-1]))
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,115 @@
+import numpy as np
+from structural.banded import BlockTridiagonalMatrix, assemble_banded_matrix, set_banded_restrained_rows
+from structural.banded import factorize_banded_matrix
+from structural.constraints import Constraints
+from structural.loads import get_empty_fixed_end_forces
+from structural.matrices import assemble_local_matrices, get_results_from_properties
+from structural.springs import get_soil_springs
+
+
+def get_restrained_dofs_mask(_supports, _num_nodes):
+    """Returns a boolean (2n,) mask of dofs restrained by (node, condition) supports."""
+    return ~np.isnan(get_batch_constraints(_supports, _num_nodes).prescribed)
+
+
+def get_batch_constraints(_supports, _num_nodes, _constraints=None):
+    """Returns Constraints of (node, condition) supports added to a copy of further Constraints, e.g. props."""
+    _constraints = Constraints(_num_nodes) if _constraints is None else _constraints.copy()
+    for _node, _condition in _supports:
+        _constraints.add_support(_node, _condition)
+    if np.any(_constraints.get_prescribed_displacements()):
+        raise ValueError("Batch analysis does not support prescribed displacements.")
+    return _constraints
+
+
+def add_batch_stiffness(_matrix, _constraints):
+    """Adds springs and props of one Constraints per mesh to a stacked banded matrix or (batch, 2n, 2n) array."""
+    for k, _c in enumerate(_constraints):
+        if isinstance(_matrix, BlockTridiagonalMatrix):
+            # views of the blocks of mesh k, so that the stiffness is added in place
+            _c.add_stiffness(BlockTridiagonalMatrix(_matrix.lower[k], _matrix.diagonal[k], _matrix.upper[k]))
+        else:
+            _c.add_stiffness(_matrix[k])
+    return _matrix
+
+
+def get_model_constraints(_model, _mesh):
+    """Returns Constraints of the props and linear soil springs of a WallModel on a mesh, or None without them."""
+    _constraints = _model.get_constraints(_mesh)
+    if _model.dredge_level is None:
+        return _constraints
+    if _model.soil_springs == "nonlinear":
+        raise ValueError("Batch analysis is linear; nonlinear soil springs are not supported.")
+    _springs = get_soil_springs(_model.geology, _mesh, _model.dredge_level, _model.get_load_direction(), False)
+    _constraints = Constraints(_mesh.num_nodes) if _constraints is None else _constraints
+    return _constraints.add_spring(np.arange(_mesh.num_nodes), _springs.stiffness)
+
+
+def solve_mesh_batch(_meshes, _supports, _loads, _storage="banded", _fixed_end_forces=None, _constraints=None):
+    """Solves several meshes with equal node counts as one stacked system."""
+    # _supports: one list of (node, condition) pairs per mesh
+    # _constraints: one Constraints (springs and props) or None per mesh; prescribed displacements are not supported
+    # _loads: one load vector per mesh, as a (batch, 2n) array
+    # _fixed_end_forces: element loads of every mesh, (batch, n_elem, 4), see compute_element_results
+    # returns displacements as a (batch, 2n) array and ElementResults with one column per mesh
+    _lengths = np.stack([_mesh.lengths for _mesh in _meshes])
+    _EI = np.stack([_mesh.EI for _mesh in _meshes])
+    _num_nodes = _lengths.shape[1] + 1
+
+    if _constraints is None:
+        _constraints = [None] * len(_meshes)
+    _constraints = [get_batch_constraints(_s, _num_nodes, _c) for _s, _c in zip(_supports, _constraints)]
+    _restrained = np.stack([~np.isnan(_c.prescribed) for _c in _constraints])
+    _loads = np.where(_restrained, 0.0, np.asarray(_loads, dtype=float))
+
+    # all local matrices of all meshes in a single (batch, n_elem, 4, 4) operation
+    _local_matrices = assemble_local_matrices(_lengths, _EI)
+
+    if _storage == "banded":
+        _matrix = add_batch_stiffness(assemble_banded_matrix(_local_matrices), _constraints)
+        _matrix = set_banded_restrained_rows(_matrix, _restrained)
+        _displacements = factorize_banded_matrix(_matrix).solve(_loads)
+    else:
+        _batch = len(_meshes)
+        _matrix = np.zeros((_batch, _num_nodes * 2, _num_nodes * 2))
+        _dofs = 2 * np.arange(_num_nodes - 1)[:, np.newaxis] + np.arange(4)
+        np.add.at(_matrix, (slice(None), _dofs[:, :, np.newaxis], _dofs[:, np.newaxis, :]), _local_matrices)
+        _matrix = add_batch_stiffness(_matrix, _constraints)
+        _matrix = np.where(_restrained[:, :, np.newaxis], np.eye(_num_nodes * 2), _matrix)
+        _displacements = np.linalg.solve(_matrix, _loads[:, :, np.newaxis])[:, :, 0]
+
+    # post-process every mesh at once, with meshes as the trailing (load case) axis
+    if _fixed_end_forces is not None:
+        _fixed_end_forces = np.moveaxis(np.asarray(_fixed_end_forces, dtype=float), 0, -1)
+    _results = get_results_from_properties(_displacements.T, _lengths.T, _EI.T, _fixed_end_forces)
+    return _displacements, _results
+
+
+def analyse_batch(_models, _storage="banded"):
+    """Analyses many WallModels, solving models with equal node counts together; returns ElementResults per model."""
+    if any(_model.cracked_sections for _model in _models):
+        raise ValueError("Batch analysis is linear; cracked sections are not supported.")
+    _meshes = [_model.build_mesh() for _model in _models]
+
+    # group models by node count
+    _groups = {}
+    for i, _mesh in enumerate(_meshes):
+        _groups.setdefault(_mesh.num_nodes, []).append(i)
+
+    _all_results = [None] * len(_models)
+    for _indices in _groups.values():
+        _group = [_meshes[i] for i in _indices]
+        _supports = [_models[i].get_supports(_meshes[i]) for i in _indices]
+        _constraints = [get_model_constraints(_models[i], _meshes[i]) for i in _indices]
+        _fixed_end_forces = np.stack([get_empty_fixed_end_forces(_mesh) for _mesh in _group])
+        _loads = np.stack([_models[i].get_load_matrix(_meshes[i], _fixed_end_forces=_fixed_end_forces[k])
+                           for k, i in enumerate(_indices)])
+        _, _results = solve_mesh_batch(_group, _supports, _loads, _storage, _fixed_end_forces, _constraints)
+        for k, i in enumerate(_indices):
+            _all_results[i] = _results.get_case(k)
+
+    return _all_results
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,131 @@
+# Content-addressed on-disk cache of analysis results.
+#
+# A model is keyed by the sha256 of its canonical JSON form (structural.schema, which
+# includes the structural code of its materials), so any change of input gives a new key
+# and stale entries are simply never read again. Entries are .npz files written to a
+# temporary file and moved into place, so that concurrent readers and writers in other
+# processes only ever see complete files. The cache is kept under max_bytes by deleting
+# the least recently used entries; reading an entry marks it as used.
+
+import hashlib
+import json
+import os
+import tempfile
+import numpy as np
+from structural.matrices import ElementResults
+from structural.schema import SCHEMA_VERSION, model_from_dict, model_to_dict
+
+CACHE_VERSION = 2  # bump when results of the same model may change, e.g. with the solver
+_QUANTITIES = ("x", "deflection", "rotation", "element_moments", "nodal_moments", "element_shears", "nodal_shears")
+
+
+def get_model_key(_model):
+    """Returns the cache key of a WallModel (or of its dict form), a sha256 hex digest."""
+    # dicts are read back into models first, so that omitted fields hash as their defaults;
+    # the name is left out, so the same wall at different chainages shares its results
+    if isinstance(_model, dict):
+        _model = model_from_dict(_model)
+    _data = model_to_dict(_model)
+    _data.pop("name")
+    _text = json.dumps({"cache": CACHE_VERSION, "schema": SCHEMA_VERSION, "model": _data}, sort_keys=True,
+                       separators=(",", ":"))
+    return hashlib.sha256(_text.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """Size-bounded LRU cache of ElementResults in a directory, safe to share between processes."""
+
+    def __init__(self, _path, _max_bytes=1 << 30):
+        self.path = _path
+        self.max_bytes = _max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(_path, exist_ok=True)
+        self.size = self.get_size()  # estimate of the cache size, rescanned before evicting
+
+    def _get_file(self, _key):
+        return os.path.join(self.path, _key[:2], _key + ".npz")
+
+    def _get_entries(self):
+        """Returns (last use, size, path) of all entries."""
+        _entries = []
+        for _directory, _, _files in os.walk(self.path):
+            for _name in _files:
+                if not _name.endswith(".npz"):
+                    continue
+                _file = os.path.join(_directory, _name)
+                try:
+                    _stat = os.stat(_file)
+                except FileNotFoundError:
+                    continue  # evicted by another process
+                _entries.append((_stat.st_mtime, _stat.st_size, _file))
+        return _entries
+
+    def get_size(self):
+        """Returns the total size of all entries, in bytes."""
+        return sum(_size for _, _size, _ in self._get_entries())
+
+    def get(self, _key):
+        """Returns cached ElementResults of a key, or None."""
+        _file = self._get_file(_key)
+        try:
+            with np.load(_file) as _data:
+                _results = ElementResults(*[_data[_quantity] for _quantity in _QUANTITIES])
+            os.utime(_file)  # mark as recently used
+        except (OSError, ValueError, KeyError):
+            # missing, evicted meanwhile or unreadable: a miss
+            self.misses += 1
+            return None
+        self.hits += 1
+        return _results
+
+    def put(self, _key, _results):
+        """Stores ElementResults under a key, evicting least recently used entries above max_bytes."""
+        _file = self._get_file(_key)
+        os.makedirs(os.path.dirname(_file), exist_ok=True)
+        _handle, _temporary = tempfile.mkstemp(dir=os.path.dirname(_file), suffix=".tmp")
+        try:
+            with os.fdopen(_handle, "wb") as _output:
+                np.savez(_output, **{_quantity: getattr(_results, _quantity) for _quantity in _QUANTITIES})
+            os.replace(_temporary, _file)
+        except BaseException:
+            os.unlink(_temporary)
+            raise
+        self.size += os.path.getsize(_file)
+        if self.size > self.max_bytes:
+            self.evict()
+
+    def evict(self):
+        """Deletes least recently used entries until the cache is within max_bytes."""
+        _entries = sorted(self._get_entries())
+        self.size = sum(_size for _, _size, _ in _entries)
+        for _, _size, _file in _entries:
+            if self.size <= self.max_bytes:
+                break
+            try:
+                os.unlink(_file)
+            except FileNotFoundError:
+                pass  # evicted by another process
+            self.size -= _size
+
+    def analyse(self, _model):
+        """Returns ElementResults of a WallModel, from the cache or by analysing (and caching) it."""
+        _key = get_model_key(_model)
+        _results = self.get(_key)
+        if _results is None:
+            _results = _model.analyse()
+            self.put(_key, _results)
+        return _results
+
+    def clear(self):
+        """Deletes all entries."""
+        for _, _, _file in self._get_entries():
+            try:
+                os.unlink(_file)
+            except FileNotFoundError:
+                pass
+        self.size = 0
+
+
+if __name__ == '__main__':
+    pass
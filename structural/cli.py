@@ -0,0 +1,95 @@
+# Command line runner of wall models.
+#
+#   python -m structural model.json [more.json ...] [-o results.jsonl] [--full] [--plot]
+#
+# Input files are .json (a model in the form of structural.schema, or a list of them),
+# .jsonl or .csv, see structural.pipeline. Models are streamed through the analysis one
+# after another in this process, and one JSON line is written per model: its name,
+# source file and summary (or full results), or the error that stopped it. Analysis
+# modules are imported only when there is a model to run, and matplotlib only with --plot.
+
+import argparse
+import json
+import sys
+
+
+def get_parser():
+    _parser = argparse.ArgumentParser(prog="python -m structural",
+                                      description="Analyses retaining wall models given in model files.")
+    _parser.add_argument("models", nargs="+", help="model files: .json, .jsonl or .csv")
+    _parser.add_argument("-o", "--output", help="JSON lines file for the results (standard output by default)")
+    _parser.add_argument("--full", action="store_true", help="write full nodal results, not only the summary")
+    _parser.add_argument("--store", help="also write nodal results to a columnar result store in this directory")
+    _parser.add_argument("--cache", help="reuse results of identical models from a result cache in this directory")
+    _parser.add_argument("--cache-size", type=float, default=1024, help="largest size of the cache, in MB")
+    _parser.add_argument("--plot", action="store_true", help="plot the results of every model (needs matplotlib)")
+    _parser.add_argument("--statistics", help="record stage timings and write them to this JSON file")
+    return _parser
+
+
+def plot_results(_name, _results):
+    import matplotlib.pyplot as plt
+    _figure, _axes = plt.subplots(1, 3, sharey=True)
+    _figure.suptitle(_name)
+    for _axis, _values, _title in zip(_axes, (1000 * _results.deflection, _results.nodal_moments,
+                                              _results.nodal_shears), ("Deflection (mm)", "Moment (kNm)",
+                                                                        "Shear (kN)")):
+        _axis.plot(_values, _results.x)
+        _axis.set_title(_title)
+    _axes[0].invert_yaxis()
+    plt.show()
+
+
+def run(_paths, _output, _full=False, _plot=False, _store=None, _cache=None):
+    """Analyses all models of all files, writing one JSON line per model; returns the number of failed models."""
+    # _store: a ResultWriter also receiving the results of every successful model
+    # _cache: a ResultCache of results of models analysed before
+    from structural.pipeline import read_models, analyse_models, write_results
+
+    _failed = 0
+    for _path in _paths:
+        try:
+            _items = analyse_models(read_models(_path), _cache=_cache)
+            for _item in write_results(_items, _output, _store, _full, {"file": _path}):
+                _failed += _item.failed
+                if _plot and not _item.failed:
+                    plot_results(_item.record["name"], _item.results)
+        except (OSError, ValueError) as _error:
+            # an unreadable file; models read before the error have been written
+            _output.write(json.dumps({"file": _path, "error": "{}: {}".format(type(_error).__name__, _error)}) + "\n")
+            _failed += 1
+    return _failed
+
+
+def main(_arguments=None):
+    _options = get_parser().parse_args(_arguments)
+    if _options.statistics:
+        from structural import instrument
+        instrument.enable()
+
+    _store = None
+    if _options.store:
+        from structural.store import ResultWriter
+        _store = ResultWriter(_options.store)
+
+    _cache = None
+    if _options.cache:
+        from structural.cache import ResultCache
+        _cache = ResultCache(_options.cache, int(_options.cache_size * 1e6))
+
+    _output = open(_options.output, "w") if _options.output else sys.stdout
+    try:
+        _failed = run(_options.models, _output, _options.full, _options.plot, _store, _cache)
+    finally:
+        if _options.output:
+            _output.close()
+        if _store is not None:
+            _store.close()
+
+    if _options.statistics:
+        instrument.export_json(_options.statistics)
+    return 1 if _failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
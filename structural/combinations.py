@@ -0,0 +1,181 @@
+# Load cases and factored load combinations of a linear wall analysis.
+#
+# Every basic load case (dead, live, earth pressure, ...) is solved once, all cases
+# together as one (2n x k) block through a single factorisation. Results are linear in the
+# loads, so the results of the c combinations of a design code are the case results times
+# the (k x c) matrix of load factors, one matrix product per result array, and
+# ElementResults.get_envelope gives their envelopes with the governing combination.
+#
+# Combinations follow the strength design load combinations of ACI 318:
+#
+#   ACI 318-10  9.2.1, eq. (9-1) to (9-7)
+#   ACI 318-14  5.3.1, eq. (5.3.1a) to (5.3.1g); also ACI 318-19
+#
+# "Lr or S or R", "1.0L or 0.5W" etc. give one combination per choice, wind W and
+# earthquake E act in either direction, and lateral earth pressure H has two factors:
+# adding to the other loads (1.6) and, where it counteracts them, 0.9 (ACI 318-14/19, 5.3.8)
+# or 0 (ACI 318-10, 9.2.1). Fluid loads F take the factor of D in eq. (5.3.1a) to (5.3.1e),
+# and 0.9 in (5.3.1g) where they are permanent and counteract the other loads (ACI 318-14/19, 5.3.7).
+
+from itertools import product
+import numpy as np
+from structural.loads import get_empty_fixed_end_forces
+from structural.materials import CodeType
+from structural.matrices import ElementResults
+
+# load categories of ACI 318: dead, fluid, live, earth pressure, roof live, snow, rain,
+# wind, earthquake
+CATEGORIES = ("D", "F", "L", "H", "Lr", "S", "R", "W", "E")
+
+_ROOF = ({"Lr": 0.5}, {"S": 0.5}, {"R": 0.5})
+_WIND = ({"W": 1.0}, {"W": -1.0})
+_EARTHQUAKE = ({"E": 1.0}, {"E": -1.0})
+
+# equations of every code: a label and its terms; a term is a dict of load factors, or a
+# tuple of alternative dicts
+_ACI318_14_EARTH = ({"H": 1.6}, {"H": 0.9})
+_ACI318_14 = [("5.3.1a", [{"D": 1.4, "F": 1.4}, _ACI318_14_EARTH]),
+              ("5.3.1b", [{"D": 1.2, "F": 1.2, "L": 1.6}, _ROOF, _ACI318_14_EARTH]),
+              ("5.3.1c", [{"D": 1.2, "F": 1.2}, ({"Lr": 1.6}, {"S": 1.6}, {"R": 1.6}),
+                          ({"L": 1.0}, {"W": 0.5}, {"W": -0.5}), _ACI318_14_EARTH]),
+              ("5.3.1d", [{"D": 1.2, "F": 1.2, "L": 1.0}, _WIND, _ROOF, _ACI318_14_EARTH]),
+              ("5.3.1e", [{"D": 1.2, "F": 1.2, "L": 1.0, "S": 0.2}, _EARTHQUAKE, _ACI318_14_EARTH]),
+              ("5.3.1f", [{"D": 0.9}, _WIND, _ACI318_14_EARTH]),
+              ("5.3.1g", [{"D": 0.9, "F": 0.9}, _EARTHQUAKE, _ACI318_14_EARTH])]
+
+_ACI318_10_EARTH = ({"H": 1.6}, {"H": 0.0})
+_ACI318_10 = [("9-1", [{"D": 1.4, "F": 1.4}]),
+              ("9-2", [{"D": 1.2, "F": 1.2, "L": 1.6}, _ROOF, _ACI318_10_EARTH]),
+              ("9-3", [{"D": 1.2}, ({"Lr": 1.6}, {"S": 1.6}, {"R": 1.6}), ({"L": 1.0}, {"W": 0.8}, {"W": -0.8})]),
+              ("9-4", [{"D": 1.2, "L": 1.0}, ({"W": 1.6}, {"W": -1.6}), _ROOF]),
+              ("9-5", [{"D": 1.2, "L": 1.0, "S": 0.2}, _EARTHQUAKE]),
+              ("9-6", [{"D": 0.9}, ({"W": 1.6}, {"W": -1.6}), _ACI318_10_EARTH]),
+              ("9-7", [{"D": 0.9}, _EARTHQUAKE, _ACI318_10_EARTH])]
+
+CODE_EQUATIONS = {CodeType.ACI318_10: _ACI318_10, CodeType.ACI318_14: _ACI318_14, CodeType.ACI318_19: _ACI318_14}
+
+
+class LoadCase:
+    """A basic load case: lateral loads of a model (LinearLoad, EarthPressureLoad, PointForce) of one category."""
+
+    def __init__(self, name="Dead", category="D", loads=None):
+        if category not in CATEGORIES:
+            raise ValueError("Unknown load category: {}".format(category))
+        self.name = name
+        self.category = category  # D, F, L, H, Lr, S, R, W, E, see CATEGORIES
+        self.loads = [] if loads is None else loads  # unfactored loads
+
+
+class LoadCombination:
+    """A factored load combination: load factors of load categories."""
+
+    def __init__(self, name, factors, label=None):
+        self.name = name
+        self.factors = factors  # category -> load factor; categories left out have a factor of 0
+        self.label = label  # equation of a code combination, e.g. "5.3.1b"; None for others
+
+    def __repr__(self):
+        return "LoadCombination({!r})".format(self.name)
+
+
+def get_combination_name(_label, _factors):
+    """Returns the name of a combination, e.g. "(5.3.1b) 1.2D + 1.6L + 0.5S"."""
+    _terms = ["{:g}{}".format(_factors[_category], _category) for _category in CATEGORIES
+              if _factors.get(_category, 0.0) != 0.0]
+    return "({}) {}".format(_label, " + ".join(_terms).replace("+ -", "- "))
+
+
+def get_code_combinations(_code):
+    """Returns the strength design LoadCombinations of a code, given as a CodeType or a Code class."""
+    _code_type = getattr(_code, "cType", _code)
+    if _code_type not in CODE_EQUATIONS:
+        raise ValueError("No load combinations for code: {}".format(_code))
+    _combinations = []
+    for _label, _terms in CODE_EQUATIONS[_code_type]:
+        _choices = [_term if isinstance(_term, tuple) else (_term,) for _term in _terms]
+        for _choice in product(*_choices):
+            _factors = {}
+            for _term in _choice:
+                _factors.update(_term)
+            _combinations.append(LoadCombination(get_combination_name(_label, _factors), _factors, _label))
+    return _combinations
+
+
+def get_present_combination(_combination, _categories):
+    """Returns a code combination with the factors and name of only the given load categories."""
+    _factors = {_category: _factor for _category, _factor in _combination.factors.items() if _category in _categories}
+    if _combination.label is None:
+        return LoadCombination(_combination.name, _factors)
+    return LoadCombination(get_combination_name(_combination.label, _factors), _factors, _combination.label)
+
+
+def get_factor_matrix(_cases, _combinations):
+    """Returns the (k x c) load factors of k load cases in c combinations."""
+    return np.array([[_combination.factors.get(_case.category, 0.0) for _combination in _combinations]
+                     for _case in _cases], dtype=float).reshape(len(_cases), len(_combinations))
+
+
+def combine_results(_results, _factors):
+    """Returns ElementResults of combinations of load cases solved together, given (k x c) load factors."""
+    # every result is linear in the loads: one matrix product per array, over the trailing case axis
+    return ElementResults(_results.x, _results.deflection @ _factors, _results.rotation @ _factors,
+                          _results.element_moments @ _factors, _results.nodal_moments @ _factors,
+                          _results.element_shears @ _factors, _results.nodal_shears @ _factors)
+
+
+class CombinationAnalysis:
+    """Results and envelopes of factored load combinations of the load cases of a WallModel."""
+    # The loads of the model itself are left out; every load case holds its own loads.
+    # Combinations that give the same load factors on the given cases, e.g. those that
+    # differ only in snow when there is no snow case, are kept once, and code combinations
+    # are named after the categories of the given cases only.
+
+    def __init__(self, _model, _cases, _combinations=None, _code=None, _mesh=None):
+        if _model.cracked_sections:
+            raise ValueError("Load combinations need a linear analysis, without cracked sections.")
+        if _model.dredge_level is not None and _model.soil_springs == "nonlinear":
+            raise ValueError("Load combinations need a linear analysis, with linear soil springs.")
+        if not _cases:
+            raise ValueError("Load combinations need at least one load case.")
+        self.model = _model
+        self.cases = list(_cases)
+        if _combinations is None:
+            _combinations = get_code_combinations(_code if _code is not None else self.get_code())
+        _factors = get_factor_matrix(self.cases, _combinations)
+        _, _unique = np.unique(_factors, axis=1, return_index=True)
+        _unique = np.sort(_unique)
+        _categories = set(_case.category for _case in self.cases)
+        self.combinations = [get_present_combination(_combinations[_i], _categories) for _i in _unique]
+        self.factors = _factors[:, _unique]  # (k x c)
+        self.mesh = _model.build_mesh() if _mesh is None else _mesh
+        self.analysis = None
+        self.case_results = None  # ElementResults of the load cases, one column per case
+
+    def get_code(self):
+        """Returns the code of the wall segments of the model (ACI 318-14 without segments)."""
+        _codes = set(_wall.material.code.cType for _wall in self.model.segments)
+        if len(_codes) > 1:
+            raise ValueError("All wall segments of a model must use the same structural code.")
+        return _codes.pop() if _codes else CodeType.ACI318_14
+
+    def solve(self):
+        """Solves all load cases together with one factorisation; returns their ElementResults."""
+        if self.case_results is None:
+            _fixed_end_forces = get_empty_fixed_end_forces(self.mesh, len(self.cases))
+            _loads = np.stack([self.model.get_load_matrix(self.mesh, _case.loads, _fixed_end_forces[:, :, k])
+                               for k, _case in enumerate(self.cases)], axis=1)
+            self.analysis = self.model.get_analysis(self.mesh)
+            self.case_results = self.analysis.get_element_results(self.analysis.solve(_loads), _fixed_end_forces)
+        return self.case_results
+
+    def get_results(self):
+        """Returns ElementResults of the combinations, one column per combination."""
+        return combine_results(self.solve(), self.factors)
+
+    def get_envelope(self, _quantities=None):
+        """Returns the Envelope of the combinations; governing cases index self.combinations."""
+        return self.get_results().get_envelope(_quantities)
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,140 @@
+# Symmetric supports, springs, props and prescribed displacements.
+#
+# set_nodal_boundary_conditions replaces the rows of restrained dofs by unit rows, which
+# leaves the matrix unsymmetric. Constraints instead eliminate restrained dofs in place:
+#
+#   K[d, :] = K[:, d] = 0,  K[d, d] = 1,  f = f - K u0,  f[d] = u0[d]
+#
+# where u0 holds the prescribed displacements (zero for supports). The free dofs keep their
+# own equations, the matrix stays symmetric, and as springs and props only add symmetric
+# positive stiffness, a restrained wall gives a symmetric positive definite matrix that is
+# factorised by Cholesky, dense or banded (see LinearAnalysis.factorize).
+
+import numpy as np
+from structural.banded import BlockTridiagonalMatrix, set_banded_restrained_dofs
+from structural.loads import get_node_positions, get_shape_functions
+
+# dofs of a node restrained by every support condition: 0 displacement, 1 rotation
+SUPPORT_DOFS = {"fixed": (0, 1), "pinned": (0,), "guided": (1,), "free": ()}
+
+
+class Constraints:
+    """Supports, nodal springs, props within elements and prescribed displacements of a chain of beam elements."""
+
+    def __init__(self, _num_nodes):
+        self.num_nodes = _num_nodes
+        self.prescribed = np.full(2 * _num_nodes, np.nan)  # prescribed displacement (m, rad) per dof, nan if free
+        self.springs = np.zeros(2 * _num_nodes)  # nodal spring stiffness per dof, N/m or Nm/rad
+        self.prop_elements = []  # element of every prop
+        self.prop_matrices = []  # 4 x 4 stiffness of every prop, on the dofs of its element
+
+    def copy(self):
+        _copy = Constraints(self.num_nodes)
+        _copy.prescribed = self.prescribed.copy()
+        _copy.springs = self.springs.copy()
+        _copy.prop_elements = list(self.prop_elements)
+        _copy.prop_matrices = list(self.prop_matrices)
+        return _copy
+
+    def _get_nodes(self, _nodes):
+        _nodes = np.atleast_1d(np.asarray(_nodes))
+        if _nodes.dtype.kind not in "iu" or np.any((_nodes < 0) | (_nodes >= self.num_nodes)):
+            raise ValueError("Nodes {} are not all nodes of the {} nodes.".format(_nodes.tolist(), self.num_nodes))
+        return _nodes
+
+    def add_support(self, _nodes, _condition="fixed"):
+        """Restrains one or more nodes; condition: fixed, pinned (displacement), guided (rotation), free."""
+        # a support keeps any displacement prescribed at its dofs, e.g. a settlement
+        if _condition not in SUPPORT_DOFS:
+            raise ValueError("Unknown support condition: {}".format(_condition))
+        _nodes = self._get_nodes(_nodes)
+        for _dof in SUPPORT_DOFS[_condition]:
+            _dofs = 2 * _nodes + _dof
+            self.prescribed[_dofs] = np.where(np.isnan(self.prescribed[_dofs]), 0.0, self.prescribed[_dofs])
+        return self
+
+    def prescribe(self, _nodes, _displacement=None, _rotation=None):
+        """Prescribes the displacement (m) and/or rotation (rad) of one or more nodes."""
+        _nodes = self._get_nodes(_nodes)
+        if _displacement is not None:
+            self.prescribed[2 * _nodes] = _displacement
+        if _rotation is not None:
+            self.prescribed[2 * _nodes + 1] = _rotation
+        return self
+
+    def add_spring(self, _nodes, _stiffness, _rotational=False):
+        """Adds lateral (N/m) or rotational (Nm/rad) springs at one or more nodes."""
+        _nodes = self._get_nodes(_nodes)
+        _stiffness = np.broadcast_to(np.asarray(_stiffness, dtype=float), _nodes.shape)
+        if np.any(_stiffness < 0):
+            raise ValueError("Spring stiffness must not be negative.")
+        np.add.at(self.springs, 2 * _nodes + int(_rotational), _stiffness)
+        return self
+
+    def add_prop(self, _beam_elements, _depth, _stiffness):
+        """Adds an elastic prop (N/m) at any depth, spread to the dofs of its element by the beam shape functions."""
+        # k N N^T is the stiffness of a spring at local coordinate xi of the element
+        if _stiffness < 0:
+            raise ValueError("Prop stiffness must not be negative.")
+        _positions = get_node_positions(_beam_elements)
+        if not _positions[0] <= _depth <= _positions[-1]:
+            raise ValueError("Prop at {} m is outside the wall, {} to {} m.".format(_depth, _positions[0],
+                                                                                  _positions[-1]))
+        _element = int(np.clip(np.searchsorted(_positions, _depth, side="right") - 1, 0, len(_positions) - 2))
+        _L = _positions[_element + 1] - _positions[_element]
+        _shape = get_shape_functions(np.array((_depth - _positions[_element]) / _L), _L)
+        self.prop_elements.append(_element)
+        self.prop_matrices.append(_stiffness * np.outer(_shape, _shape))
+        return self
+
+    @property
+    def restrained_dofs(self):
+        return np.flatnonzero(~np.isnan(self.prescribed))
+
+    def get_prescribed_displacements(self):
+        """Returns prescribed displacements per dof, zero where free."""
+        return np.nan_to_num(self.prescribed)
+
+    def add_stiffness(self, _matrix):
+        """Adds the stiffness of springs and props to a dense or banded global matrix."""
+        if isinstance(_matrix, BlockTridiagonalMatrix):
+            _matrix.diagonal[:, 0, 0] += self.springs[0::2]
+            _matrix.diagonal[:, 1, 1] += self.springs[1::2]
+            if self.prop_elements:
+                _ids = np.array(self.prop_elements)
+                _props = np.array(self.prop_matrices)
+                np.add.at(_matrix.diagonal, _ids, _props[:, 0:2, 0:2])
+                np.add.at(_matrix.diagonal, _ids + 1, _props[:, 2:4, 2:4])
+                np.add.at(_matrix.upper, _ids, _props[:, 0:2, 2:4])
+                np.add.at(_matrix.lower, _ids + 1, _props[:, 2:4, 0:2])
+        else:
+            _matrix[np.diag_indices(len(self.springs))] += self.springs
+            if self.prop_elements:
+                _dofs = 2 * np.array(self.prop_elements)[:, np.newaxis] + np.arange(4)
+                np.add.at(_matrix, (_dofs[:, :, np.newaxis], _dofs[:, np.newaxis, :]), np.array(self.prop_matrices))
+        return _matrix
+
+    def apply(self, _matrix, _loads=None):
+        """Adds springs and props and eliminates restrained dofs, in place; returns the matrix and the loads."""
+        # _loads: a load vector or a (2n x k) block, or None to return the loads of zero
+        # applied forces, i.e. those of the prescribed displacements alone
+        _matrix = self.add_stiffness(_matrix)
+        _restrained = ~np.isnan(self.prescribed)
+        _displacements = self.get_prescribed_displacements()
+        _loads = np.zeros(2 * self.num_nodes) if _loads is None else np.array(_loads, dtype=float)
+        _displacements = _displacements if _loads.ndim == 1 else _displacements[:, np.newaxis]
+        if np.any(_displacements):
+            _loads -= _matrix.dot(_displacements)
+        _loads[_restrained] = _displacements[_restrained]
+
+        if isinstance(_matrix, BlockTridiagonalMatrix):
+            _matrix = set_banded_restrained_dofs(_matrix, _restrained)
+        else:
+            _matrix[_restrained, :] = 0
+            _matrix[:, _restrained] = 0
+            _matrix[_restrained, _restrained] = 1
+        return _matrix, _loads
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,107 @@
+import numpy as np
+from structural.materials import CodeType
+
+STEEL_MODULUS = 200000.0  # modulus of reinforcement, MPa
+
+
+def get_cracking_moment(_fc, _width, _depth, _lightweight=1.0):
+    """Returns cracking moments of rectangular sections, in Nmm (ACI 318, fr = 0.62 lambda sqrt(fc))."""
+    # all arguments may be arrays; dimensions in mm, strengths in MPa
+    _fr = 0.62 * _lightweight * np.sqrt(_fc)
+    return _fr * _width * np.asarray(_depth, dtype=float) ** 2 / 6
+
+
+def get_cracked_moment_of_inertia(_width, _effective_depth, _area, _modular_ratio):
+    """Returns moments of inertia of cracked, singly reinforced rectangular sections, in mm4."""
+    # transformed section with the neutral axis at k d, and concrete in tension ignored
+    _rho_n = _modular_ratio * _area / (_width * _effective_depth)
+    _kd = (np.sqrt(2 * _rho_n + _rho_n ** 2) - _rho_n) * _effective_depth
+    return _width * _kd ** 3 / 3 + _modular_ratio * _area * (_effective_depth - _kd) ** 2
+
+
+def get_effective_moment_of_inertia(_moment, _cracking_moment, _gross, _cracked, _code_type=CodeType.ACI318_14,
+                                    _is_bischoff=None):
+    """Returns effective moments of inertia Ie for service moments Ma; _code_type may be an array of CodeType."""
+    # ACI 318-10/14 (Branson): Ie = (Mcr/Ma)^3 Ig + (1 - (Mcr/Ma)^3) Icr <= Ig
+    # ACI 318-19 (Bischoff): Ie = Icr / (1 - ((2/3) Mcr/Ma)^2 (1 - Icr/Ig)) for Ma > 2/3 Mcr, Ig otherwise
+    # _is_bischoff: where _code_type is ACI 318-19, if already known; it then replaces _code_type
+    if _is_bischoff is None:
+        _is_bischoff = np.asarray(_code_type, dtype=object) == CodeType.ACI318_19
+    _moment = np.abs(np.asarray(_moment, dtype=float))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        _ratio = np.where(_moment > 0, _cracking_moment / _moment, np.inf)
+        _branson = np.where(_ratio >= 1, _gross, _ratio ** 3 * _gross + (1 - _ratio ** 3) * _cracked)
+        _bischoff = np.where(_ratio >= 1.5, _gross,
+                             _cracked / (1 - (2 / 3 * _ratio) ** 2 * (1 - _cracked / _gross)))
+    return np.minimum(np.where(_is_bischoff, _bischoff, _branson), _gross)
+
+
+class CrackedSectionAnalysis:
+    """Serviceability analysis with the effective (cracked) stiffness of reinforced concrete elements."""
+    # Starting from gross sections, the wall is solved, Ie is recalculated for every
+    # element from its largest end moment, and elements whose Ie changed are updated in
+    # the analysis, until no Ie changes by more than tolerance (relative to Ig). The
+    # analysis must be built on a BeamMesh of rectangular sections; stiffness changes are
+    # applied incrementally through LinearAnalysis.set_moments_of_inertia.
+
+    def __init__(self, _analysis, _reinforcement_area, _cover=50.0):
+        self.analysis = _analysis  # LinearAnalysis (or SpringAnalysis) of a BeamMesh
+        self.reinforcement_area = _reinforcement_area  # tension steel per element (or for all), mm2
+        self.cover = _cover  # depth of the steel centroid from the tension face, mm
+        self.tolerance = 0.001
+        self.max_iterations = 30
+        self.history = []  # (iteration, largest relative change of Ie, number of elements updated)
+
+        _mesh = _analysis.elements
+        _sections = _mesh.sections
+        _materials = _mesh.materials
+        self.width = np.array([_s.width for _s in _sections], dtype=float)[_mesh.section_index]
+        self.depth = np.array([_s.depth for _s in _sections], dtype=float)[_mesh.section_index]
+        _fc = np.array([_m.CompressionStrength for _m in _materials], dtype=float)[_mesh.material_index]
+        _lightweight = np.array([_m.LightweightFactor for _m in _materials], dtype=float)[_mesh.material_index]
+        _modulus = np.array([_m.get_modulus() for _m in _materials], dtype=float)[_mesh.material_index]
+        self.code_type = np.array([_m.code.cType for _m in _materials], dtype=object)[_mesh.material_index]
+        self.is_bischoff = self.code_type == CodeType.ACI318_19  # Ie of ACI 318-19, else of 318-10/14
+
+        self.gross = self.width * self.depth ** 3 / 12  # mm4
+        self.cracking_moment = get_cracking_moment(_fc, self.width, self.depth, _lightweight)  # Nmm
+        _area = np.broadcast_to(np.asarray(_reinforcement_area, dtype=float), self.width.shape)
+        self.cracked = np.minimum(get_cracked_moment_of_inertia(self.width, self.depth - _cover, _area,
+                                                                STEEL_MODULUS / _modulus), self.gross)
+        self.effective = self.gross.copy()
+
+    def get_effective_moment_of_inertia(self, _results):
+        """Returns Ie of every element for the element end moments of ElementResults, in mm4."""
+        _moment = 1e6 * np.max(np.abs(_results.element_moments), axis=1)  # convert kNm to Nmm
+        return get_effective_moment_of_inertia(_moment, self.cracking_moment, self.gross, self.cracked,
+                                               _is_bischoff=self.is_bischoff)
+
+    def run(self, _loads, _initial=None, _fixed_end_forces=None):
+        """Iterates to the effective stiffness for a load vector; returns displacements and ElementResults."""
+        # _initial: displacements of an earlier solution, e.g. on a coarser mesh, to start Ie from
+        # _fixed_end_forces: element loads of _loads, see compute_element_results
+        self.history = []
+        if _initial is not None:
+            _results = self.analysis.get_element_results(_initial, _fixed_end_forces)
+            _effective = self.get_effective_moment_of_inertia(_results)
+            _ids = np.flatnonzero(np.abs(_effective - self.effective) / self.gross > self.tolerance)
+            if len(_ids):
+                self.effective[_ids] = _effective[_ids]
+                self.analysis.set_moments_of_inertia(_ids, self.effective[_ids] / 1000 ** 4)  # convert to m4
+        for i in range(1, self.max_iterations + 1):
+            _displacements = self.analysis.solve(_loads)
+            _results = self.analysis.get_element_results(_displacements, _fixed_end_forces)
+            _effective = self.get_effective_moment_of_inertia(_results)
+            _change = np.abs(_effective - self.effective) / self.gross
+            _ids = np.flatnonzero(_change > self.tolerance)
+            self.history.append((i, float(_change.max()), len(_ids)))
+            if len(_ids) == 0:
+                return _displacements, _results
+            self.effective[_ids] = _effective[_ids]
+            self.analysis.set_moments_of_inertia(_ids, self.effective[_ids] / 1000 ** 4)  # convert to m4
+
+        raise RuntimeError("Effective stiffness did not converge in {} iterations.".format(self.max_iterations))
+
+
+if __name__ == '__main__':
+    pass
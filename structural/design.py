@@ -0,0 +1,280 @@
+# Reinforcement design of rectangular wall sections, vectorised over nodes.
+#
+# Every function takes arrays that broadcast together, one value per node (and, for a
+# batch of walls, a trailing axis per wall), so a whole site is designed in one call.
+# Units: moments in kNm and shears in kN (as in ElementResults), dimensions in mm,
+# strengths in MPa, steel areas in mm2 over the section width.
+#
+# Flexure, with the rectangular stress block (ACI 318):
+#
+#   phi Mn = phi As fy (d - a/2),  a = As fy / (0.85 fc b)
+#   As = 0.85 fc b d / fy (1 - sqrt(1 - 2 Rn / (0.85 fc))),  Rn = Mu / (phi b d^2)
+#
+# The area is required with phi = 0.9, with no solution (nan) where the section is too thin.
+# The strength of the bars provided takes phi from the net tensile strain of the steel,
+#
+#   et = 0.003 (d - c) / c,  c = a / beta1,  beta1 = 0.85 - 0.05 (fc - 28) / 7, 0.65 to 0.85
+#   phi = 0.65 + 0.25 (et - ety) / (0.005 - ety), 0.65 to 0.9,  ety = fy / Es   (21.2.2)
+#
+# so a section that is not tension controlled (et < 0.005) is weaker than required, and
+# sections with et < 0.004 exceed the maximum reinforcement of one-way slabs and walls
+# (ACI 318-14/19 7.3.3.1, 318-10 10.3.5); both are not adequate. The minimum is that of one-way
+# slabs (ACI 318-19 7.6.1.1: 0.0018 Ag; ACI 318-10 7.12.2.1, 318-14 7.6.1.1: 0.0020 Ag for
+# fy < 420 MPa, else 0.0018 Ag 420 / fy but at least 0.0014 Ag). Shear, with phi = 0.75:
+#
+#   ACI 318-10/14:  Vc = 0.17 lambda sqrt(fc) b d
+#   ACI 318-19:     Vc = 0.66 lambda_s lambda rho_w^(1/3) sqrt(fc) b d <= 0.42 lambda sqrt(fc) b d,
+#                   lambda_s = sqrt(2 / (1 + 0.004 d)) <= 1   (22.5.5.1, without shear reinforcement)
+#
+# Bars are chosen from a catalogue of bar sizes and spacings, the least area that covers the
+# design area at a spacing of at most min(3h, 450 mm). Along a wall, the largest arrangement
+# of a face runs where more than half of it is needed, extended by max(d, 12 db), and
+# alternate bars are curtailed beyond (ACI 318-14 9.7.3.3, 318-10 12.10.3).
+
+import numpy as np
+from structural.cracking import STEEL_MODULUS
+from structural.materials import CodeType
+
+PHI_FLEXURE = 0.9  # of tension controlled sections, et >= 0.005
+PHI_COMPRESSION = 0.65  # of compression controlled sections, et <= ety
+CONCRETE_STRAIN = 0.003  # crushing strain of concrete
+MIN_TENSILE_STRAIN = 0.004  # net tensile strain at the maximum reinforcement
+PHI_SHEAR = 0.75
+REINFORCEMENT_STRENGTH = 420.0  # fy of Grade 420 bars, MPa
+MAX_SPACING = 450.0  # largest spacing of flexural bars, mm
+
+# ASTM A615M bars: nominal diameter (mm) and area (mm2)
+BAR_SIZES = {"#10": (9.5, 71.0), "#13": (12.7, 129.0), "#16": (15.9, 199.0), "#19": (19.1, 284.0),
+             "#22": (22.2, 387.0), "#25": (25.4, 510.0), "#29": (28.7, 645.0), "#32": (32.3, 819.0),
+             "#36": (35.8, 1006.0)}
+BAR_SPACINGS = (100, 125, 150, 175, 200, 225, 250, 300, 350, 400, 450)  # mm
+
+
+def _is_code(_code_type, _type):
+    # _code_type may be a single CodeType or an array of them
+    return np.asarray(_code_type, dtype=object) == _type
+
+
+class BarCatalogue:
+    """Arrangements of bars: every bar size at every spacing, ordered by area per m of wall."""
+
+    def __init__(self, _bars=None, _spacings=BAR_SPACINGS):
+        _bars = BAR_SIZES if _bars is None else _bars  # name -> (diameter, area)
+        _names, _spacings = np.meshgrid(np.array(list(_bars)), np.asarray(_spacings, dtype=float), indexing="ij")
+        _diameters = np.array([_bars[_name][0] for _name in _names.ravel()], dtype=float)
+        _areas = np.array([_bars[_name][1] for _name in _names.ravel()], dtype=float) * 1000 / _spacings.ravel()
+        # by area, and equal areas by the larger spacing (fewer bars) first
+        _order = np.lexsort((-_spacings.ravel(), _areas))
+        self.names = _names.ravel()[_order]
+        self.diameters = _diameters[_order]
+        self.spacings = _spacings.ravel()[_order]
+        self.areas = _areas[_order]  # mm2 per m of wall
+
+    def __len__(self):
+        return len(self.areas)
+
+    def select(self, _areas, _max_spacings):
+        """Returns the index of the least arrangement of at least the areas (mm2/m) at every node, -1 if none."""
+        _areas, _max_spacings = np.broadcast_arrays(np.asarray(_areas, dtype=float), _max_spacings)
+        _choice = np.full(_areas.shape, -1)
+        # nodes are grouped by the largest spacing they allow; within a group the
+        # arrangements stay ordered by area, so every node is one binary search
+        _limits = np.unique(self.spacings)
+        _levels = np.searchsorted(_limits, _max_spacings, side="right")
+        for _level in np.unique(_levels[_levels > 0]):
+            _ids = np.flatnonzero(self.spacings <= _limits[_level - 1])
+            _nodes = _levels == _level
+            _positions = np.searchsorted(self.areas[_ids], _areas[_nodes])
+            _found = _positions < len(_ids)
+            _choice[_nodes] = np.where(_found, _ids[np.minimum(_positions, len(_ids) - 1)], -1)
+        return _choice
+
+
+def get_minimum_area(_width, _depth, _code_type=CodeType.ACI318_14, _fy=REINFORCEMENT_STRENGTH, _is_aci19=None):
+    """Returns the minimum flexural reinforcement of one-way slabs and walls, in mm2."""
+    # _is_aci19: where _code_type is ACI 318-19, if already known; it then replaces _code_type
+    _is_aci19 = _is_code(_code_type, CodeType.ACI318_19) if _is_aci19 is None else _is_aci19
+    _gross = np.asarray(_width, dtype=float) * _depth
+    _ratio = np.where(np.asarray(_fy) < 420, 0.0020, np.maximum(0.0018 * 420 / np.asarray(_fy, dtype=float), 0.0014))
+    return np.where(_is_aci19, 0.0018, _ratio) * _gross
+
+
+def get_required_area(_moment, _width, _effective_depth, _fc, _fy=REINFORCEMENT_STRENGTH):
+    """Returns tension reinforcement (mm2) for the magnitude of factored moments (kNm), with phi = 0.9."""
+    # nan where the section is too thin
+    _moment = 1e6 * np.abs(np.asarray(_moment, dtype=float))  # convert to Nmm
+    _bd = np.asarray(_width, dtype=float) * _effective_depth
+    _rn = _moment / (PHI_FLEXURE * _bd * _effective_depth)
+    with np.errstate(invalid="ignore"):
+        return 0.85 * _fc * _bd / _fy * (1 - np.sqrt(1 - 2 * _rn / (0.85 * np.asarray(_fc, dtype=float))))
+
+
+def get_tensile_strain(_area, _width, _effective_depth, _fc, _fy=REINFORCEMENT_STRENGTH):
+    """Returns the net tensile strain et of the steel of singly reinforced sections at their nominal strength."""
+    # inf where there is no steel
+    _fc = np.asarray(_fc, dtype=float)
+    _beta = np.clip(0.85 - 0.05 * (_fc - 28) / 7, 0.65, 0.85)
+    _c = _area * _fy / (0.85 * _fc * _width) / _beta
+    with np.errstate(divide="ignore"):
+        return CONCRETE_STRAIN * (_effective_depth - _c) / _c
+
+
+def get_flexure_factor(_strain, _fy=REINFORCEMENT_STRENGTH):
+    """Returns phi of flexure for net tensile strains et, from 0.65 at et <= ety to 0.9 at et >= 0.005."""
+    _yield = np.asarray(_fy, dtype=float) / STEEL_MODULUS
+    _phi = PHI_COMPRESSION + (PHI_FLEXURE - PHI_COMPRESSION) * (_strain - _yield) / (0.005 - _yield)
+    return np.clip(_phi, PHI_COMPRESSION, PHI_FLEXURE)
+
+
+def get_moment_capacity(_area, _width, _effective_depth, _fc, _fy=REINFORCEMENT_STRENGTH):
+    """Returns design moment strengths phi Mn of singly reinforced sections, in kNm."""
+    _a = _area * _fy / (0.85 * np.asarray(_fc, dtype=float) * _width)
+    _phi = get_flexure_factor(get_tensile_strain(_area, _width, _effective_depth, _fc, _fy), _fy)
+    return _phi * _area * _fy * (_effective_depth - _a / 2) / 1e6
+
+
+def get_shear_capacity(_width, _effective_depth, _fc, _area=0.0, _code_type=CodeType.ACI318_14, _lightweight=1.0,
+                       _is_aci19=None):
+    """Returns design shear strengths phi Vc of sections without shear reinforcement, in kN."""
+    # sqrt(fc) is limited to 8.3 MPa (ACI 318 22.5.3.1); _is_aci19 as in get_minimum_area
+    _is_aci19 = _is_code(_code_type, CodeType.ACI318_19) if _is_aci19 is None else _is_aci19
+    _root = np.minimum(np.sqrt(np.asarray(_fc, dtype=float)), 8.3)
+    _bd = np.asarray(_width, dtype=float) * _effective_depth
+    _simple = 0.17 * _lightweight * _root * _bd
+    _size = np.minimum(np.sqrt(2 / (1 + 0.004 * np.asarray(_effective_depth, dtype=float))), 1.0)
+    _detailed = np.minimum(0.66 * _size * _lightweight * np.cbrt(_area / _bd) * _root * _bd,
+                           0.42 * _lightweight * _root * _bd)
+    return PHI_SHEAR * np.where(_is_aci19, _detailed, _simple) / 1000
+
+
+def get_full_bars(_x, _design_area, _provided, _extension):
+    """Returns where the largest arrangement of a face must run in full, along the first axis of the arrays."""
+    # more than half of it is needed at a node, or within the extension beyond such a node
+    _provided = np.max(_provided, axis=0)
+    _needed = _design_area > 0.5 * _provided
+    _x = np.asarray(_x, dtype=float).reshape(np.shape(_x) + (1,) * (_needed.ndim - 1))
+    _x = np.broadcast_to(_x, _needed.shape)
+    _extension = np.broadcast_to(_extension, _needed.shape)
+    _index = np.arange(len(_needed)).reshape((-1,) + (1,) * (_needed.ndim - 1))
+    # nearest needed node above and below every node, -1 / n where there is none
+    _above = np.maximum.accumulate(np.where(_needed, _index, -1), axis=0)
+    _below = np.minimum.accumulate(np.where(_needed, _index, len(_needed))[::-1], axis=0)[::-1]
+    _full = _needed.copy()
+    for _nearest in (_above, _below):
+        _valid = (_nearest >= 0) & (_nearest < len(_needed))
+        _nearest = np.clip(_nearest, 0, len(_needed) - 1)
+        _distance = np.abs(_x - np.take_along_axis(_x, _nearest, axis=0))
+        _full |= _valid & (_distance <= np.take_along_axis(_extension, _nearest, axis=0))
+    return _full
+
+
+def get_curtailment_points(_x, _full_bars):
+    """Returns depths of a single wall where alternate bars stop or start, the ends of the runs of full bars."""
+    _x = np.asarray(_x, dtype=float)
+    _changes = np.flatnonzero(np.diff(_full_bars.astype(int)))
+    # the last node of a run that ends, or the first node of a run that starts
+    return np.where(_full_bars[_changes], _x[_changes], _x[_changes + 1])
+
+
+class DesignResults:
+    """Reinforcement of one face at every node: required and provided areas, bars and utilisation."""
+    # areas in mm2 over the section width, capacities in kNm and kN; a bar index of -1 and
+    # a provided area of 0 mark nodes where the section is too thin or no bar fits
+
+    def __init__(self, _required_area, _minimum_area, _bars, _catalogue, _provided_area, _tensile_strain,
+                 _flexure_factor, _moment_capacity, _shear_capacity, _required_shear_area, _flexural_utilisation,
+                 _shear_utilisation, _adequate):
+        self.required_area = _required_area  # for the factored moment, nan if the section is too thin
+        self.minimum_area = _minimum_area
+        self.design_area = np.fmax(_required_area, _minimum_area)
+        self.bars = _bars  # index into the catalogue
+        self.bar_names = np.where(_bars >= 0, _catalogue.names[_bars], "")
+        self.bar_diameters = np.where(_bars >= 0, _catalogue.diameters[_bars], 0.0)
+        self.spacings = np.where(_bars >= 0, _catalogue.spacings[_bars], 0.0)
+        self.provided_area = _provided_area
+        self.tensile_strain = _tensile_strain  # et of the provided bars, inf where there are none
+        self.flexure_factor = _flexure_factor  # phi of the provided bars
+        self.moment_capacity = _moment_capacity  # phi Mn of the provided bars
+        self.shear_capacity = _shear_capacity  # phi Vc
+        self.required_shear_area = _required_shear_area  # Av / s, mm2 per m of height; 0 where concrete suffices
+        self.flexural_utilisation = _flexural_utilisation  # Mu / phi Mn
+        self.shear_utilisation = _shear_utilisation  # Vu / phi Vc
+        self.utilisation = np.maximum(_flexural_utilisation, _shear_utilisation)
+        # bars found, within phi Mn and the maximum reinforcement, and shear within phi (Vc + 0.66 sqrt(fc) b d)
+        self.adequate = _adequate
+        self.full_bars = None  # nodes where the arrangement runs in full, see design_sections
+        self.curtailment = None  # depths where alternate bars stop or start, for a single wall
+
+
+def design_sections(_moments, _shears, _width, _depth, _fc, _code_type=CodeType.ACI318_14, _cover=50.0,
+                    _fy=REINFORCEMENT_STRENGTH, _lightweight=1.0, _catalogue=None, _x=None):
+    """Designs the tension reinforcement of one face for factored moments (kNm) and shears (kN) at every node."""
+    # _cover: depth of the bar centroid from the tension face; with node depths _x (m) along
+    # the first axis, also finds where alternate bars may be curtailed
+    _catalogue = BarCatalogue() if _catalogue is None else _catalogue
+    _moments, _shears, _width, _depth, _fc = np.broadcast_arrays(
+        np.abs(np.asarray(_moments, dtype=float)), np.abs(np.asarray(_shears, dtype=float)),
+        np.asarray(_width, dtype=float), np.asarray(_depth, dtype=float), np.asarray(_fc, dtype=float))
+    _d = _depth - _cover
+    _is_aci19 = _is_code(_code_type, CodeType.ACI318_19)
+
+    _required = get_required_area(_moments, _width, _d, _fc, _fy)
+    _minimum = np.broadcast_to(get_minimum_area(_width, _depth, _fy=_fy, _is_aci19=_is_aci19), _moments.shape)
+    _bars = _catalogue.select(np.fmax(_required, _minimum) * 1000 / _width, np.minimum(3 * _depth, MAX_SPACING))
+    _bars = np.where(np.isnan(_required), -1, _bars)
+    _provided = np.where(_bars >= 0, _catalogue.areas[_bars] * _width / 1000, 0.0)
+
+    _strain = get_tensile_strain(_provided, _width, _d, _fc, _fy)
+    _phi = get_flexure_factor(_strain, _fy)
+    _moment_capacity = get_moment_capacity(_provided, _width, _d, _fc, _fy)
+    _shear_capacity = get_shear_capacity(_width, _d, _fc, _provided, _lightweight=_lightweight, _is_aci19=_is_aci19)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        _flexure = np.where(_moments > 0, _moments / _moment_capacity, 0.0)
+        _shear = np.where(_shears > 0, _shears / _shear_capacity, 0.0)
+    _flexure = np.where(_bars >= 0, _flexure, np.inf)
+    # Av / s = (Vu / phi - Vc) / (fy d), with Vs at most 0.66 sqrt(fc) b d (ACI 318 22.5.1.2)
+    _steel_shear = np.maximum(1000 * (_shears - _shear_capacity) / PHI_SHEAR, 0.0)
+    _shear_area = 1000 * _steel_shear / (_fy * _d)
+    _adequate = (_bars >= 0) & (_flexure <= 1) & (_strain >= MIN_TENSILE_STRAIN)
+    _adequate &= _steel_shear <= 0.66 * np.sqrt(_fc) * _width * _d
+
+    _results = DesignResults(_required, _minimum, _bars, _catalogue, _provided, _strain, _phi, _moment_capacity,
+                             _shear_capacity, _shear_area, _flexure, _shear, _adequate)
+    if _x is not None:
+        _extension = np.maximum(_d, 12 * _results.bar_diameters) / 1000  # convert to m
+        _results.full_bars = get_full_bars(_x, _results.design_area, _provided, _extension)
+        if _results.full_bars.ndim == 1:
+            _results.curtailment = get_curtailment_points(_x, _results.full_bars)
+    return _results
+
+
+def get_node_sections(_mesh):
+    """Returns width, depth (mm), fc (MPa), lightweight factor and CodeType at every node of a mesh."""
+    # a node takes the thinner of its two elements, e.g. at a change of wall thickness
+    _width = np.array([_s.width for _s in _mesh.sections], dtype=float)[_mesh.section_index]
+    _depth = np.array([_s.depth for _s in _mesh.sections], dtype=float)[_mesh.section_index]
+    _nodes = np.arange(_mesh.num_nodes)
+    _above = np.maximum(_nodes - 1, 0)
+    _below = np.minimum(_nodes, _mesh.num_elements - 1)
+    _ids = np.where(_depth[_above] <= _depth[_below], _above, _below)
+    _materials = _mesh.materials
+    _fc = np.array([_m.CompressionStrength for _m in _materials], dtype=float)[_mesh.material_index]
+    _lightweight = np.array([_m.LightweightFactor for _m in _materials], dtype=float)[_mesh.material_index]
+    _code_type = np.array([_m.code.cType for _m in _materials], dtype=object)[_mesh.material_index]
+    return _width[_ids], _depth[_ids], _fc[_ids], _lightweight[_ids], _code_type[_ids]
+
+
+def design_wall(_mesh, _envelope, _cover=50.0, _fy=REINFORCEMENT_STRENGTH, _catalogue=None):
+    """Designs both faces of a wall for an Envelope of factored results; returns DesignResults by face."""
+    # positive moments put the "positive" face in tension, negative moments the other one;
+    # both faces take the largest shear of either sign
+    _width, _depth, _fc, _lightweight, _code_type = get_node_sections(_mesh)
+    _shears = np.maximum(np.abs(_envelope.maxima["nodal_shears"]), np.abs(_envelope.minima["nodal_shears"]))
+    _moments = {"positive": np.maximum(_envelope.maxima["nodal_moments"], 0.0),
+                "negative": np.maximum(-_envelope.minima["nodal_moments"], 0.0)}
+    return {_face: design_sections(_moments[_face], _shears, _width, _depth, _fc, _code_type, _cover, _fy,
+                                   _lightweight, _catalogue, _mesh.y) for _face in _moments}
+
+
+if __name__ == '__main__':
+    pass
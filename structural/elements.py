@@ -1,7 +1,9 @@
 from math import sin, radians, pi
 from enum import Enum
+from functools import lru_cache
+from structural.instrument import instrumented
 from structural.matrices import assemble_local_matrix
-from structural.materials import Concrete, Aci31814
+from structural.materials import Aci31814, get_concrete
 
 
 class ProjectUnits:
@@ -33,12 +35,28 @@ class Shape(Enum):
 
 
 class RectangularSection:
+    """Rectangular cross section, dimensions in mm. Instances are immutable, see get_rectangular_section."""
+    __slots__ = ("name", "width", "depth", "area", "Izz")
+
     def __init__(self, _width, _depth):
-        self.name = 'REC_{}x{}'.format(_width, _depth)
-        self.width = _width
-        self.depth = _depth
-        self.area = self.get_section_area()
-        self.Izz = self.get_moment_of_inertia()
+        _set = object.__setattr__
+        _set(self, "name", 'REC_{}x{}'.format(_width, _depth))
+        _set(self, "width", _width)
+        _set(self, "depth", _depth)
+        _set(self, "area", self.get_section_area())
+        _set(self, "Izz", self.get_moment_of_inertia())
+
+    def __setattr__(self, key, value):
+        raise AttributeError("Sections are immutable; create or get another section instead.")
+
+    def __reduce__(self):
+        return self.__class__, (self.width, self.depth)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
 
     def get_moment_of_inertia(self):
         return self.width * self.depth ** 3 / 12
@@ -48,10 +66,26 @@ class RectangularSection:
 
 
 class CircularSection:
+    """Circular cross section, dimensions in mm. Instances are immutable, see get_circular_section."""
+    __slots__ = ("diameter", "area", "Izz")
+
     def __init__(self, _diameter):
-        self.diameter = _diameter
-        self.area = self.get_section_area()
-        self.Izz = self.get_moment_of_inertia()
+        _set = object.__setattr__
+        _set(self, "diameter", _diameter)
+        _set(self, "area", self.get_section_area())
+        _set(self, "Izz", self.get_moment_of_inertia())
+
+    def __setattr__(self, key, value):
+        raise AttributeError("Sections are immutable; create or get another section instead.")
+
+    def __reduce__(self):
+        return self.__class__, (self.diameter,)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
 
     def get_moment_of_inertia(self):
         return pi * self.diameter ** 4 / 64
@@ -60,6 +94,25 @@ class CircularSection:
         return 0.25 * pi * self.diameter ** 2
 
 
+@lru_cache(maxsize=None)
+def get_rectangular_section(_width, _depth):
+    """Returns a shared RectangularSection; equal dimensions always give the same instance."""
+    return RectangularSection(_width, _depth)
+
+
+@lru_cache(maxsize=None)
+def get_circular_section(_diameter):
+    """Returns a shared CircularSection; equal diameters always give the same instance."""
+    return CircularSection(_diameter)
+
+
+def get_flexural_stiffness(_material, _section):
+    """Returns EI of a material and section pair, in Nm2."""
+    _E = _material.get_modulus() * 1000000  # convert to N/m2
+    _I = _section.Izz / (1000 ** 4)  # convert to m4
+    return _E * _I
+
+
 class Alignment(Enum):
     Left = "Left"
     Right = "Right"
@@ -84,6 +137,8 @@ class Wall:
         self.length = 1.0  # unit length of wall segment
         self.alignment = Alignment.Left.value  # wall alignment in relation to the topmost wall segment
         self.material = []  # wall segment material
+        self.reinforcement_area = None  # tension reinforcement, mm2 per unit length, for cracked sections
+        self.cover = 50.0  # depth of the reinforcement centroid from the tension face, mm
 
 
 class UniformLoad:
@@ -96,6 +151,33 @@ class UniformLoad:
         self.length = []  # length of the UDL, measured away from the wall
 
 
+class LinearLoad:
+    """Linearly varying lateral load acting on the wall between two depths."""
+
+    def __init__(self, q1=0.0, q2=0.0, top=0.0, bottom=0.0):
+        self.q1 = q1  # magnitude at the top of the loaded length, in kN/m
+        self.q2 = q2  # magnitude at the bottom of the loaded length, in kN/m
+        self.top = top  # depth of the top of the loaded length, in m
+        self.bottom = bottom  # depth of the bottom of the loaded length, in m
+
+
+class EarthPressureLoad:
+    """Lateral earth pressure acting on the wall, derived from the soil layers of a model."""
+
+    def __init__(self, state="active", factor=1.0):
+        self.state = state  # active, passive, at rest
+        self.factor = factor  # multiplier of the pressures, e.g. -1 to act in the negative direction
+
+
+class Prop:
+    """A prop or anchor at a depth, a lateral spring on a unit length of wall."""
+
+    def __init__(self, name="Prop", depth=0.0, stiffness=1e6):
+        self.name = name
+        self.depth = depth  # m from the top of the wall
+        self.stiffness = stiffness  # kN/m per m of wall
+
+
 class PointForce:
     """Force class. Defines basic properties of force."""
 
@@ -142,6 +224,7 @@ class Soil:
         self.isTopLayer = False
         self.top_offset = 0.0
         self.inclination = 0
+        self.subgrade_modulus = 20000.0  # horizontal modulus of subgrade reaction, kN/m3
 
     def ka(self):
         """Calculates active soil pressure coefficient"""
@@ -177,6 +260,8 @@ class Soil:
 
 
 class Node:
+    __slots__ = ("id", "x", "y")
+
     def __init__(self, _id, _x, _y):
         self.id = _id
         self.x = _x
@@ -184,35 +269,41 @@ class Node:
 
 
 class BeamFiniteElement:
+    __slots__ = ("id", "material", "node1", "node2", "length", "section", "EI", "_stiffness_matrix")
+
     def __init__(self, _id, _node1, _node2):
         self.id = _id
-        self.material = Concrete(Aci31814, "Concrete C35", 35, 25)  # material assigned to the element
+        self.material = get_concrete(Aci31814, "Concrete C35", 35, 25)  # material assigned to the element
         self.node1 = _node1
         self.node2 = _node2
         self.length = self.get_length()
-        self.section = RectangularSection(_width=1000, _depth=500)
+        self.section = get_rectangular_section(1000, 500)
         self.EI = self.get_EI()
-        self.stiffness_matrix = self.get_stiffness_matrix()
+        self._stiffness_matrix = None
+
+    @property
+    def stiffness_matrix(self):
+        # built on first use only
+        if self._stiffness_matrix is None:
+            self._stiffness_matrix = self.get_stiffness_matrix()
+        return self._stiffness_matrix
 
     def get_length(self):
         # calculate length of element from node geometry
         return ((self.node2.y - self.node1.y) ** 2 + (self.node2.x - self.node1.x) ** 2) ** 0.5
 
     def get_EI(self):
-        _E = self.material.get_modulus() * 1000000  # convert to N/m2
-        _I = self.section.get_moment_of_inertia() / (1000 ** 4)  # convert to m4
-        return _E * _I
+        return get_flexural_stiffness(self.material, self.section)
 
     def get_stiffness_matrix(self):
         # assemble local matrix
         return assemble_local_matrix(self.get_length(), self.get_EI())
 
+    @instrumented
     def refresh(self):
         self.length = self.get_length()
-        self.section.Izz = self.section.get_moment_of_inertia()
-        self.section.area = self.section.get_section_area()
         self.EI = self.get_EI()
-        self.stiffness_matrix = self.get_stiffness_matrix()
+        self._stiffness_matrix = None
 
 
 if __name__ == '__main__':
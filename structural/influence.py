@@ -0,0 +1,120 @@
+# Influence lines of a linear wall analysis, for moving loads.
+#
+# Displacements are linear in the loads, u = K^-1 f, so the constrained stiffness is
+# solved once for a basis of unit loads and every later load position is a matrix product:
+#
+#   pressures: a unit pressure (1 kPa) at every node, linear between nodes, gives the
+#              (2n x n) displacements U_p; a pressure profile P (n x k) gives U_p P
+#   forces:    a unit load at every dof gives K^-1, (2n x 2n); a point force at depth y
+#              loads the 4 dofs of its element by the beam shape functions N, and gives
+#              the columns of those dofs times f N
+#
+# Loads are consistent, as those of WallModel.get_load_matrix, so the fixed-end forces of
+# every profile or force (P and f N, without any solve) are subtracted from the element
+# end forces, see compute_element_results.
+#
+# Moments and shears follow from displacements by compute_element_results, which is
+# linear too, so a whole sweep of positions is one solve-free block of results and
+# ElementResults.get_envelope gives its envelopes. The bases take O(n^2) memory and are
+# built on first use.
+
+import numpy as np
+from structural.loads import add_element_linear_loads, get_element_linear_loads, get_node_positions, \
+    get_shape_functions
+from structural.matrices import compute_element_results
+from structural.mesh import get_layer_index
+from structural.pressure import get_strip_surcharge_pressure
+
+
+class InfluenceAnalysis:
+    """Results of moving surcharge strips and point forces on a linear analysis, by influence lines."""
+
+    def __init__(self, _analysis, _surface=0.0, _factor=-1.0):
+        self.analysis = _analysis  # LinearAnalysis, or SpringAnalysis with linear springs
+        self.elements = _analysis.elements
+        self.surface = _surface  # depth of the soil surface behind the wall, m
+        self.factor = _factor  # multiplier of surcharge pressures, e.g. -1 to act in the negative direction
+        self.positions = get_node_positions(self.elements)
+        self.pressure_basis = None  # displacements of unit nodal pressures, (2n x n)
+        self.force_basis = None  # displacements of unit dof loads, (2n x 2n)
+
+    def _solve(self, _loads):
+        """Solves for unit loads alone, leaving out the loads of any prescribed displacements."""
+        _displacements = self.analysis.solve(_loads)
+        if self.analysis.prescribed_loads is not None:
+            _displacements -= self.analysis.solve(np.zeros(len(_loads)))[:, np.newaxis]
+        return _displacements
+
+    def get_pressure_basis(self):
+        """Returns displacements of a unit pressure at every node, one column per node."""
+        if self.pressure_basis is None:
+            _num_nodes = len(self.positions)
+            _unit = np.eye(_num_nodes)
+            _loads = add_element_linear_loads(_unit[:-1], _unit[1:], self.elements,
+                                              np.zeros((2 * _num_nodes, _num_nodes)), True)
+            self.pressure_basis = self._solve(_loads)
+        return self.pressure_basis
+
+    def get_force_basis(self):
+        """Returns displacements of a unit load at every dof, one column per dof."""
+        if self.force_basis is None:
+            self.force_basis = self._solve(1000 * np.eye(2 * len(self.positions)))  # unit kN, in N
+        return self.force_basis
+
+    def get_pressure_results(self, _pressures):
+        """Returns ElementResults of pressure profiles, kPa at every node, with one column per profile."""
+        _pressures = np.asarray(_pressures, dtype=float)
+        _fixed_end_forces = get_element_linear_loads(_pressures[:-1], _pressures[1:], self.elements, True)
+        return compute_element_results(self.get_pressure_basis() @ _pressures, self.elements, _fixed_end_forces)
+
+    def get_strip_pressures(self, _offsets, _widths, _magnitudes):
+        """Returns pressures at every node of surcharge strips, one column per strip; arguments broadcast."""
+        _offsets, _widths, _magnitudes = np.broadcast_arrays(np.atleast_1d(_offsets), _widths, _magnitudes)
+        _depths = (self.positions - self.surface)[:, np.newaxis]
+        return self.factor * get_strip_surcharge_pressure(_depths, _offsets, _widths, _magnitudes)
+
+    def get_strip_results(self, _offsets, _widths, _magnitudes):
+        """Returns ElementResults of surcharge strips (m from the wall, m wide, kPa), one column per strip."""
+        return self.get_pressure_results(self.get_strip_pressures(_offsets, _widths, _magnitudes))
+
+    def get_uniform_load_results(self, _loads):
+        """Returns ElementResults of UniformLoad surcharges (x, length, magnitude), one column per load."""
+        return self.get_strip_results([_load.x for _load in _loads], [_load.length for _load in _loads],
+                                      [_load.magnitude for _load in _loads])
+
+    def get_point_results(self, _depths, _forces):
+        """Returns ElementResults of lateral point forces (kN) at depths (m), one column per force."""
+        _depths, _forces = np.broadcast_arrays(np.atleast_1d(np.asarray(_depths, dtype=float)), _forces)
+        _lengths = np.diff(self.positions)
+        _ids = np.clip(np.searchsorted(self.positions, _depths, side="right") - 1, 0, len(_lengths) - 1)
+        _xi = np.clip((_depths - self.positions[_ids]) / _lengths[_ids], 0, 1)
+        _shape = _forces[:, np.newaxis] * get_shape_functions(_xi, _lengths[_ids])
+        # columns of the 4 dofs of every element, weighted by the shape functions
+        _columns = self.get_force_basis()[:, 2 * _ids[:, np.newaxis] + np.arange(4)]
+        _fixed_end_forces = np.zeros((len(_lengths), 4, len(_ids)))
+        _cases = np.arange(len(_ids))[:, np.newaxis]
+        np.add.at(_fixed_end_forces, (_ids[:, np.newaxis], np.arange(4), _cases), 1000 * _shape)  # in N
+        return compute_element_results(np.einsum("dkj,kj->dk", _columns, _shape), self.elements, _fixed_end_forces)
+
+    def get_strip_envelope(self, _offsets, _widths, _magnitudes):
+        """Returns the Envelope of surcharge strips; governing cases index the broadcast strips."""
+        return self.get_strip_results(_offsets, _widths, _magnitudes).get_envelope()
+
+    def get_point_envelope(self, _depths, _forces):
+        """Returns the Envelope of point forces; governing cases index the broadcast forces."""
+        return self.get_point_results(_depths, _forces).get_envelope()
+
+
+def get_influence_analysis(_model, _mesh=None):
+    """Returns the InfluenceAnalysis of a WallModel, whose analysis must be linear."""
+    if _model.cracked_sections:
+        raise ValueError("Influence lines need a linear analysis, without cracked sections.")
+    if _model.dredge_level is not None and _model.soil_springs == "nonlinear":
+        raise ValueError("Influence lines need a linear analysis, with linear soil springs.")
+    _mesh = _model.build_mesh() if _mesh is None else _mesh
+    _surface = get_layer_index(_model.geology).tops[0] if _model.geology else 0.0
+    return InfluenceAnalysis(_model.get_analysis(_mesh), _surface, _model.get_load_direction())
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,157 @@
+# Opt-in instrumentation of the analysis pipeline.
+#
+# Pipeline stages (stage) and functions (instrumented) record wall-clock time, call
+# counts and the sizes of the arrays they work on. Recording is off by default; while
+# off, a stage is a shared no-op context manager and an instrumented function costs a
+# single flag test before calling through.
+
+import time
+from functools import wraps
+
+# enabled flag and statistics of this process, {name: {"calls", "time", "max_size", "total_size"}}
+_state = {"enabled": False}
+_statistics = {}
+
+
+def enable():
+    """Starts recording."""
+    _state["enabled"] = True
+
+
+def disable():
+    """Stops recording; statistics recorded so far are kept."""
+    _state["enabled"] = False
+
+
+def is_enabled():
+    return _state["enabled"]
+
+
+def reset():
+    """Clears all statistics."""
+    _statistics.clear()
+
+
+def record(_name, _time, _size=None):
+    """Adds a call of a stage or function to the statistics."""
+    _entry = _statistics.get(_name)
+    if _entry is None:
+        _entry = _statistics[_name] = {"calls": 0, "time": 0.0, "max_size": 0, "total_size": 0}
+    _entry["calls"] += 1
+    _entry["time"] += _time
+    if _size is not None:
+        _entry["max_size"] = max(_entry["max_size"], _size)
+        _entry["total_size"] += _size
+
+
+def get_statistics():
+    """Returns a copy of the statistics, {name: {"calls", "time", "max_size", "total_size"}}; times in s."""
+    return {_name: dict(_entry) for _name, _entry in _statistics.items()}
+
+
+def to_json(**kwargs):
+    """Returns the statistics as a JSON string; keyword arguments are passed to json.dumps."""
+    import json
+    return json.dumps(get_statistics(), **kwargs)
+
+
+def export_json(_path):
+    """Writes the statistics to a JSON file."""
+    with open(_path, "w") as _file:
+        _file.write(to_json(indent=1))
+
+
+def get_size(_value):
+    """Returns the size of an argument: elements of an array, items of a list, elements of a mesh, nodes of a matrix."""
+    if hasattr(_value, "size") and not callable(_value.size):
+        return int(_value.size)
+    if isinstance(_value, (list, tuple)):
+        return len(_value)
+    for _attribute in ("num_elements", "num_nodes"):
+        if hasattr(_value, _attribute):
+            return int(getattr(_value, _attribute))
+    return None
+
+
+def _get_largest_size(_args):
+    _sizes = [_size for _size in map(get_size, _args) if _size is not None]
+    return max(_sizes) if _sizes else None
+
+
+class _NullStage:
+    """Stage used while recording is off."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+
+_null_stage = _NullStage()
+
+
+class _Stage:
+    def __init__(self, _name, _size):
+        self.name = _name
+        self.size = _size
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        record(self.name, time.perf_counter() - self.start, self.size)
+        return False
+
+
+def stage(_name, _size=None):
+    """Context manager timing a pipeline stage, e.g. with stage("assembly", mesh.num_elements): ..."""
+    if not _state["enabled"]:
+        return _null_stage
+    return _Stage(_name, _size)
+
+
+def instrumented(_function):
+    """Decorator recording calls of a function, under its module and name, with the size of its largest argument."""
+    _name = "{}.{}".format(_function.__module__, _function.__qualname__)
+
+    @wraps(_function)
+    def _wrapper(*args, **kwargs):
+        if not _state["enabled"]:
+            return _function(*args, **kwargs)
+        _start = time.perf_counter()
+        try:
+            return _function(*args, **kwargs)
+        finally:
+            record(_name, time.perf_counter() - _start, _get_largest_size(args))
+
+    return _wrapper
+
+
+class Recording:
+    """Context manager recording statistics within a block, e.g. with Recording() as stats: ..."""
+    # statistics are reset on entry; the previous enabled state is restored on exit
+
+    def __init__(self, _reset=True):
+        self.reset = _reset
+        self.was_enabled = False
+
+    def __enter__(self):
+        self.was_enabled = _state["enabled"]
+        if self.reset:
+            reset()
+        enable()
+        return self
+
+    def __exit__(self, *args):
+        _state["enabled"] = self.was_enabled
+        return False
+
+    def get_statistics(self):
+        return get_statistics()
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,155 @@
+import numpy as np
+from structural.matrices import get_element_properties
+
+# three point Gauss-Legendre rule on [-1, 1]; integrates the (linear load x cubic shape function) products exactly
+GAUSS_POINTS = np.array([-(0.6 ** 0.5), 0.0, 0.6 ** 0.5])
+GAUSS_WEIGHTS = np.array([5 / 9, 8 / 9, 5 / 9])
+
+
+def get_node_positions(_beam_elements):
+    """Returns positions of nodes measured along the beam, starting from the y coordinate of the first node."""
+    # for a vertical wall meshed from get_cumulative_discrete_lengths these are depths below the top of the wall
+    _lengths, _ = get_element_properties(_beam_elements)
+    if hasattr(_beam_elements, "y"):
+        _start = _beam_elements.y[0]
+    else:
+        _start = _beam_elements[0].node1.y
+    return _start + np.concatenate(([0.0], np.cumsum(_lengths)))
+
+
+def get_shape_functions(_xi, _L, _consistent=True):
+    """Evaluates beam shape functions [N1, N2, N3, N4] at local coordinates xi = s / L, stacked on the last axis."""
+    # consistent: cubic Hermite functions, so that loads produce work-equivalent forces AND moments
+    # lumped: linear functions, so that loads are split statically between the two nodes only
+    if _consistent:
+        return np.stack((1 - 3 * _xi ** 2 + 2 * _xi ** 3,
+                         _L * (_xi - 2 * _xi ** 2 + _xi ** 3),
+                         3 * _xi ** 2 - 2 * _xi ** 3,
+                         _L * (-_xi ** 2 + _xi ** 3)), axis=-1)
+    _zero = np.zeros_like(_xi * _L)
+    return np.stack((1 - _xi + _zero, _zero, _xi + _zero, _zero), axis=-1)
+
+
+def get_empty_fixed_end_forces(_beam_elements, _num_cases=None):
+    """Returns zero fixed-end forces [V1, M1, V2, M2] of every element, (n_elem, 4) or (n_elem, 4, k)."""
+    _num_elements = len(get_element_properties(_beam_elements)[0])
+    return np.zeros((_num_elements, 4) if _num_cases is None else (_num_elements, 4, _num_cases))
+
+
+def add_element_loads(_element_ids, _element_loads, _load_matrix, _fixed_end_forces=None):
+    """Scatters (m, 4) element nodal loads [V1, M1, V2, M2] into a load matrix."""
+    # _fixed_end_forces: optional (n_elem, 4) array that collects the same loads per element,
+    # to be subtracted from the element end forces, see compute_element_results
+    _dofs = 2 * np.asarray(_element_ids)[:, np.newaxis] + np.arange(4)
+    np.add.at(_load_matrix, _dofs, _element_loads)
+    if _fixed_end_forces is not None:
+        np.add.at(_fixed_end_forces, _element_ids, _element_loads)
+    return _load_matrix
+
+
+def add_linear_load(_q1, _q2, _from, _to, _beam_elements, _load_matrix, _consistent=False, _fixed_end_forces=None):
+    """Applies a linearly varying (trapezoidal) load between two positions along the beam."""
+    # loads passed in kN/m, positions in m; partial elements at either end are loaded over their covered part only
+    # consistent loads hold fixed-end moments, so element results need the same loads as
+    # _fixed_end_forces, see add_element_loads; lumped loads give exact nodal moments without them
+    if _from > _to:
+        # positions specified in different order, so the loads are assumed to be as well
+        _from, _to, _q1, _q2 = _to, _from, _q2, _q1
+
+    _positions = get_node_positions(_beam_elements)
+    _lengths = np.diff(_positions)
+
+    if _from == _to:
+        # zero length load is treated as a point load of the average value
+        return add_point_load(0.5 * (_q1 + _q2), _from, _beam_elements, _load_matrix, _consistent,
+                              _fixed_end_forces)
+
+    # elements overlapping the loaded range
+    _first = max(np.searchsorted(_positions, _from, side="right") - 1, 0)
+    _last = min(np.searchsorted(_positions, _to, side="left"), len(_lengths))
+    _ids = np.arange(_first, _last)
+    if len(_ids) == 0:
+        return _load_matrix
+
+    # loaded part of every element, in local coordinates
+    _L = _lengths[_ids][:, np.newaxis]
+    _s0 = np.clip(_from - _positions[_ids], 0, None)[:, np.newaxis]
+    _s1 = np.minimum(_to - _positions[_ids], _lengths[_ids])[:, np.newaxis]
+
+    # integrate q(s) * N(s) over the loaded part by Gauss quadrature
+    _s = _s0 + (_s1 - _s0) * (1 + GAUSS_POINTS) / 2
+    _w = (_s1 - _s0) * GAUSS_WEIGHTS / 2
+    _q = _q1 + (_q2 - _q1) * (_positions[_ids][:, np.newaxis] + _s - _from) / (_to - _from)
+    _N = get_shape_functions(_s / _L, _L, _consistent)
+    _element_loads = 1000 * np.einsum("eg,egi->ei", _w * _q, _N)  # convert to N (and Nm) by * 1000
+
+    return add_element_loads(_ids, _element_loads, _load_matrix, _fixed_end_forces)
+
+
+def add_udl(_q, _from, _to, _beam_elements, _load_matrix, _consistent=False, _fixed_end_forces=None):
+    """Applies a Uniformly Distributed Load between two positions along the beam."""
+    return add_linear_load(_q, _q, _from, _to, _beam_elements, _load_matrix, _consistent, _fixed_end_forces)
+
+
+def add_nodal_profile_load(_q, _beam_elements, _load_matrix, _consistent=False, _fixed_end_forces=None):
+    """Applies a distributed load given by its value at every node and varying linearly over each element."""
+    # _q holds kN/m values, one per node; a (n x k) array gives k load cases for a (2n x k) load matrix
+    _q = np.asarray(_q, dtype=float)
+    return add_element_linear_loads(_q[:-1], _q[1:], _beam_elements, _load_matrix, _consistent, _fixed_end_forces)
+
+
+def add_element_linear_loads(_q1, _q2, _beam_elements, _load_matrix, _consistent=False, _fixed_end_forces=None):
+    """Applies a linear load over every element, from _q1 at its first node to _q2 at its second node."""
+    # _q1 and _q2 hold kN/m values, one per element (or (n_elem x k) arrays for k load cases);
+    # unlike a nodal profile, the load may jump between elements, e.g. at soil layer boundaries
+    _element_loads = get_element_linear_loads(_q1, _q2, _beam_elements, _consistent)
+    _ids = np.arange(len(_element_loads))
+    for _dof in range(0, 4):
+        np.add.at(_load_matrix, 2 * _ids + _dof, _element_loads[:, _dof])
+    if _fixed_end_forces is not None:
+        _fixed_end_forces += _element_loads
+    return _load_matrix
+
+
+def get_element_linear_loads(_q1, _q2, _beam_elements, _consistent=False):
+    """Returns nodal loads [V1, M1, V2, M2] in N and Nm of a linear load over every element, (n_elem, 4[, k])."""
+    _q1 = np.asarray(_q1, dtype=float)
+    _q2 = np.asarray(_q2, dtype=float)
+    _lengths, _ = get_element_properties(_beam_elements)
+    _shape = (-1,) + (1,) * (_q1.ndim - 1)
+    _L = _lengths.reshape(_shape)
+
+    # closed form integrals of a linear load over whole elements
+    if _consistent:
+        _f1 = _L * (7 * _q1 + 3 * _q2) / 20
+        _m1 = _L ** 2 * (3 * _q1 + 2 * _q2) / 60
+        _f2 = _L * (3 * _q1 + 7 * _q2) / 20
+        _m2 = -_L ** 2 * (2 * _q1 + 3 * _q2) / 60
+    else:
+        _f1 = _L * (2 * _q1 + _q2) / 6
+        _f2 = _L * (_q1 + 2 * _q2) / 6
+        _m1 = _m2 = np.zeros_like(_f1)
+
+    return 1000 * np.stack((_f1, _m1, _f2, _m2), axis=1)  # convert to N (and Nm) by * 1000
+
+
+def add_point_load(_f, _position, _beam_elements, _load_matrix, _consistent=False, _fixed_end_forces=None):
+    """Applies point forces (kN) at arbitrary positions along the beam; arrays of forces and positions are accepted."""
+    _f = np.atleast_1d(np.asarray(_f, dtype=float))
+    _position = np.atleast_1d(np.asarray(_position, dtype=float))
+    _f, _position = np.broadcast_arrays(_f, _position)
+
+    _positions = get_node_positions(_beam_elements)
+    _lengths = np.diff(_positions)
+
+    # element containing each point, and its local coordinate
+    _ids = np.clip(np.searchsorted(_positions, _position, side="right") - 1, 0, len(_lengths) - 1)
+    _L = _lengths[_ids]
+    _xi = np.clip((_position - _positions[_ids]) / _L, 0, 1)
+    _element_loads = 1000 * _f[:, np.newaxis] * get_shape_functions(_xi, _L, _consistent)
+
+    return add_element_loads(_ids, _element_loads, _load_matrix, _fixed_end_forces)
+
+
+if __name__ == '__main__':
+    pass
@@ -1,6 +1,7 @@
 # structural materials
 from math import sqrt
 from enum import Enum
+from functools import lru_cache
 
 
 class CodeType(Enum):
@@ -44,17 +45,38 @@ class Aci31819(Code):
 
 class Concrete:
     """Structural concrete class."""
+    # Instances are immutable, so that a single instance can be shared by any
+    # number of elements; use get_concrete to obtain shared instances.
+    __slots__ = ("code", "Name", "CompressionStrength", "UnitWeight", "Modulus", "LightweightFactor")
     MaterialType = MaterialType.Concrete.value
 
-    def __init__(self, code, name, fc, weight):
-        self.code = code
-        self.Name = name
-        self.CompressionStrength = fc
-        self.UnitWeight = weight
-        self.Modulus = self.get_modulus()
-        self.LightweightFactor = 1.0
+    def __init__(self, code, name, fc, weight, lightweight=1.0):
+        _set = object.__setattr__
+        _set(self, "code", code)
+        _set(self, "Name", name)
+        _set(self, "CompressionStrength", fc)
+        _set(self, "UnitWeight", weight)
+        _set(self, "Modulus", self.calculate_modulus())
+        _set(self, "LightweightFactor", lightweight)  # lambda of lightweight concrete, 1.0 for normalweight
+
+    def __setattr__(self, key, value):
+        raise AttributeError("Concrete is immutable; create or get another instance instead.")
+
+    def __reduce__(self):
+        return self.__class__, (self.code, self.Name, self.CompressionStrength, self.UnitWeight,
+                                self.LightweightFactor)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
 
     def get_modulus(self):
+        """Returns Young's Modulus of concrete, in MPa."""
+        return self.Modulus
+
+    def calculate_modulus(self):
         """Calculates Young's Modulus of concrete in accordance with design code specified."""
         _ct = CodeType  # temp definition, for easier typing in code
 
@@ -73,5 +95,24 @@ class Concrete:
         return round(_Ec, 0)
 
 
+def get_concrete(code, name, fc, weight, lightweight=1.0):
+    """Returns a shared Concrete instance; equal arguments always give the same instance."""
+    # the factor is passed on explicitly, so that leaving it out gives the same instance as 1.0
+    return _get_concrete(code, name, fc, weight, lightweight)
+
+
+@lru_cache(maxsize=None)
+def _get_concrete(code, name, fc, weight, lightweight):
+    return Concrete(code, name, fc, weight, lightweight)
+
+
+def get_code(name):
+    """Returns the Code class of a code name, e.g. "ACI318-14"."""
+    for _code in (Aci31810, Aci31814, Aci31819):
+        if _code.CodeName == name:
+            return _code
+    raise ValueError("Unknown structural code: {}".format(name))
+
+
 if __name__ == '__main__':
     pass
@@ -1,7 +1,11 @@
 import numpy as np
 from structural.constant import LOCAL_ELEMENT_STIFFNESS, LOCAL_ELEMENT_L2, LOCAL_ELEMENT_L
+from structural.instrument import instrumented
+from structural.banded import BlockTridiagonalMatrix, assemble_banded_matrix, set_banded_nodal_boundary_conditions, \
+    solve_banded_system
 
 
+@instrumented
 def assemble_local_matrix(_L, _EI):
     """Adjusts local element stiffness matrix, to include L and L2 terms."""
     # _L = length of local element
@@ -25,6 +29,25 @@ def assemble_local_matrix(_L, _EI):
     return _local_matrix
 
 
+@instrumented
+def assemble_local_matrices(_L, _EI):
+    """Builds local element stiffness matrices for arrays of lengths and EI, as a (n_elem, 4, 4) array."""
+    # same terms as assemble_local_matrix: L appears to the power of 0, 1 or 2 in each entry
+    # leading axes of (..., n_elem) arrays, such as a batch of walls, are kept
+    _L = np.asarray(_L, dtype=float)[..., np.newaxis, np.newaxis]
+    _EIL3 = np.asarray(_EI, dtype=float)[..., np.newaxis, np.newaxis] / _L ** 3
+    _powers = LOCAL_ELEMENT_L + 2 * LOCAL_ELEMENT_L2
+    return LOCAL_ELEMENT_STIFFNESS * _L ** _powers * _EIL3
+
+
+@instrumented
+def get_local_matrices(_beam_elements):
+    """Returns stacked local stiffness matrices of a BeamMesh or of a list of beam elements."""
+    if hasattr(_beam_elements, "get_stiffness_matrices"):
+        return _beam_elements.get_stiffness_matrices()
+    return np.array([_element.get_stiffness_matrix() for _element in _beam_elements], dtype=float)
+
+
 # def assemble_global_matrix(_lengths, _EI):
 #     """Assembles a global stiffness matrix."""
 #
@@ -50,24 +73,30 @@ def assemble_local_matrix(_L, _EI):
 #
 #     return _global
 
-def assemble_global_matrix(_beam_elements):
+@instrumented
+def assemble_global_matrix(_beam_elements, _storage="dense"):
     """Assembles a global stiffness matrix."""
+    # storage: dense, banded
+    # _beam_elements may be a list of BeamFiniteElement or a BeamMesh
 
-    # determine number of nodes from the length matrix
-    _num_nodes = len(_beam_elements) + 1
+    # build all local element stiffness matrices at once
+    _local_matrices = get_local_matrices(_beam_elements)
+
+    if _storage == "banded":
+        # only the three block diagonals are stored, see structural.banded
+        return assemble_banded_matrix(_local_matrices)
+
+    # determine number of nodes from the number of elements
+    _num_elements = len(_local_matrices)
+    _num_nodes = _num_elements + 1
 
     # create an empty matrix first
     _global = np.zeros((_num_nodes * 2, _num_nodes * 2))
 
-    # fill global matrix with local element stiffness matrices
-    _num_elements = _num_nodes - 1
-
-    # assemble global matrix from local stiffness matrices
-    for i in range(0, _num_elements):
-        _node = i + 1
-        _i = (_node - 1) * 2  # overlap
-        _j = _i + 4  # four is added since local matrix has 4 rows
-        _global[_i:_j, _i:_j] += _beam_elements[i].get_stiffness_matrix()  # add local element matrix to a global matrix
+    # scatter local element matrices into the global matrix; element i occupies
+    # rows and columns 2i to 2i + 3, overlapping its neighbours at the shared node
+    _dofs = 2 * np.arange(_num_elements)[:, np.newaxis] + np.arange(4)
+    np.add.at(_global, (_dofs[:, :, np.newaxis], _dofs[:, np.newaxis, :]), _local_matrices)
 
     return _global
 
@@ -139,110 +168,189 @@ def assemble_global_matrix(_beam_elements):
 #     _nodal_q.append(round(_element_q[-1] + (_element_q[-1] - _qn), 3))
 #
 #     return _x, _y, _theta, _element_m, _nodal_m, _nodal_q
+
+
+class ElementResults:
+    """Element and nodal results of a solved beam, as float arrays."""
+    # Arrays hold one row per node (or element). When several load cases were
+    # solved together, a trailing axis holds one column per load case.
+    # Units: x in m, deflection in m, rotation in rad, moments in kNm, shears in kN.
+
+    def __init__(self, _x, _deflection, _rotation, _element_moments, _nodal_moments, _element_shears, _nodal_shears):
+        self.x = _x  # nodal positions along the beam
+        self.deflection = _deflection  # nodal displacements
+        self.rotation = _rotation  # nodal rotations
+        self.element_moments = _element_moments  # moments at node 1 and node 2 of every element, (n_elem, 2, ...)
+        self.nodal_moments = _nodal_moments  # moments at nodes
+        self.element_shears = _element_shears  # average shear across every element
+        self.nodal_shears = _nodal_shears  # shears at nodes
+
+    def get_case(self, _index):
+        """Returns results of a single load case (or a single beam of a batch) as a new ElementResults."""
+        return ElementResults(self.x if self.x.ndim == 1 else self.x[:, _index],
+                              self.deflection[:, _index], self.rotation[:, _index],
+                              self.element_moments[:, :, _index], self.nodal_moments[:, _index],
+                              self.element_shears[:, _index], self.nodal_shears[:, _index])
+
+    def get_rounded(self, _decimals=3):
+        """Returns results in the list form of get_element_results, rounded for output."""
+        _round = lambda _k: np.round(_k, _decimals).tolist()
+        return (_round(self.x), self.deflection, self.rotation, _round(self.element_moments),
+                _round(self.nodal_moments), _round(self.nodal_shears))
+
+    def get_envelope(self, _quantities=None):
+        """Returns the Envelope of nodal results over all load cases."""
+        return get_envelope(self, _quantities)
+
+
+ENVELOPE_QUANTITIES = ("deflection", "nodal_moments", "nodal_shears")
+
+
+class Envelope:
+    """Maxima and minima of nodal results over load cases, and the load case governing each."""
+    # every dict maps a quantity of ElementResults (see ENVELOPE_QUANTITIES) to one value per node
+
+    def __init__(self, _maxima, _minima, _max_cases, _min_cases):
+        self.maxima = _maxima
+        self.minima = _minima
+        self.max_cases = _max_cases  # index of the load case of every maximum
+        self.min_cases = _min_cases
+
+
+def get_envelope(_results, _quantities=None):
+    """Envelopes nodal results of load cases solved together, i.e. with a trailing load case axis."""
+    _maxima, _minima, _max_cases, _min_cases = {}, {}, {}, {}
+    _nodes = np.arange(len(_results.x))
+    for _quantity in _quantities or ENVELOPE_QUANTITIES:
+        _values = np.asarray(getattr(_results, _quantity))
+        if _values.ndim == 1:
+            _values = _values[:, np.newaxis]
+        _max_cases[_quantity] = np.argmax(_values, axis=1)
+        _min_cases[_quantity] = np.argmin(_values, axis=1)
+        _maxima[_quantity] = _values[_nodes, _max_cases[_quantity]]
+        _minima[_quantity] = _values[_nodes, _min_cases[_quantity]]
+    return Envelope(_maxima, _minima, _max_cases, _min_cases)
+
+
+@instrumented
+def get_element_properties(_beam_elements):
+    """Returns arrays of element lengths and EI of a BeamMesh or of a list of beam elements."""
+    if hasattr(_beam_elements, "lengths"):
+        return _beam_elements.lengths, _beam_elements.EI
+    _lengths = np.array([_element.length for _element in _beam_elements], dtype=float)
+    _EI = np.array([_element.get_EI() for _element in _beam_elements], dtype=float)
+    return _lengths, _EI
+
+
+@instrumented
+def compute_element_results(_results, _beam_elements, _fixed_end_forces=None):
+    """Derives moments and shears from solver results for all elements (and load cases) at once."""
+    # _results is [y1, theta1, ... yn, thetan], or a (2n x k) block with one load case per column.
+    # Moments and shears follow the same first-principles formulae as get_element_results.
+    # _fixed_end_forces: element loads [V1, M1, V2, M2] in N, (n_elem, 4) or (n_elem, 4, k), of
+    # loads applied within elements (see structural.loads); the element end forces are K_e u - f_e
+    _lengths, _EI = get_element_properties(_beam_elements)
+    return get_results_from_properties(_results, _lengths, _EI, _fixed_end_forces)
+
+
+@instrumented
+def get_results_from_properties(_results, _lengths, _EI, _fixed_end_forces=None):
+    """Derives element results from solver results and element lengths and EI."""
+    # _lengths and _EI are (n_elem,) arrays, or (n_elem x k) arrays when every column
+    # of _results belongs to a different beam (see structural.batch)
+    _results = np.asarray(_results, dtype=float)
+    _y = _results[0::2]
+    _theta = _results[1::2]
+
+    # broadcast element properties over any load case axis
+    _shape = _lengths.shape + (1,) * (_results.ndim - _lengths.ndim)
+    _L = _lengths.reshape(_shape)
+    _L2 = _L ** 2
+    _EI = _EI.reshape(_shape)
+    _x = np.concatenate((np.zeros((1,) + _lengths.shape[1:]), np.cumsum(_lengths, axis=0)))
+    _d1 = _y[:-1]
+    _d2 = _y[1:]
+    _t1 = _theta[:-1]
+    _t2 = _theta[1:]
+
+    _m1 = -_EI * (- 6 * _d1 / _L2 - 4 * _t1 / _L + 6 * _d2 / _L2 - 2 * _t2 / _L) / 1000  # node 1 moments, in kNm
+    _m2 = -_EI * (+ 6 * _d1 / _L2 + 2 * _t1 / _L - 6 * _d2 / _L2 + 4 * _t2 / _L) / 1000  # node 2 moments, in kNm
+    _qe = -_EI / _L2 * (12 * _d1 / _L + 6 * _t1 - 12 * _d2 / _L + 6 * _t2) / 1000  # average element shears, in kN
+    if _fixed_end_forces is not None:
+        # m1 and m2 are +(K_e u)[1] and -(K_e u)[3]; the shear at node 1 is -(K_e u)[0], at node 2 +(K_e u)[2]
+        _f = np.asarray(_fixed_end_forces, dtype=float)
+        _m1 = _m1 - _f[:, 1] / 1000
+        _m2 = _m2 + _f[:, 3] / 1000
+        _qe = _qe + (_f[:, 0] - _f[:, 2]) / 2000
+
+    _element_m = np.stack((_m1, _m2), axis=1)
+    _nodal_m = np.concatenate((_m1, _m2[-1:]))
+
+    # nodal shears: average of adjacent elements, extrapolated linearly at both ends
+    if len(_qe) > 1:
+        _qn = 0.5 * (_qe[:-1] + _qe[1:])
+        _nodal_q = np.concatenate((2 * _qe[:1] - _qn[:1], _qn, 2 * _qe[-1:] - _qn[-1:]))
+    else:
+        _nodal_q = np.concatenate((_qe, _qe))
+
+    return ElementResults(_x, _y, _theta, _element_m, _nodal_m, _qe, _nodal_q)
+
+
+@instrumented
 def get_element_results(_results, _elements):
     """Assembles element results into a single matrix"""
     # Results of the linear solver are comprised of a single matric which
     # contains calculated displacements and rotations:
     # x(1), theta(1) x(2), theta(2), .... x(n), theta(n)
-
-    # first separate displacements from rotations
-    _y = _results[0::2]  # takes every other value, starting from index 0
-    # _y = lambda x: round(x, 1): _y
-    _theta = _results[1::2]  # takes every other value, starting from index 1
-
-    # from derivations from first principles the formula for the moment
-    #
-    # M1 = -EI(-6d1/L2 - 4t1/L + 6d2/L2 - 2t2/L)        // moment at node 1
-    # M2 = -EI(+6d1/L2 + 2t1/L - 6d2/L2 + 4t2/L)        // moment at node 2
-    # Q  = -EI/L2 (12d1/L + 6t1 - 12d2/L + 6t2          // shear force
-    #
-    # where d1 = displacement at node 1, d2 = displacement at node 2
-    #       t1 = rotation at node 1, t2 = rotation at node 2
-    #       L = length of element
-    #       L2 = length of element squared
-    #       EI = product of Young's modulus and moment of inertia for the element
-
-    _element_m = []  # element moments (node 1 and node 2)
-    _nodal_m = []  # nodal moments
-    _element_q = []  # element shear force (average shear, across the element)
-    _nodal_q = []  # nodal shear
-    _x = [0]
-    for i in range(0, len(_y) - 1):
-        _L = _elements[i].length
-        _EI = _elements[i].get_EI()
-        # derive nodal x values
-        _x.append(round(_x[-1] + _L, 3))
-
-        # define parameters used in the equation
-        _L2 = _L ** 2
-        _EIL2 = _EI / _L2
-        _d1 = _y[i]
-        _d2 = _y[i + 1]
-        _t1 = _theta[i]
-        _t2 = _theta[i + 1]
-
-        # calculate nodal moments and average element shears
-        _m1 = -_EI * (- 6 * _d1 / _L2 - 4 * _t1 / _L + 6 * _d2 / _L2 - 2 * _t2 / _L) / 1000  # node 1 moment, in kNm
-        _m2 = -_EI * (+ 6 * _d1 / _L2 + 2 * _t1 / _L - 6 * _d2 / _L2 + 4 * _t2 / _L) / 1000  # node 2 moment, in kNm
-        _qe = -_EIL2 * (12 * _d1 / _L + 6 * _t1 - 12 * _d2 / _L + 6 * _t2) / 1000  # average element shear, in kN
-
-        # hold calculated values into arrays
-        _nodal_m.append(round(_m1, 3))  # moments at node 1
-        _element_m.append([round(_m1, 3), round(_m2, 3)])  # moments at nodes 1 and 2 (as an array)
-        _element_q.append(_qe)  # average element shear
-
-    # add last moment (node 2) to nodal moments array
-    _nodal_m.append(_element_m[-1][1])
-
-    # Derive nodal shears
-    # Determine first nodal shear
-    _qn = 0.5 * (_element_q[0] + _element_q[1])
-    _nodal_q.append(round(_element_q[0] + (_element_q[0] - _qn), 3))
-    # Determine the remaining nodal shears
-    for i in range(0, len(_element_q) - 1):
-        _qn = 0.5 * (_element_q[i] + _element_q[i + 1])
-        _nodal_q.append(round(_qn, 3))
-    # Now, derive shear for the last node:
-    _qn = 0.5 * (_element_q[-2] + _element_q[-1])  # average of the last and penultimate element
-    _nodal_q.append(round(_element_q[-1] + (_element_q[-1] - _qn), 3))
-
-    return _x, _y, _theta, _element_m, _nodal_m, _nodal_q
+    # Returns lists rounded to 3 decimals; use compute_element_results for float arrays.
+    return compute_element_results(_results, _elements).get_rounded()
 
 
+@instrumented
 def set_nodal_boundary_conditions(_node, _global_matrix, _loads, _condition="fixed"):
     """Sets boundary conditions to a global stiffness matrix"""
     # condition: fixed, pinned, free
+    # restrained rows are replaced by unit rows, which makes the matrix unsymmetric;
+    # see structural.constraints for the symmetric form
+
+    if isinstance(_global_matrix, BlockTridiagonalMatrix):
+        return set_banded_nodal_boundary_conditions(_node, _global_matrix, _loads, _condition)
 
     # first, get the shape of global stiffness matrix
     _rows, _cols = np.shape(_global_matrix)
 
-    if _node >= 0 and _node < (_rows / 2):
-        _boundary_row = np.zeros(_cols)  # create a row of zeros
-        _boundary_row = np.vstack((_boundary_row, _boundary_row))  # and stack another row of zeros on top of it
-        # for a fixed condition, restrain both displacements and rotations
-        if _condition == "fixed":
-            _boundary_row[0, _node * 2] = 1  # displacements row
-            _boundary_row[1, _node * 2 + 1] = 1  # rotations row
-            _loads[_node * 2] = 0
-            _loads[_node * 2 + 1] = 0
-        # for a pinned condition, restrain only displacements
-        elif _condition == "pinned":
-            _boundary_row[0, _node * 2] = 1  # displacements row
-            _boundary_row[1] = _global_matrix[_node * 2 + 1]  # rotations row copied from global stiffness matrix
-            _loads[_node * 2] = 0
-        else:
-            _boundary_row[0] = _global_matrix[_node * 2]  # copy displacements row from global matrix
-            _boundary_row[1] = _global_matrix[_node * 2 + 1]  # copy rotations row from global matrix
-
-        # replace rows in global matrix
-        for i in range(0, 2):
-            _global_matrix[_node * 2 + i] = _boundary_row[i]
+    if not 0 <= _node < _rows / 2:
+        raise ValueError("Failed to assign boundary conditions at node {} of {}.".format(_node, _rows // 2))
+
+    # for a fixed condition, restrain both displacements and rotations
+    if _condition == "fixed":
+        _dofs = [_node * 2, _node * 2 + 1]
+    # for a pinned condition, restrain only displacements
+    elif _condition == "pinned":
+        _dofs = [_node * 2]
+    # a free node keeps its rows of the global stiffness matrix
     else:
-        print("*** WARNING ***\tFailed to assign boundary conditions at Node {}.\n".format(_node))
+        _dofs = []
+
+    # replace rows in global matrix
+    for _dof in _dofs:
+        _global_matrix[_dof] = 0
+        _global_matrix[_dof, _dof] = 1
+        _loads[_dof] = 0
 
     return _global_matrix, _loads
 
 
+@instrumented
+def solve_global_system(_global_matrix, _loads):
+    """Solves the global stiffness system for displacements and rotations."""
+    # banded matrices are solved by block cyclic reduction, dense ones by LU
+    if isinstance(_global_matrix, BlockTridiagonalMatrix):
+        return solve_banded_system(_global_matrix, _loads)
+    return np.linalg.solve(_global_matrix, _loads)
+
+
+@instrumented
 def get_points_distance(_points):
     """Determins a distance between two adjacent points in a matrix."""
     _dist = []  # distances between points
@@ -252,40 +360,38 @@ def get_points_distance(_points):
     return _dist
 
 
+@instrumented
 def get_cumulative_discrete_lengths(_minLength, _points):
     """Determine a matrix of element lengths."""
+    # returns node positions as a list; see get_discrete_points for the array version
+    return get_discrete_points(_minLength, _points).tolist()
 
-    # get distances between adjacent points in a points matrix
-    _dist = get_points_distance(_points)
-    _div = []
-    _elem = []
-    # Determine divisors
-    for i in range(0, len(_dist)):
-        # calculate whole number divisions between points, so that the element lengths are close to required
-        _tmp = round(_dist[i] / _minLength, 0)
-        if _tmp > 0:
-            # round the divisions to a closest whole number
-            _div.append((round(_dist[i] / _minLength, 0)))
-        else:
-            # in case the rounding resulted in 0
-            _div.append(1)
-
-        # further divide into chunks
-        for j in range(0, int(_div[-1])):
-            _tmp = round(_points[i] + j * (_dist[i] / _div[-1]), 3)
-            _elem.append(_tmp)
 
-    # add the last point from the points marix
-    _elem.append(_points[-1])
+@instrumented
+def get_discrete_points(_minLength, _points):
+    """Divides the spaces between points into elements close to the required length; returns node positions."""
+    _points = np.asarray(_points, dtype=float)
+
+    # distances between adjacent points, and whole number divisions of each (at least one)
+    _dist = np.round(np.abs(np.diff(_points)), 3)
+    _div = np.maximum(np.round(_dist / _minLength), 1).astype(int)
+
+    # every node is a start point plus a whole number of divisions of its interval
+    _interval = np.repeat(np.arange(len(_div)), _div)
+    _step = np.arange(len(_interval)) - np.repeat(np.cumsum(_div) - _div, _div)
+    _elem = np.round(_points[_interval] + _step * (_dist / _div)[_interval], 3)
 
-    return _elem
+    # add the last point from the points marix
+    return np.append(_elem, _points[-1])
 
 
+@instrumented
 def get_empty_load_matrix(_nodes):
     _load_matrix = np.zeros(_nodes * 2)  # multiply by two to account for forces AND moments
     return _load_matrix
 
 
+@instrumented
 def set_point_force(_f, _node, _load_matrix):
     """Applies a nadal force to a specified node."""
     # for force passed in kN
@@ -293,6 +399,7 @@ def set_point_force(_f, _node, _load_matrix):
     return _load_matrix
 
 
+@instrumented
 def set_point_moment(_m, _node, _load_matrix):
     """Applies a nadal moment to a specified node."""
     # for moment passed in kNm
@@ -322,29 +429,18 @@ def set_point_moment(_m, _node, _load_matrix):
 #             _current_node += 2  # next node for force application
 #
 #     return _load_matrix
-def set_udl_between_nodes(_udl, _node_from, _node_to, _elements, _load_matrix):
+@instrumented
+def set_udl_between_nodes(_udl, _node_from, _node_to, _elements, _load_matrix, _consistent=False):
     """Applies a Uniformly Distributed Load, between specified nodes, to a load matrix."""
-    _current_node = _node_from * 2  # *2 since each node has two values, one for force, one for moments
-    _last_node = _node_to * 2  # *2 since each node has two values, one for force, one for moments
-
-    # in case node entries are reversed, order them
-    if _current_node > _last_node:
-        _tmp = _last_node
-        _last_node = _current_node
-        _current_node = _tmp
+    # by default the UDL is applied as a half of total load upon each node of an element;
+    # _consistent=True also applies the fixed-end moments, see structural.loads
+    from structural.loads import get_node_positions, add_udl
 
-    if _current_node == _last_node:
-        _load_matrix = set_point_force(_udl, _node_from, _load_matrix)
-    else:
-        for _element in _elements[_node_from:_node_to]:
-            _length = _element.length
-            # split force into two, since UDL is applied as a half of total load upon each node
-            _udl2 = 1000 * _udl * _length / 2  # convert to Newtons by * 1000
-            _load_matrix[_current_node] += _udl2  # load to node 1
-            _load_matrix[_current_node + 2] += _udl2  # load to node 2
-            _current_node += 2  # next node for force application
+    if _node_from == _node_to:
+        return set_point_force(_udl, _node_from, _load_matrix)
 
-    return _load_matrix
+    _positions = get_node_positions(_elements)
+    return add_udl(_udl, _positions[_node_from], _positions[_node_to], _elements, _load_matrix, _consistent)
 
 
 # def set_linear_load_between_nodes(_f1, _f2, _node_from, _node_to, _element_lengths, _load_matrix):
@@ -384,47 +480,20 @@ def set_udl_between_nodes(_udl, _node_from, _node_to, _elements, _load_matrix):
 #         _load_matrix[_last_node] = _f2 * (0.5 * _element_lengths[_node_from:_node_to][-1])
 #
 #         return _load_matrix
-def set_linear_load_between_nodes(_f1, _f2, _node_from, _node_to, _elements, _load_matrix):
+@instrumented
+def set_linear_load_between_nodes(_f1, _f2, _node_from, _node_to, _elements, _load_matrix, _consistent=False):
     """Apply linearly varying load between two nodes."""
-    _current_node = _node_from * 2  # *2 since each node has two values, one for force, one for moments
-    _last_node = _node_to * 2  # *2 since each node has two values, one for force, one for moments
-
-    # in case node entries are reversed, order them
-    if _current_node > _last_node:
-        _tmp = _last_node
-        _last_node = _current_node
-        _current_node = _tmp
-        # also assume then that the loads are reversed (as in specified in different order)
-        # so, swap values
-        _tmp = _f2
-        _f2 = _f1
-        _f1 = _tmp
-
-    if _current_node == _last_node:
+    # by default the load upon each element is split statically between its two nodes;
+    # _consistent=True also applies the fixed-end moments, see structural.loads
+    from structural.loads import get_node_positions, add_linear_load
+
+    if _node_from == _node_to:
         # if the nodes are the same, then apply the average value at the node
-        _load_matrix = set_point_force(0.5 * (_f1 + _f2), _node_from, _load_matrix)
-    else:
-        _f1 *= 1000
-        _f2 *= 1000
-        # length under consideration
-        _considered_length = sum(list(map(lambda _k: _k.length, _elements[_node_from:_node_to])))
-        # gradient of linearly varying force
-        _var_udl = (_f2 - _f1) / _considered_length
-        # force at left-most node
-        _node_force = _f1
-        print("Considered length:", _considered_length)
-        for _element in _elements[_node_from:_node_to]:
-            _length = _element.length
-            # apply load to left (first) node of the element
-            _load_matrix[_current_node] += _node_force * (0.5 * _length)  # load to node 1
-            _load_matrix[_current_node + 2] += (_node_force + (_length * _var_udl)) * (0.5 * _length)  # load to node 2
-            _current_node += 2  # next node for force application
-            _node_force += _var_udl * _length
-
-        # and finally set the force upon the last (right) node
-        _load_matrix[_last_node] = _f2 * (0.5 * _elements[_node_from:_node_to][-1].length)
-
-        return _load_matrix
+        return set_point_force(0.5 * (_f1 + _f2), _node_from, _load_matrix)
+
+    # in case node entries are reversed, add_linear_load also assumes the loads are reversed
+    _positions = get_node_positions(_elements)
+    return add_linear_load(_f1, _f2, _positions[_node_from], _positions[_node_to], _elements, _load_matrix, _consistent)
 
 
 if __name__ == '__main__':
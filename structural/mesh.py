@@ -0,0 +1,295 @@
+import numpy as np
+from structural.instrument import instrumented
+from structural.matrices import assemble_local_matrices, get_discrete_points
+from structural.materials import Aci31814, get_concrete
+from structural.elements import Node, BeamFiniteElement, get_rectangular_section
+
+
+class BeamMesh:
+    """Chain of beam finite elements held as arrays (structure of arrays)."""
+    # node i sits at (x[i], y[i]); element i joins node i and node i + 1.
+    # Materials and sections are held once, in the materials/sections lists, and
+    # elements refer to them through material_index/section_index. E (N/m2) and
+    # I (m4) are kept per element, ready for batched stiffness construction.
+
+    def __init__(self, _x, _y, _material=None, _section=None):
+        self.x = np.array(_x, dtype=float)
+        self.y = np.array(_y, dtype=float)
+        self.lengths = self.get_lengths()
+
+        if _material is None:
+            _material = get_concrete(Aci31814, "Concrete C35", 35, 25)
+        if _section is None:
+            _section = get_rectangular_section(1000, 500)
+
+        self.materials = [_material]
+        self.sections = [_section]
+        self.material_index = np.zeros(self.num_elements, dtype=int)
+        self.section_index = np.zeros(self.num_elements, dtype=int)
+        self.E = np.full(self.num_elements, _get_modulus(_material))
+        self.I = np.full(self.num_elements, _get_moment_of_inertia(_section))
+
+        self.segment_index = None  # wall segment of every element, see build_wall_mesh
+        self.layer_index = None  # soil layer of every element (-1 outside the soil), see build_wall_mesh
+
+        self._nodes = None
+        self._elements = None
+
+    @classmethod
+    def from_points(cls, _points, _material=None, _section=None):
+        """Creates a vertical mesh (x = 0) from a list of node positions, such as get_cumulative_discrete_lengths."""
+        _y = np.asarray(_points, dtype=float)
+        return cls(np.zeros(len(_y)), _y, _material, _section)
+
+    @classmethod
+    def from_discrete_points(cls, _max_length, _points, _material=None, _section=None):
+        """Creates a vertical mesh with elements close to a required length between significant points."""
+        return cls.from_points(get_discrete_points(_max_length, _points), _material, _section)
+
+    @classmethod
+    def from_elements(cls, _elements):
+        """Creates a mesh from a list of connected BeamFiniteElement objects."""
+        _nodes = [_elements[0].node1] + [_element.node2 for _element in _elements]
+        _mesh = cls([_node.x for _node in _nodes], [_node.y for _node in _nodes])
+        for i, _element in enumerate(_elements):
+            _mesh.set_material(_element.material, [i])
+            _mesh.set_section(_element.section, [i])
+        return _mesh
+
+    @property
+    def num_nodes(self):
+        return len(self.x)
+
+    @property
+    def num_elements(self):
+        return len(self.x) - 1
+
+    @property
+    def EI(self):
+        return self.E * self.I
+
+    @property
+    def nodes(self):
+        """Node objects viewing the mesh coordinates."""
+        if self._nodes is None:
+            self._nodes = [MeshNode(self, i) for i in range(0, self.num_nodes)]
+        return self._nodes
+
+    @property
+    def elements(self):
+        """BeamFiniteElement objects viewing the mesh arrays."""
+        if self._elements is None:
+            self._elements = [MeshBeamElement(self, i) for i in range(0, self.num_elements)]
+        return self._elements
+
+    def get_lengths(self):
+        # calculate lengths of all elements from node geometry
+        return np.hypot(np.diff(self.x), np.diff(self.y))
+
+    def get_stiffness_matrices(self):
+        """Builds all local element stiffness matrices in one (n_elem, 4, 4) array."""
+        return assemble_local_matrices(self.lengths, self.EI)
+
+    def set_material(self, _material, _elements=None):
+        """Assigns a material to elements (all elements, a list of indices, a slice or a boolean mask)."""
+        _where = slice(None) if _elements is None else _elements
+        self.material_index[_where] = _get_palette_index(self.materials, _material)
+        self.E[_where] = _get_modulus(_material)
+
+    def set_section(self, _section, _elements=None):
+        """Assigns a cross section to elements (all elements, a list of indices, a slice or a boolean mask)."""
+        _where = slice(None) if _elements is None else _elements
+        self.section_index[_where] = _get_palette_index(self.sections, _section)
+        self.I[_where] = _get_moment_of_inertia(_section)
+
+    def set_segment_properties(self, _materials, _sections, _segment_index):
+        """Assigns one material and section per segment to all elements at once, from a segment index per element."""
+        _material_ids = np.array([_get_palette_index(self.materials, _material) for _material in _materials])
+        _section_ids = np.array([_get_palette_index(self.sections, _section) for _section in _sections])
+        self.material_index = _material_ids[_segment_index]
+        self.section_index = _section_ids[_segment_index]
+        self.E = np.array([_get_modulus(_material) for _material in _materials])[_segment_index]
+        self.I = np.array([_get_moment_of_inertia(_section) for _section in _sections])[_segment_index]
+
+    def get_midpoints(self):
+        """Returns positions of element midpoints along the (vertical) mesh."""
+        return 0.5 * (self.y[:-1] + self.y[1:])
+
+    @instrumented
+    def refresh(self):
+        """Recalculates derived arrays from node coordinates and the materials and sections lists."""
+        self.lengths = self.get_lengths()
+        self.E = np.array([_get_modulus(_material) for _material in self.materials])[self.material_index]
+        self.I = np.array([_get_moment_of_inertia(_section) for _section in self.sections])[self.section_index]
+
+
+class MeshNode(Node):
+    """Node viewing a row of a BeamMesh."""
+    __slots__ = ("mesh",)
+
+    def __init__(self, _mesh, _id):
+        self.mesh = _mesh
+        self.id = _id
+
+    @property
+    def x(self):
+        return float(self.mesh.x[self.id])
+
+    @x.setter
+    def x(self, _value):
+        self.mesh.x[self.id] = _value
+        self.mesh.lengths = self.mesh.get_lengths()
+
+    @property
+    def y(self):
+        return float(self.mesh.y[self.id])
+
+    @y.setter
+    def y(self, _value):
+        self.mesh.y[self.id] = _value
+        self.mesh.lengths = self.mesh.get_lengths()
+
+
+class MeshBeamElement(BeamFiniteElement):
+    """BeamFiniteElement viewing a row of a BeamMesh."""
+    __slots__ = ("mesh",)
+
+    def __init__(self, _mesh, _id):
+        self.mesh = _mesh
+        self.id = _id
+
+    @property
+    def node1(self):
+        return self.mesh.nodes[self.id]
+
+    @property
+    def node2(self):
+        return self.mesh.nodes[self.id + 1]
+
+    @property
+    def length(self):
+        return float(self.mesh.lengths[self.id])
+
+    @property
+    def material(self):
+        return self.mesh.materials[self.mesh.material_index[self.id]]
+
+    @material.setter
+    def material(self, _material):
+        self.mesh.set_material(_material, [self.id])
+
+    @property
+    def section(self):
+        return self.mesh.sections[self.mesh.section_index[self.id]]
+
+    @section.setter
+    def section(self, _section):
+        self.mesh.set_section(_section, [self.id])
+
+    @property
+    def EI(self):
+        return self.get_EI()
+
+    @property
+    def stiffness_matrix(self):
+        return self.get_stiffness_matrix()
+
+    def get_length(self):
+        return self.length
+
+    def get_EI(self):
+        return float(self.mesh.E[self.id] * self.mesh.I[self.id])
+
+    def refresh(self):
+        # derived values are read straight from the mesh arrays, so only the
+        # section and material properties need re-reading
+        self.mesh.set_material(self.material, [self.id])
+        self.mesh.set_section(self.section, [self.id])
+
+
+class IntervalIndex:
+    """Sorted, non-overlapping intervals [top, bottom), looked up by binary search."""
+
+    def __init__(self, _tops, _bottoms):
+        self.tops = np.asarray(_tops, dtype=float)
+        self.bottoms = np.asarray(_bottoms, dtype=float)
+
+    def lookup(self, _positions):
+        """Returns the interval containing every position, or -1 where no interval contains it."""
+        _positions = np.asarray(_positions, dtype=float)
+        _index = np.searchsorted(self.tops, _positions, side="right") - 1
+        _inside = (_index >= 0) & (_positions < self.bottoms[np.clip(_index, 0, None)])
+        return np.where(_inside, _index, -1)
+
+
+def get_segment_index(_segments):
+    """Builds an IntervalIndex of wall segments, from the top of the wall down."""
+    _bottoms = np.cumsum([_wall.height for _wall in _segments])
+    return IntervalIndex(np.concatenate(([0.0], _bottoms[:-1])), _bottoms)
+
+
+def get_layer_index(_geology):
+    """Builds an IntervalIndex of soil layers, from the top of the wall down."""
+    _tops = []
+    _bottoms = []
+    _depth = 0.0
+    for _soil in _geology:
+        if _soil.isTopLayer:
+            _depth += _soil.top_offset
+        _tops.append(_depth)
+        _depth += _soil.layer_thickness
+        _bottoms.append(_depth)
+    return IntervalIndex(_tops, _bottoms)
+
+
+def get_wall_points(_geology, _segments):
+    """Returns sorted depths of all soil layer and wall segment boundaries, as an array."""
+    _segment_index = get_segment_index(_segments)
+    _layer_index = get_layer_index(_geology)
+    return np.unique(np.round(np.concatenate(([0.0], _segment_index.bottoms, _layer_index.tops,
+                                              _layer_index.bottoms)), 3))
+
+
+@instrumented
+def build_wall_mesh(_geology, _segments, _max_length):
+    """Meshes a wall between all soil and wall points, and maps every element to its segment and soil layer."""
+    _points = get_discrete_points(_max_length, get_wall_points(_geology, _segments))
+    return build_wall_mesh_from_points(_geology, _segments, _points)
+
+
+@instrumented
+def build_wall_mesh_from_points(_geology, _segments, _points):
+    """Meshes a wall with nodes at given depths, and maps every element to its segment and soil layer."""
+    _segment_index = get_segment_index(_segments)
+    _layer_index = get_layer_index(_geology)
+    _mesh = BeamMesh.from_points(_points)
+
+    _midpoints = _mesh.get_midpoints()
+    # elements below the last segment (soil below the toe) belong to the last segment
+    _mesh.segment_index = np.clip(np.searchsorted(_segment_index.tops, _midpoints, side="right") - 1,
+                                  0, len(_segments) - 1)
+    _mesh.layer_index = _layer_index.lookup(_midpoints)
+    _mesh.set_segment_properties([_wall.material for _wall in _segments], [_wall.section for _wall in _segments],
+                                 _mesh.segment_index)
+    return _mesh
+
+
+def _get_palette_index(_palette, _item):
+    """Returns the index of an object in a list, appending it if missing."""
+    for i, _existing in enumerate(_palette):
+        if _existing is _item:
+            return i
+    _palette.append(_item)
+    return len(_palette) - 1
+
+
+def _get_modulus(_material):
+    return _material.get_modulus() * 1000000  # convert to N/m2
+
+
+def _get_moment_of_inertia(_section):
+    return _section.Izz / (1000 ** 4)  # convert to m4
+
+
+if __name__ == '__main__':
+    pass
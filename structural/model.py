@@ -0,0 +1,183 @@
+import numpy as np
+from structural.analysis import LinearAnalysis
+from structural.constraints import Constraints
+from structural.cracking import CrackedSectionAnalysis
+from structural.instrument import stage
+from structural.loads import add_linear_load, add_point_load, get_empty_fixed_end_forces
+from structural.matrices import get_empty_load_matrix, get_discrete_points
+from structural.mesh import build_wall_mesh, build_wall_mesh_from_points
+from structural.mesh import get_wall_points as get_mesh_points
+from structural.pressure import EarthPressureProfile, add_earth_pressure_load
+from structural.springs import SpringAnalysis, get_soil_springs
+
+
+def get_soil_points(_geology):
+    """Returns depths of soil layer boundaries, starting from the top of the wall."""
+    _points = [0]
+    for _soil in _geology:
+        if _soil.isTopLayer:
+            _points.append(_points[-1] + _soil.top_offset)
+        _points.append(_points[-1] + _soil.layer_thickness)
+    return _points
+
+
+def get_node_at(_mesh, _depth):
+    """Returns the node of a mesh at a depth (to 1 mm), e.g. of a support."""
+    _node = int(np.argmin(np.abs(_mesh.y - _depth)))
+    if abs(_mesh.y[_node] - round(_depth, 3)) > 1e-6:
+        raise ValueError("There is no node at {} m; the nearest node is at {} m.".format(_depth, _mesh.y[_node]))
+    return _node
+
+
+def get_wall_points(_segments):
+    """Returns depths of wall segment boundaries, starting from the top of the wall."""
+    _points = [0]
+    for _wall in _segments:
+        _points.append(_points[-1] + _wall.height)
+    return _points
+
+
+class WallModel:
+    """Retaining wall model: soil layers, wall segments, loads and supports, analysed as a vertical beam."""
+    # Depths are measured downwards from the top of the wall, in m.
+
+    def __init__(self, name="Wall"):
+        self.name = name
+        self.geology = []  # soil layers (Soil), from the top down
+        self.segments = []  # wall segments (Wall), from the top down
+        self.loads = []  # lateral loads: LinearLoad, EarthPressureLoad, or PointForce (fx in kN at depth y)
+        self.supports = []  # (depth, condition) pairs, condition: fixed, pinned, guided, free
+        self.props = []  # elastic props (Prop) at any depth
+        self.dredge_level = None  # depth of the soil in front of the wall, where springs start; None for none
+        self.soil_springs = "nonlinear"  # linear (Winkler), nonlinear (p-y, limited by passive pressures)
+        self.cracked_sections = False  # iterate to effective (cracked) stiffness, see CrackedSectionAnalysis
+        self.max_element_length = 0.05
+        self.storage = "banded"  # dense, banded
+
+    def get_vertical_points(self):
+        """Collects soil and wall points into a single sorted list (without duplicates)."""
+        _points = get_soil_points(self.geology) + get_wall_points(self.segments)
+        return sorted(set(round(_point, 3) for _point in _points))
+
+    def get_mandatory_points(self):
+        """Returns depths that must be nodes: the dredge level, supports, props and the ends of loads."""
+        _wall = get_mesh_points(self.geology, self.segments)
+        _points = [round(_depth, 3) for _depth, _ in self.supports] + [round(_prop.depth, 3) for _prop in self.props]
+        for _point in _points:
+            if not _wall[0] <= _point <= _wall[-1]:
+                raise ValueError("Depth {} m is outside the wall, {} to {} m.".format(_point, _wall[0], _wall[-1]))
+        if self.dredge_level is not None:
+            # a node at the dredge level, where the soil springs start
+            _points.append(round(self.dredge_level, 3))
+        _loads = []
+        for _item in self.loads:
+            if hasattr(_item, "q1"):
+                _loads += [_item.top, _item.bottom]
+            elif not hasattr(_item, "state"):
+                _loads.append(_item.y)
+        # loads may reach beyond the wall, only their ends on the wall are nodes
+        return _points + [round(_y, 3) for _y in _loads if _wall[0] <= _y <= _wall[-1]]
+
+    def build_mesh(self, _points=()):
+        """Meshes the wall and assigns materials and sections of its segments to the elements."""
+        # _points: further depths that must be nodes, e.g. excavation levels and props of stages
+        _points = [round(_point, 3) for _point in _points] + self.get_mandatory_points()
+        with stage("mesh"):
+            _wall = get_mesh_points(self.geology, self.segments)
+            if not len(np.setdiff1d(_points, _wall)):
+                return build_wall_mesh(self.geology, self.segments, self.max_element_length)
+            _points = np.union1d(_wall, _points)
+            return build_wall_mesh_from_points(self.geology, self.segments,
+                                               get_discrete_points(self.max_element_length, _points))
+
+    def get_load_matrix(self, _mesh, _loads=None, _fixed_end_forces=None):
+        """Builds the consistent load vector of all loads of the model, or of a given list of loads."""
+        # the loads hold fixed-end moments of loads within elements; pass an array of
+        # get_empty_fixed_end_forces as _fixed_end_forces to collect the element loads,
+        # which element results need (see compute_element_results)
+        _loads = self.loads if _loads is None else _loads
+        with stage("loads", len(_loads)):
+            _load = get_empty_load_matrix(_mesh.num_nodes)
+            _profile = None
+            for _item in _loads:
+                if hasattr(_item, "state"):
+                    if _profile is None:
+                        _profile = EarthPressureProfile(self.geology)
+                    _load = add_earth_pressure_load(_profile, _mesh, _load, _item.state, _item.factor, True,
+                                                    _fixed_end_forces)
+                elif hasattr(_item, "q1"):
+                    _load = add_linear_load(_item.q1, _item.q2, _item.top, _item.bottom, _mesh, _load, True,
+                                            _fixed_end_forces)
+                else:
+                    _load = add_point_load(_item.fx, _item.y, _mesh, _load, True, _fixed_end_forces)
+            return _load
+
+    def get_load_direction(self):
+        """Returns the sign of earth pressure loads on the wall (-1 when there are none)."""
+        for _item in self.loads:
+            if hasattr(_item, "state") and _item.state == "active":
+                return float(np.sign(_item.factor))
+        return -1.0
+
+    def get_supports(self, _mesh):
+        """Converts supports at depths into (node, condition) pairs; every depth must be a node, see build_mesh."""
+        return [(get_node_at(_mesh, _depth), _condition) for _depth, _condition in self.supports]
+
+    def analyse(self):
+        """Runs the analysis and returns ElementResults."""
+        _, _results = self.solve_mesh(self.build_mesh())
+        return _results
+
+    def get_constraints(self, _mesh):
+        """Returns Constraints of the props on a mesh, or None without props."""
+        if not self.props:
+            return None
+        _constraints = Constraints(_mesh.num_nodes)
+        for _prop in self.props:
+            _constraints.add_prop(_mesh, _prop.depth, 1000 * _prop.stiffness)  # convert to N/m by * 1000
+        return _constraints
+
+    def get_analysis(self, _mesh):
+        """Returns the analysis of the model on a mesh: a LinearAnalysis, or a SpringAnalysis with soil springs."""
+        _constraints = self.get_constraints(_mesh)
+        if self.dredge_level is None:
+            return LinearAnalysis(_mesh, self.get_supports(_mesh), self.storage, _constraints)
+        _springs = get_soil_springs(self.geology, _mesh, self.dredge_level, self.get_load_direction(),
+                                    self.soil_springs == "nonlinear")
+        return SpringAnalysis(_mesh, self.get_supports(_mesh), _springs, self.storage, _constraints)
+
+    def get_cracked_analysis(self, _analysis, _mesh):
+        """Wraps an analysis into a CrackedSectionAnalysis with the reinforcement of the wall segments."""
+        if any(_wall.reinforcement_area is None for _wall in self.segments):
+            raise ValueError("Cracked sections need the reinforcement area of every wall segment.")
+        _area = np.array([_wall.reinforcement_area for _wall in self.segments], dtype=float)
+        _cover = np.array([_wall.cover for _wall in self.segments], dtype=float)
+        return CrackedSectionAnalysis(_analysis, _area[_mesh.segment_index], _cover[_mesh.segment_index])
+
+    def solve_mesh(self, _mesh, _initial=None):
+        """Analyses the model on a given mesh; returns displacements [y1, theta1, ... yn, thetan] and ElementResults."""
+        # _initial: estimated displacements to start iterations from, cracked sections and nonlinear springs
+        _analysis = self.get_analysis(_mesh)
+        _fixed_end_forces = get_empty_fixed_end_forces(_mesh)
+        _load = self.get_load_matrix(_mesh, _fixed_end_forces=_fixed_end_forces)
+        if self.cracked_sections:
+            return self.get_cracked_analysis(_analysis, _mesh).run(_load, _initial, _fixed_end_forces)
+        if isinstance(_analysis, SpringAnalysis):
+            _displacements = _analysis.solve(_load, _initial)
+        else:
+            _displacements = _analysis.solve(_load)
+        return _displacements, _analysis.get_element_results(_displacements, _fixed_end_forces)
+
+
+def summarise_results(_results):
+    """Returns extreme values of element results, in kNm, kN and mm."""
+    return {"max_moment": float(np.max(_results.nodal_moments)),
+            "min_moment": float(np.min(_results.nodal_moments)),
+            "max_shear": float(np.max(_results.nodal_shears)),
+            "min_shear": float(np.min(_results.nodal_shears)),
+            "max_deflection": float(1000 * np.max(_results.deflection)),
+            "min_deflection": float(1000 * np.min(_results.deflection))}
+
+
+if __name__ == '__main__':
+    pass
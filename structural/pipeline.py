@@ -0,0 +1,297 @@
+# Streaming analysis of model files.
+#
+# Models are read one at a time and passed through a chain of generators,
+#
+#   read_models -> build_models -> mesh_models -> assemble_models -> solve_models -> post_process -> write_results
+#
+# (with look_up_cache after build_models and store_cache after post_process when a
+# ResultCache is used), each taking and yielding PipelineItems, so only the models in flight are held in memory,
+# however many walls the input contains. A stage that fails records the error on the item,
+# and later stages pass it through untouched.
+#
+# Inputs:
+#   .jsonl  one model per line, in the dict form of structural.schema
+#   .json   a model or a list of models (read whole)
+#   .csv    one row per model part, the rows of a model consecutive, with columns
+#           model, kind (model, soil, segment, load, support, prop) and the fields of that kind:
+#           model:   code, dredge_level, soil_springs, cracked_sections, max_element_length, storage
+#           soil:    name, weight, phi, cohesion, thickness, top_offset, subgrade_modulus
+#           segment: name, height, width, depth (or diameter), concrete, fc, unit_weight, reinforcement_area, cover
+#           load:    type and q1, q2, top, bottom (linear), fx, y (point) or state, factor (earth_pressure)
+#           support: y, condition
+#           prop:    name, y, stiffness
+
+import csv
+import itertools
+import json
+from structural.cache import get_model_key
+from structural.instrument import stage
+from structural.loads import get_empty_fixed_end_forces
+from structural.model import summarise_results
+from structural.schema import model_from_dict
+
+_BOOLEAN = {"true": True, "false": False, "yes": True, "no": False}
+
+
+class PipelineItem:
+    """A model on its way through the pipeline."""
+    __slots__ = ("index", "data", "model", "key", "mesh", "analysis", "loads", "fixed_end_forces", "displacements",
+                 "results", "record")
+
+    def __init__(self, _index, _data):
+        self.index = _index  # position in the input
+        self.data = _data  # dict form of the model
+        self.model = None
+        self.key = None  # cache key, see structural.cache
+        self.mesh = None
+        self.analysis = None
+        self.loads = None
+        self.fixed_end_forces = None  # element loads of loads, see compute_element_results
+        self.displacements = None
+        self.results = None
+        self.record = {"index": _index, "name": _data.get("name", "Wall") if isinstance(_data, dict) else None}
+
+    @property
+    def failed(self):
+        return "error" in self.record
+
+
+class InvalidRecord:
+    """A record of an input file that could not be read; it becomes a failed PipelineItem."""
+
+    def __init__(self, _line, _error):
+        self.line = _line  # line number in the file, from 1
+        self.error = _error
+
+
+def _parse_value(_text):
+    """Converts a CSV field to a number, a boolean or None (empty), leaving other text as it is."""
+    _text = _text.strip()
+    if _text == "":
+        return None
+    if _text.lower() in _BOOLEAN:
+        return _BOOLEAN[_text.lower()]
+    try:
+        return int(_text)
+    except ValueError:
+        pass
+    try:
+        return float(_text)
+    except ValueError:
+        return _text
+
+
+def rows_to_model(_name, _rows):
+    """Builds the dict form of a model from its CSV rows (dicts of parsed values)."""
+    _model = {"name": _name, "geology": [], "segments": [], "loads": [], "supports": [], "props": []}
+    for _row in _rows:
+        _kind = _row.pop("kind", None)
+        _row = {_key: _value for _key, _value in _row.items() if _value is not None}
+        if _kind == "model":
+            _model.update(_row)
+        elif _kind == "soil":
+            _model["geology"].append(_row)
+        elif _kind == "segment":
+            _section = {"type": "circular", "diameter": _row.pop("diameter")} if "diameter" in _row else \
+                {"type": "rectangular", "width": _row.pop("width", 1000), "depth": _row.pop("depth")}
+            _material = {"fc": _row.pop("fc", 35), "weight": _row.pop("unit_weight", 25)}
+            if "concrete" in _row:
+                _material["name"] = _row.pop("concrete")
+            _model["segments"].append(dict(_row, section=_section, material=_material))
+        elif _kind == "load":
+            _model["loads"].append(_row)
+        elif _kind == "support":
+            _model["supports"].append({"depth": _row["y"], "condition": _row.get("condition", "pinned")})
+        elif _kind == "prop":
+            _model["props"].append(dict(_row, depth=_row.pop("y")))
+        else:
+            raise ValueError("Unknown row kind in model {}: {}".format(_name, _kind))
+    return _model
+
+
+def read_models_csv(_path):
+    """Yields model dicts from a CSV file, one model per run of consecutive rows with the same model name."""
+    with open(_path, newline="") as _file:
+        _reader = csv.DictReader(_file)
+        for _name, _rows in itertools.groupby(_reader, key=lambda _row: _row["model"]):
+            yield rows_to_model(_name, [{_key: _parse_value(_value or "") for _key, _value in _row.items()
+                                         if _key != "model"} for _row in _rows])
+
+
+def read_models_jsonl(_path):
+    """Yields model dicts from a JSON lines file, skipping blank lines; malformed lines give InvalidRecords."""
+    with open(_path) as _file:
+        for _number, _line in enumerate(_file, 1):
+            if _line.strip():
+                try:
+                    yield json.loads(_line)
+                except ValueError as _error:
+                    # one bad line fails its own model only, the rest of the file is still read
+                    yield InvalidRecord(_number, _error)
+
+
+def read_models_json(_path):
+    """Yields model dicts of a JSON file holding a model or a list of models."""
+    with open(_path) as _file:
+        _data = json.load(_file)
+    if isinstance(_data, dict):
+        _data = [_data]
+    for _model in _data:
+        yield _model
+
+
+def read_models(_path):
+    """Yields model dicts of a .jsonl, .csv or .json file."""
+    if _path.endswith(".jsonl"):
+        return read_models_jsonl(_path)
+    if _path.endswith(".csv"):
+        return read_models_csv(_path)
+    return read_models_json(_path)
+
+
+def _run_stage(_item, _function):
+    """Runs a stage on an item unless an earlier stage failed, recording any error."""
+    if _item.failed:
+        return
+    try:
+        _function(_item)
+    except Exception as _error:
+        _item.record["error"] = "{}: {}".format(type(_error).__name__, _error)
+
+
+def _build(_item):
+    if isinstance(_item.data, InvalidRecord):
+        raise ValueError("line {}: {}".format(_item.data.line, _item.data.error))
+    _item.model = model_from_dict(_item.data)
+
+
+def build_models(_models, _start=0):
+    """Wraps model dicts into PipelineItems with their WallModels."""
+    for _index, _data in enumerate(_models, _start):
+        _item = PipelineItem(_index, _data)
+        _run_stage(_item, _build)
+        yield _item
+
+
+def _look_up(_item, _cache):
+    _item.key = get_model_key(_item.model)
+    _item.results = _cache.get(_item.key)
+    if _item.results is not None:
+        _item.record["cached"] = True
+
+
+def look_up_cache(_items, _cache):
+    """Takes results of models found in a ResultCache; later stages skip items with results."""
+    for _item in _items:
+        _run_stage(_item, lambda _i: _look_up(_i, _cache))
+        yield _item
+
+
+def _mesh(_item):
+    if _item.results is None:
+        _item.mesh = _item.model.build_mesh()
+
+
+def mesh_models(_items):
+    for _item in _items:
+        _run_stage(_item, _mesh)
+        yield _item
+
+
+def _assemble(_item):
+    if _item.results is not None:
+        return
+    _item.analysis = _item.model.get_analysis(_item.mesh)
+    _item.analysis.assemble()
+    _item.fixed_end_forces = get_empty_fixed_end_forces(_item.mesh)
+    _item.loads = _item.model.get_load_matrix(_item.mesh, _fixed_end_forces=_item.fixed_end_forces)
+
+
+def assemble_models(_items):
+    for _item in _items:
+        _run_stage(_item, _assemble)
+        yield _item
+
+
+def _solve(_item):
+    if _item.results is not None:
+        return
+    if _item.model.cracked_sections:
+        _cracked = _item.model.get_cracked_analysis(_item.analysis, _item.mesh)
+        _item.displacements, _item.results = _cracked.run(_item.loads, _fixed_end_forces=_item.fixed_end_forces)
+    else:
+        _item.displacements = _item.analysis.solve(_item.loads)
+
+
+def solve_models(_items):
+    for _item in _items:
+        _run_stage(_item, _solve)
+        yield _item
+
+
+def _post_process(_item):
+    if _item.results is None:
+        _item.results = _item.analysis.get_element_results(_item.displacements, _item.fixed_end_forces)
+    _item.record.update(summarise_results(_item.results))
+
+
+def post_process(_items):
+    for _item in _items:
+        _run_stage(_item, _post_process)
+        yield _item
+
+
+def store_cache(_items, _cache):
+    """Stores results of newly analysed models in a ResultCache."""
+    for _item in _items:
+        if not _item.failed and not _item.record.get("cached"):
+            _run_stage(_item, lambda _i: _cache.put(_i.key, _i.results))
+        yield _item
+
+
+def write_results(_items, _output, _store=None, _full=False, _metadata=None):
+    """Writes one JSON line per item (and results of successful items to a ResultWriter); yields the items."""
+    # _metadata: fields added to every record and to the store metadata, e.g. the input file
+    _metadata = dict(_metadata or {})
+    for _item in _items:
+        _item.record.update(_metadata)
+        if _store is not None and not _item.failed:
+            _item.record["store_index"] = _store.add(_item.results, dict(_metadata, name=_item.record["name"]))
+        if _full and not _item.failed:
+            _item.record["results"] = get_full_results(_item.results)
+        with stage("write"):
+            _output.write(json.dumps(_item.record) + "\n")
+        yield _item
+
+
+def get_full_results(_results):
+    """Returns nodal results as JSON friendly lists, in m, mm, kNm and kN."""
+    return {"x": _results.x.tolist(), "deflection": (1000 * _results.deflection).tolist(),
+            "rotation": _results.rotation.tolist(), "moment": _results.nodal_moments.tolist(),
+            "shear": _results.nodal_shears.tolist()}
+
+
+def analyse_models(_models, _start=0, _cache=None):
+    """Yields analysed PipelineItems of an iterable of model dicts, using a ResultCache if given."""
+    _items = build_models(_models, _start)
+    if _cache is not None:
+        _items = look_up_cache(_items, _cache)
+    _items = post_process(solve_models(assemble_models(mesh_models(_items))))
+    if _cache is not None:
+        _items = store_cache(_items, _cache)
+    return _items
+
+
+def run_pipeline(_path, _output, _store=None, _full=False, _cache=None):
+    """Analyses every model of a file, writing one JSON line per model; returns (models, failed models)."""
+    _count = 0
+    _failed = 0
+    _items = analyse_models(read_models(_path), _cache=_cache)
+    for _item in write_results(_items, _output, _store, _full, {"file": _path}):
+        _count += 1
+        _failed += _item.failed
+    return _count, _failed
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,96 @@
+import numpy as np
+from structural.loads import add_element_linear_loads
+from structural.mesh import get_layer_index
+
+
+class EarthPressureProfile:
+    """Lateral earth pressures of a list of soil layers, evaluated at arrays of depths."""
+    # Depths are measured downwards from the top of the wall, in m, and the soil
+    # surface is at the top of the first layer. Layer properties and pressure
+    # coefficients (Rankine, as in Soil.ka/kp/k0 but unrounded) are gathered into
+    # arrays once, so every evaluation is a binary search plus array arithmetic.
+    # Pressures are in kPa, i.e. kN/m on a unit length of wall.
+
+    def __init__(self, _geology, _surcharge=0.0):
+        _index = get_layer_index(_geology)
+        self.tops = _index.tops
+        self.bottoms = _index.bottoms
+        self.surcharge = _surcharge  # uniform surcharge on the soil surface, in kPa
+        self.weight = np.array([_soil.weight for _soil in _geology], dtype=float)
+        self.phi = np.array([_soil.phi for _soil in _geology], dtype=float)
+        self.cohesion = np.array([_soil.cohesion for _soil in _geology], dtype=float)
+        self.subgrade_modulus = np.array([_soil.subgrade_modulus for _soil in _geology], dtype=float)
+
+        # pressure coefficients, cached per layer
+        _sin = np.sin(np.radians(self.phi))
+        self.ka = (1 - _sin) / (1 + _sin)
+        with np.errstate(divide="ignore"):
+            self.kp = np.where(self.phi < 90, (1 + _sin) / (1 - _sin), 999)
+        self.k0 = 1 - _sin
+
+        # vertical stress at the top of every layer
+        _thickness = self.bottoms - self.tops
+        self.top_stress = _surcharge + np.concatenate(([0.0], np.cumsum(self.weight * _thickness)[:-1]))
+
+    def get_layers(self, _depths):
+        """Returns the layer at every depth (the lower layer at a boundary), or -1 above the soil surface."""
+        # depths below the last layer are taken to be in the last layer
+        return np.searchsorted(self.tops, _depths, side="right") - 1
+
+    def get_vertical_stress(self, _depths, _layers=None):
+        """Returns vertical stress at depths, in kPa."""
+        _depths = np.asarray(_depths, dtype=float)
+        _layers = self.get_layers(_depths) if _layers is None else np.asarray(_layers)
+        _k = np.clip(_layers, 0, None)
+        _stress = self.top_stress[_k] + self.weight[_k] * (_depths - self.tops[_k])
+        return np.where(_layers >= 0, _stress, 0.0)
+
+    def get_pressure(self, _depths, _state="active", _layers=None):
+        """Returns lateral pressure at depths, in kPa; state: active, passive, at rest."""
+        # _layers optionally forces the layer of every depth, e.g. to evaluate both sides of a boundary
+        _depths = np.asarray(_depths, dtype=float)
+        _layers = self.get_layers(_depths) if _layers is None else np.asarray(_layers)
+        _k = np.clip(_layers, 0, None)
+        _stress = self.get_vertical_stress(_depths, _layers)
+
+        if _state == "active":
+            # cohesion reduces active pressure; tension is not transferred to the wall
+            _pressure = np.maximum(self.ka[_k] * _stress - 2 * self.cohesion[_k] * np.sqrt(self.ka[_k]), 0)
+        elif _state == "passive":
+            _pressure = self.kp[_k] * _stress + 2 * self.cohesion[_k] * np.sqrt(self.kp[_k])
+        else:
+            _pressure = self.k0[_k] * _stress
+
+        return np.where(_layers >= 0, _pressure, 0.0)
+
+    def get_element_pressures(self, _mesh, _state="active"):
+        """Returns pressures at both ends of every element of a vertical mesh, within the element's own layer."""
+        _layers = self.get_layers(_mesh.get_midpoints())
+        return (self.get_pressure(_mesh.y[:-1], _state, _layers),
+                self.get_pressure(_mesh.y[1:], _state, _layers))
+
+
+def get_strip_surcharge_pressure(_depths, _offset, _width, _magnitude):
+    """Returns lateral pressure (kPa) on a rigid wall of a strip surcharge (kPa), at depths below the surface."""
+    # Boussinesq for a strip from _offset to _offset + _width (m) from the wall, doubled for an
+    # unyielding wall:  p = 2 q / pi (beta - sin(beta) cos(theta1 + theta2)),  with the strip
+    # edges at angles theta1, theta2 from the vertical and beta = theta2 - theta1. Arrays
+    # broadcast, e.g. (n, 1) depths and (k,) offsets give one column per strip position.
+    _depths = np.asarray(_depths, dtype=float)
+    _below = np.maximum(_depths, 1e-9)
+    _theta1 = np.arctan2(_offset, _below)
+    _theta2 = np.arctan2(np.add(_offset, _width), _below)
+    _beta = _theta2 - _theta1
+    _pressure = 2 * np.asarray(_magnitude, dtype=float) / np.pi * (_beta - np.sin(_beta) * np.cos(_theta1 + _theta2))
+    return np.where(_depths > 0, _pressure, 0.0)
+
+
+def add_earth_pressure_load(_profile, _mesh, _load_matrix, _state="active", _factor=1.0, _consistent=False,
+                            _fixed_end_forces=None):
+    """Applies earth pressure of an EarthPressureProfile to a load matrix of a vertical mesh."""
+    _p1, _p2 = _profile.get_element_pressures(_mesh, _state)
+    return add_element_linear_loads(_factor * _p1, _factor * _p2, _mesh, _load_matrix, _consistent, _fixed_end_forces)
+
+
+if __name__ == '__main__':
+    pass
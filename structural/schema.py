@@ -0,0 +1,142 @@
+# Plain dict (JSON) form of wall models.
+#
+# {"name": "Wall", "code": "ACI318-14",
+#  "geology": [{"name", "weight", "phi", "cohesion", "thickness", "top_offset", "subgrade_modulus"}, ...],
+#  "segments": [{"name", "height", "section": {"type": "rectangular", "width", "depth"} or
+#                {"type": "circular", "diameter"}, "material": {"name", "fc", "weight", "lightweight"},
+#                "reinforcement_area", "cover"}, ...],
+#  "loads": [{"type": "linear", "q1", "q2", "top", "bottom"}, {"type": "point", "fx", "y"},
+#            {"type": "earth_pressure", "state", "factor"}, ...],
+#  "supports": [{"depth", "condition"}, ...], "props": [{"name", "depth", "stiffness"}, ...],
+#  "dredge_level", "soil_springs", "cracked_sections", "max_element_length", "storage"}
+#
+# Layers and segments are listed from the top down, depths are from the top of the wall
+# in m. Only name, geology and segments are required; everything else takes the WallModel
+# and class defaults. Sections and materials are read through the shared registries.
+
+from structural.elements import Soil, Wall, LinearLoad, EarthPressureLoad, PointForce, Prop, \
+    get_rectangular_section, get_circular_section
+from structural.materials import Aci31814, get_concrete, get_code
+from structural.model import WallModel
+
+SCHEMA_VERSION = 1
+
+_MODEL_SETTINGS = ("dredge_level", "soil_springs", "cracked_sections", "max_element_length", "storage")
+
+
+def soil_to_dict(_soil):
+    return {"name": _soil.name, "weight": _soil.weight, "phi": _soil.phi, "cohesion": _soil.cohesion,
+            "thickness": _soil.layer_thickness, "top_offset": _soil.top_offset if _soil.isTopLayer else 0.0,
+            "subgrade_modulus": _soil.subgrade_modulus}
+
+
+def soil_from_dict(_data, _is_top_layer=False):
+    _soil = Soil(_data.get("name", "Default Soil"), _data.get("weight", 18.0), _data.get("phi", 30.0))
+    _soil.cohesion = _data.get("cohesion", 0.0)
+    _soil.layer_thickness = _data.get("thickness", 1.0)
+    _soil.isTopLayer = _is_top_layer
+    _soil.top_offset = _data.get("top_offset", 0.0) if _is_top_layer else 0.0
+    _soil.subgrade_modulus = _data.get("subgrade_modulus", _soil.subgrade_modulus)
+    return _soil
+
+
+def section_to_dict(_section):
+    if hasattr(_section, "diameter"):
+        return {"type": "circular", "diameter": _section.diameter}
+    return {"type": "rectangular", "width": _section.width, "depth": _section.depth}
+
+
+def section_from_dict(_data):
+    if _data.get("type", "rectangular") == "circular":
+        return get_circular_section(_data["diameter"])
+    return get_rectangular_section(_data.get("width", 1000), _data["depth"])
+
+
+def material_to_dict(_material):
+    _data = {"name": _material.Name, "fc": _material.CompressionStrength, "weight": _material.UnitWeight}
+    if _material.LightweightFactor != 1.0:
+        _data["lightweight"] = _material.LightweightFactor
+    return _data
+
+
+def material_from_dict(_data, _code):
+    return get_concrete(_code, _data.get("name", "Concrete C{}".format(_data["fc"])), _data["fc"],
+                        _data.get("weight", 25), _data.get("lightweight", 1.0))
+
+
+def wall_to_dict(_wall):
+    return {"name": _wall.name if isinstance(_wall.name, str) else "", "height": _wall.height,
+            "section": section_to_dict(_wall.section), "material": material_to_dict(_wall.material),
+            "reinforcement_area": _wall.reinforcement_area, "cover": _wall.cover}
+
+
+def wall_from_dict(_data, _id, _code):
+    _wall = Wall(_id)
+    _wall.name = _data.get("name", "")
+    _wall.height = _data["height"]
+    _wall.section = section_from_dict(_data["section"])
+    _wall.material = material_from_dict(_data.get("material", {"fc": 35}), _code)
+    _wall.reinforcement_area = _data.get("reinforcement_area")
+    _wall.cover = _data.get("cover", 50.0)
+    return _wall
+
+
+def load_to_dict(_load):
+    if hasattr(_load, "state"):
+        return {"type": "earth_pressure", "state": _load.state, "factor": _load.factor}
+    if hasattr(_load, "q1"):
+        return {"type": "linear", "q1": _load.q1, "q2": _load.q2, "top": _load.top, "bottom": _load.bottom}
+    return {"type": "point", "fx": _load.fx, "y": _load.y}
+
+
+def load_from_dict(_data):
+    _type = _data.get("type", "linear")
+    if _type == "earth_pressure":
+        return EarthPressureLoad(_data.get("state", "active"), _data.get("factor", 1.0))
+    if _type == "linear":
+        return LinearLoad(_data["q1"], _data.get("q2", _data["q1"]), _data["top"], _data["bottom"])
+    if _type == "point":
+        _force = PointForce()
+        _force.fx = _data["fx"]
+        _force.y = _data["y"]
+        return _force
+    raise ValueError("Unknown load type: {}".format(_type))
+
+
+def model_to_dict(_model):
+    """Returns the plain dict form of a WallModel."""
+    _codes = set(_wall.material.code.CodeName for _wall in _model.segments)
+    if len(_codes) > 1:
+        raise ValueError("All wall segments of a model must use the same structural code.")
+    _data = {"version": SCHEMA_VERSION, "name": _model.name,
+             "code": _codes.pop() if _codes else Aci31814.CodeName,
+             "geology": [soil_to_dict(_soil) for _soil in _model.geology],
+             "segments": [wall_to_dict(_wall) for _wall in _model.segments],
+             "loads": [load_to_dict(_load) for _load in _model.loads],
+             "supports": [{"depth": _depth, "condition": _condition} for _depth, _condition in _model.supports],
+             "props": [{"name": _prop.name, "depth": _prop.depth, "stiffness": _prop.stiffness}
+                       for _prop in _model.props]}
+    for _setting in _MODEL_SETTINGS:
+        _data[_setting] = getattr(_model, _setting)
+    return _data
+
+
+def model_from_dict(_data):
+    """Creates a WallModel from its plain dict form."""
+    _code = get_code(_data.get("code", Aci31814.CodeName))
+    _model = WallModel(_data.get("name", "Wall"))
+    _model.geology = [soil_from_dict(_soil, i == 0) for i, _soil in enumerate(_data["geology"])]
+    _model.segments = [wall_from_dict(_wall, i, _code) for i, _wall in enumerate(_data["segments"])]
+    _model.loads = [load_from_dict(_load) for _load in _data.get("loads", [])]
+    _model.supports = [(_support["depth"], _support.get("condition", "pinned"))
+                       for _support in _data.get("supports", [])]
+    _model.props = [Prop(_prop.get("name", "Prop"), _prop["depth"], _prop.get("stiffness", 1e6))
+                    for _prop in _data.get("props", [])]
+    for _setting in _MODEL_SETTINGS:
+        if _data.get(_setting) is not None:
+            setattr(_model, _setting, _data[_setting])
+    return _model
+
+
+if __name__ == '__main__':
+    pass
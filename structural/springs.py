@@ -0,0 +1,151 @@
+import numpy as np
+from structural.analysis import LinearAnalysis, LowRankUpdate
+from structural.banded import BlockTridiagonalMatrix
+from structural.pressure import EarthPressureProfile
+
+
+class SoilSprings:
+    """Lateral soil springs at mesh nodes, elastic-perfectly plastic (p-y) between reaction limits."""
+    # The reaction of node i to a displacement u is clip(-stiffness[i] * u, lower[i], upper[i]),
+    # in N; infinite limits make a spring linear (Winkler).
+
+    def __init__(self, _stiffness, _lower=None, _upper=None):
+        self.stiffness = np.asarray(_stiffness, dtype=float)  # N/m, one per node
+        self.lower = np.full(len(self.stiffness), -np.inf) if _lower is None else np.asarray(_lower, dtype=float)
+        self.upper = np.full(len(self.stiffness), np.inf) if _upper is None else np.asarray(_upper, dtype=float)
+
+    @property
+    def is_linear(self):
+        return bool(np.all(np.isinf(self.lower)) and np.all(np.isinf(self.upper)))
+
+    def get_reactions(self, _displacements):
+        """Returns spring reactions (N) to nodal displacements (m)."""
+        return np.clip(-self.stiffness * _displacements, self.lower, self.upper)
+
+    def get_yielded(self, _displacements):
+        """Returns a mask of springs at a reaction limit."""
+        _elastic = -self.stiffness * _displacements
+        return (_elastic <= self.lower) | (_elastic >= self.upper)
+
+
+def get_tributary_lengths(_mesh, _from_depth=0.0):
+    """Returns the length of wall below a depth attributed to every node, half of each adjacent element."""
+    _below = np.clip(_mesh.y[1:] - np.maximum(_mesh.y[:-1], _from_depth), 0, None)
+    _lengths = np.zeros(_mesh.num_nodes)
+    _lengths[:-1] += 0.5 * _below
+    _lengths[1:] += 0.5 * _below
+    return _lengths
+
+
+def get_soil_springs(_geology, _mesh, _dredge_level, _direction=-1.0, _nonlinear=True):
+    """Builds soil springs on the embedded part of a wall, below the dredge level, on a unit length of wall."""
+    # _direction is the sign of the retained soil loads: the soil in front of the wall
+    # resists movement in that direction up to its passive pressure (with the overburden
+    # above the dredge level removed). The retained soil already acts on the wall with its
+    # active pressure (an EarthPressureLoad), so it resists movement the other way up to
+    # the rest of its passive pressure, the difference between its passive and active limits
+    _profile = EarthPressureProfile(_geology)
+    _lengths = get_tributary_lengths(_mesh, _dredge_level)
+    _layers = np.clip(_profile.get_layers(_mesh.y), 0, None)
+    _stiffness = 1000 * _profile.subgrade_modulus[_layers] * _lengths  # convert to N/m by * 1000
+    if not _nonlinear:
+        return SoilSprings(_stiffness)
+
+    _stress = _profile.get_vertical_stress(_mesh.y)
+    _front_stress = np.clip(_stress - _profile.get_vertical_stress(_dredge_level), 0, None)
+    _kp = _profile.kp[_layers]
+    _cohesion = 2 * _profile.cohesion[_layers] * np.sqrt(_kp)
+    _front = 1000 * (_kp * _front_stress + _cohesion) * _lengths
+    _net = _profile.get_pressure(_mesh.y, "passive", _layers) - _profile.get_pressure(_mesh.y, "active", _layers)
+    _back = 1000 * _net * _lengths
+    if _direction < 0:
+        return SoilSprings(_stiffness, -_back, _front)
+    return SoilSprings(_stiffness, -_front, _back)
+
+
+class SpringAnalysis(LinearAnalysis):
+    """Static analysis of a beam on lateral soil springs; nonlinear springs are solved by Newton iteration."""
+    # The matrix K + Ks, with the initial spring stiffness Ks, is factorised once. Every
+    # Newton step removes the stiffness of yielded springs as a low-rank update of that
+    # factorisation, so iterations cost two solves rather than a refactorisation. When
+    # more than max_update_dofs springs have yielded, or the tangent is singular, the
+    # step falls back to the initial stiffness (modified Newton).
+
+    def __init__(self, _beam_elements, _supports, _springs, _storage="banded", _constraints=None):
+        super().__init__(_beam_elements, _supports, _storage, _constraints)
+        self.springs = _springs
+        self.tolerance = 1e-6  # on the residual, relative to the load
+        self.max_iterations = 100
+        self.num_iterations = 0  # of the last solve
+
+    def assemble(self):
+        """Assembles the global stiffness matrix with the initial spring stiffness and applies the supports."""
+        super().assemble()
+        _free = np.ones(self.global_matrix.shape[-1] // 2, dtype=bool)
+        _free[self.restrained_dofs[self.restrained_dofs % 2 == 0] // 2] = False
+        _stiffness = np.where(_free, self.springs.stiffness, 0)
+        if isinstance(self.global_matrix, BlockTridiagonalMatrix):
+            self.global_matrix.diagonal[:, 0, 0] += _stiffness
+        else:
+            _dofs = 2 * np.arange(len(_stiffness))
+            self.global_matrix[_dofs, _dofs] += _stiffness
+        return self.global_matrix
+
+    def solve(self, _loads, _initial=None):
+        """Solves for a load vector [V1, M1, ... Vn, Mn], or for a (2n x k) block with one load case per column."""
+        # _initial: displacements to start Newton iteration from, e.g. of a coarser mesh; linear springs ignore it
+        if self.springs.is_linear:
+            return super().solve(_loads)
+        _loads = np.array(_loads, dtype=float)
+        if _loads.ndim == 2:
+            return np.stack([self._solve_nonlinear(_loads[:, i], None if _initial is None else _initial[:, i])
+                             for i in range(0, _loads.shape[1])], axis=1)
+        return self._solve_nonlinear(_loads, _initial)
+
+    def _solve_nonlinear(self, _loads, _initial=None):
+        if self.factorization is None or self.update is not None:
+            # element updates are folded into a fresh factorisation before iterating
+            if self.global_matrix is None:
+                self.assemble()
+            self.factorize()
+        _loads = self.get_constrained_loads(_loads)
+        _num_dofs = len(_loads)
+        _springs = self.springs
+        _restrained = np.zeros(_num_dofs // 2, dtype=bool)
+        _restrained[self.restrained_dofs[self.restrained_dofs % 2 == 0] // 2] = True
+        _stiffness = np.where(_restrained, 0, _springs.stiffness)
+        _scale = max(np.linalg.norm(_loads), 1.0)
+
+        if _initial is None:
+            _u = self.factorization.solve(_loads)
+        else:
+            # restrained dofs keep their prescribed values, which Newton steps do not change
+            _u = np.array(_initial, dtype=float)
+            _u[self.restrained_dofs] = 0 if self.prescribed is None else self.prescribed[self.restrained_dofs]
+        for i in range(1, self.max_iterations + 1):
+            self.num_iterations = i
+            _w = _u[0::2]
+            # residual of the structure with the actual spring reactions; (K + Ks) u - Ks u = K u
+            _reactions = np.where(_restrained, 0, _springs.get_reactions(_w))
+            _residual = _loads - self.global_matrix.dot(_u)
+            _residual[0::2] += _reactions + _stiffness * _w
+            _residual[self.restrained_dofs] = 0
+            if np.linalg.norm(_residual) <= self.tolerance * _scale:
+                return _u
+
+            _step = self.factorization.solve(_residual)
+            _yielded = np.flatnonzero(_springs.get_yielded(_w) & ~_restrained)
+            if 0 < len(_yielded) <= self.max_update_dofs:
+                # tangent stiffness: the yielded springs carry no extra load
+                try:
+                    _update = LowRankUpdate(self.factorization, _num_dofs, 2 * _yielded, np.diag(-_stiffness[_yielded]))
+                    _step = _update.correct(_step)
+                except np.linalg.LinAlgError:
+                    pass
+            _u = _u + _step
+
+        raise RuntimeError("Soil springs did not converge in {} iterations.".format(self.max_iterations))
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,143 @@
+# Staged construction of embedded walls: excavation, propping and prop removal.
+#
+# A sequence of stages is analysed incrementally on one mesh, which has nodes at every
+# excavation level and prop of every stage. The soil in front of the wall is represented by
+# linear Winkler springs below the current excavation level, props by lateral springs, and
+# both are added to and removed from the factorisation as low-rank updates (see
+# LinearAnalysis.add_spring_stiffness): stages that only change loads or props cost about
+# one solve, and deep excavations are refactorised once their updates grow too large.
+#
+# Every stage solves for the change of displacements from the previous stage,
+#
+#   (K + S) du = df + sum over removed springs of s (u - u0)
+#
+# where S is the spring stiffness of the stage, df the change of loads and u0 the
+# displacement of a spring when it was installed (zero for the soil). Displacements are
+# therefore locked into props when they are installed, and the force of a removed prop or
+# excavated soil is released onto the wall.
+
+import numpy as np
+from structural.analysis import LinearAnalysis
+from structural.elements import Prop
+from structural.loads import get_empty_fixed_end_forces
+from structural.mesh import get_layer_index
+from structural.model import get_node_at
+from structural.springs import get_soil_springs
+
+
+class Stage:
+    """A construction stage: the excavation level, props in place and loads acting on the wall."""
+
+    def __init__(self, name="Stage", excavation_level=None, props=None, loads=None):
+        self.name = name
+        self.excavation_level = excavation_level  # depth of the soil in front; None for that of the previous stage
+        self.props = props  # Props in place; None for those of the previous stage (none before the first stage)
+        self.loads = loads  # all loads of the stage; None for those of the previous stage (of the model at first)
+
+
+class StageResults:
+    """Total displacements, ElementResults and prop forces (kN per m, on the wall) at the end of a stage."""
+
+    def __init__(self, _name, _displacements, _results, _prop_forces):
+        self.name = _name
+        self.displacements = _displacements
+        self.results = _results
+        self.prop_forces = _prop_forces  # {prop name: force}
+
+
+class StagedAnalysis:
+    """Incremental analysis of a WallModel through a sequence of Stages."""
+    # The model supports (e.g. a fixed toe) and props apply to all stages, props of the model
+    # installed before the first stage; the front soil starts at the dredge level of the
+    # model, or at the soil surface when it is None.
+
+    def __init__(self, _model, _stages):
+        self.model = _model
+        self.stages = list(_stages)
+        self.mesh = None
+        self.analysis = None
+
+    def build_mesh(self):
+        """Meshes the wall with nodes at all excavation levels and props of the stages."""
+        _points = [_stage.excavation_level for _stage in self.stages if _stage.excavation_level is not None]
+        _points += [_prop.depth for _stage in self.stages for _prop in _stage.props or []]
+        self.mesh = self.model.build_mesh(_points)
+        self.analysis = LinearAnalysis(self.mesh, self.model.get_supports(self.mesh), _storage=self.model.storage)
+        if self.model.storage == "banded":
+            # a banded factorisation costs about two solves, so excavating more than a few
+            # nodes is cheaper to refactorise than to correct; props stay low-rank updates
+            self.analysis.max_update_dofs = 16
+        return self.mesh
+
+    def get_soil_stiffness(self, _level):
+        """Returns stiffness (N/m) of the soil springs below an excavation level, per node."""
+        return get_soil_springs(self.model.geology, self.mesh, _level, _nonlinear=False).stiffness
+
+    def get_prop_node(self, _prop):
+        return get_node_at(self.mesh, _prop.depth)
+
+    def run(self):
+        """Analyses all stages in turn; returns a list of StageResults."""
+        if self.mesh is None:
+            self.build_mesh()
+        _level = self.model.dredge_level
+        if _level is None:
+            _level = get_layer_index(self.model.geology).tops[0]
+        _soil = self.get_soil_stiffness(_level)
+        # Prop: (node, lateral displacement at installation); props of the model are never removed
+        _props = {_prop: (self.get_prop_node(_prop), 0.0) for _prop in self.model.props}
+        _stiffness = _soil.copy()
+        for _prop, (_node, _) in _props.items():
+            _stiffness[_node] += 1000 * _prop.stiffness  # convert to N/m by * 1000
+        self.analysis.add_spring_stiffness(_stiffness)
+
+        _displacements = np.zeros(2 * self.mesh.num_nodes)
+        _load = np.zeros(2 * self.mesh.num_nodes)
+        _fixed_end_forces = get_empty_fixed_end_forces(self.mesh)  # of the loads of the current stage
+        _loads = self.model.loads
+        _stage_results = []
+        for _stage in self.stages:
+            _change = np.zeros(self.mesh.num_nodes)
+            _release = np.zeros(2 * self.mesh.num_nodes)
+
+            if _stage.excavation_level is not None and _stage.excavation_level != _level:
+                if _stage.excavation_level < _level:
+                    raise ValueError("Stage {}: the excavation level cannot rise from {} to {}.".format(
+                        _stage.name, _level, _stage.excavation_level))
+                _level = _stage.excavation_level
+                _excavated = _soil - self.get_soil_stiffness(_level)
+                _change -= _excavated
+                _release[0::2] += _excavated * _displacements[0::2]
+                _soil = _soil - _excavated
+
+            if _stage.props is not None:
+                for _prop in list(_props):
+                    if _prop not in _stage.props and _prop not in self.model.props:
+                        _node, _installed = _props.pop(_prop)
+                        _change[_node] -= 1000 * _prop.stiffness
+                        _release[2 * _node] += 1000 * _prop.stiffness * (_displacements[2 * _node] - _installed)
+                for _prop in _stage.props:
+                    if _prop not in _props:
+                        _node = self.get_prop_node(_prop)
+                        _props[_prop] = (_node, _displacements[2 * _node])
+                        _change[_node] += 1000 * _prop.stiffness  # convert to N/m by * 1000
+
+            if np.any(_change):
+                self.analysis.add_spring_stiffness(_change)
+            _previous = _load
+            if _stage.loads is not None or not _stage_results:
+                _loads = _loads if _stage.loads is None else _stage.loads
+                _fixed_end_forces = get_empty_fixed_end_forces(self.mesh)
+                _load = self.model.get_load_matrix(self.mesh, _loads, _fixed_end_forces)
+
+            _displacements = _displacements + self.analysis.solve(_load - _previous + _release)
+            _forces = {_prop.name: -_prop.stiffness * (_displacements[2 * _node] - _installed)
+                       for _prop, (_node, _installed) in _props.items()}
+            _stage_results.append(StageResults(_stage.name, _displacements,
+                                               self.analysis.get_element_results(_displacements, _fixed_end_forces),
+                                               _forces))
+        return _stage_results
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,187 @@
+# Columnar on-disk store of analysis results.
+#
+# store/
+#   manifest.json            quantities, chunks and number of walls; replaced atomically per chunk
+#   metadata.jsonl           one JSON line per wall (name and any caller metadata), in wall order
+#   chunk_00000/offsets.npy  start of every wall in the node arrays of the chunk, plus the end
+#   chunk_00000/<name>.npy   one flat array per quantity, the walls of the chunk one after another
+#
+# Nodal quantities hold one value per node; element quantities one row per element,
+# so wall i of a chunk owns elements offsets[i] - i to offsets[i + 1] - i - 1. Arrays are
+# plain .npy files, so readers memory-map them and touch only the walls and quantities
+# they slice.
+
+import json
+import os
+import tempfile
+import numpy as np
+from structural.matrices import ElementResults
+
+NODAL_QUANTITIES = ("x", "deflection", "rotation", "nodal_moments", "nodal_shears")
+ELEMENT_QUANTITIES = ("element_moments", "element_shears")
+
+
+def _write_json_atomic(_path, _data):
+    """Writes JSON to a temporary file and moves it into place, so readers never see a partial file."""
+    _handle, _temporary = tempfile.mkstemp(dir=os.path.dirname(_path), suffix=".tmp")
+    try:
+        with os.fdopen(_handle, "w") as _file:
+            json.dump(_data, _file)
+        os.replace(_temporary, _path)
+    except BaseException:
+        os.unlink(_temporary)
+        raise
+
+
+class ResultWriter:
+    """Appends ElementResults of single walls to a result store, a chunk of walls at a time."""
+
+    def __init__(self, _path, _chunk_size=1024):
+        self.path = _path
+        self.chunk_size = _chunk_size  # walls per chunk
+        os.makedirs(_path, exist_ok=True)
+        self.manifest = self._read_manifest()
+        self.pending = []  # (results, metadata) not yet written
+        self._truncate_metadata()
+
+    def _read_manifest(self):
+        _path = os.path.join(self.path, "manifest.json")
+        if os.path.exists(_path):
+            with open(_path) as _file:
+                return json.load(_file)
+        return {"version": 1, "nodal": list(NODAL_QUANTITIES), "element": list(ELEMENT_QUANTITIES),
+                "chunks": [], "num_walls": 0}
+
+    def _truncate_metadata(self):
+        """Drops metadata lines of a chunk that was interrupted before its manifest was written."""
+        _path = os.path.join(self.path, "metadata.jsonl")
+        if not os.path.exists(_path):
+            return
+        _length = 0
+        with open(_path, "rb") as _file:
+            for _line, _ in zip(_file, range(0, self.manifest["num_walls"])):
+                _length += len(_line)
+        if _length < os.path.getsize(_path):
+            with open(_path, "r+b") as _file:
+                _file.truncate(_length)
+
+    def add(self, _results, _metadata=None):
+        """Adds results of a wall (a single load case); returns the index of the wall in the store."""
+        if np.ndim(_results.deflection) != 1:
+            raise ValueError("Only results of a single load case can be stored; see ElementResults.get_case.")
+        self.pending.append((_results, dict(_metadata or {})))
+        _index = self.manifest["num_walls"] + len(self.pending) - 1
+        if len(self.pending) >= self.chunk_size:
+            self.flush()
+        return _index
+
+    def flush(self):
+        """Writes pending walls as a new chunk."""
+        if not self.pending:
+            return
+        _name = "chunk_{:05d}".format(len(self.manifest["chunks"]))
+        _directory = os.path.join(self.path, _name)
+        os.makedirs(_directory, exist_ok=True)
+
+        _results = [_item[0] for _item in self.pending]
+        _counts = np.array([len(_r.x) for _r in _results])
+        np.save(os.path.join(_directory, "offsets.npy"), np.concatenate(([0], np.cumsum(_counts))))
+        for _quantity in NODAL_QUANTITIES + ELEMENT_QUANTITIES:
+            np.save(os.path.join(_directory, _quantity + ".npy"),
+                    np.concatenate([np.asarray(getattr(_r, _quantity), dtype=float) for _r in _results]))
+
+        with open(os.path.join(self.path, "metadata.jsonl"), "a") as _file:
+            for _, _metadata in self.pending:
+                _file.write(json.dumps(_metadata) + "\n")
+
+        # the chunk becomes visible to readers with the manifest
+        self.manifest["chunks"].append({"name": _name, "walls": len(self.pending)})
+        self.manifest["num_walls"] += len(self.pending)
+        _write_json_atomic(os.path.join(self.path, "manifest.json"), self.manifest)
+        self.pending = []
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+        return False
+
+
+class ResultStore:
+    """Memory-mapped reader of a result store."""
+
+    def __init__(self, _path):
+        self.path = _path
+        with open(os.path.join(_path, "manifest.json")) as _file:
+            self.manifest = json.load(_file)
+        _walls = [_chunk["walls"] for _chunk in self.manifest["chunks"]]
+        self.chunk_starts = np.concatenate(([0], np.cumsum(_walls))).astype(int)  # first wall of every chunk
+        self.arrays = {}  # (chunk, quantity): memory-mapped array, opened on first use
+        self.metadata = None
+
+    @property
+    def num_walls(self):
+        return int(self.chunk_starts[-1])
+
+    def __len__(self):
+        return self.num_walls
+
+    def _get_array(self, _chunk, _quantity):
+        _key = (_chunk, _quantity)
+        if _key not in self.arrays:
+            _file = os.path.join(self.path, self.manifest["chunks"][_chunk]["name"], _quantity + ".npy")
+            self.arrays[_key] = np.load(_file, mmap_mode="r")
+        return self.arrays[_key]
+
+    def _locate(self, _wall):
+        if not 0 <= _wall < self.num_walls:
+            raise IndexError("Wall {} is not in the store of {} walls.".format(_wall, self.num_walls))
+        _chunk = int(np.searchsorted(self.chunk_starts, _wall, side="right") - 1)
+        return _chunk, _wall - int(self.chunk_starts[_chunk])
+
+    def get(self, _wall, _quantity):
+        """Returns a quantity of a wall as a read-only memory-mapped view."""
+        _chunk, _local = self._locate(_wall)
+        _offsets = self._get_array(_chunk, "offsets")
+        _start, _end = int(_offsets[_local]), int(_offsets[_local + 1])
+        if _quantity in ELEMENT_QUANTITIES:
+            _start, _end = _start - _local, _end - _local - 1
+        return self._get_array(_chunk, _quantity)[_start:_end]
+
+    def get_results(self, _wall):
+        """Returns all results of a wall as ElementResults (of memory-mapped views)."""
+        return ElementResults(*[self.get(_wall, _quantity) for _quantity in
+                                ("x", "deflection", "rotation", "element_moments", "nodal_moments",
+                                 "element_shears", "nodal_shears")])
+
+    def iter_quantity(self, _quantity):
+        """Yields a quantity of every wall in turn, as memory-mapped views."""
+        for _wall in range(0, self.num_walls):
+            yield self.get(_wall, _quantity)
+
+    def reduce_quantity(self, _quantity, _function=np.maximum):
+        """Reduces a nodal quantity of every wall to one value (e.g. np.maximum, np.minimum), chunk by chunk."""
+        _values = []
+        for _chunk in range(0, len(self.manifest["chunks"])):
+            _offsets = self._get_array(_chunk, "offsets")
+            _values.append(_function.reduceat(self._get_array(_chunk, _quantity), _offsets[:-1]))
+        return np.concatenate(_values) if _values else np.zeros(0)
+
+    def get_metadata(self, _wall=None):
+        """Returns metadata of a wall, or a list of metadata of all walls."""
+        if self.metadata is None:
+            with open(os.path.join(self.path, "metadata.jsonl")) as _file:
+                # lines beyond the manifest belong to a chunk still being written
+                self.metadata = [json.loads(_line) for _line, _ in zip(_file, range(0, self.num_walls))]
+        if _wall is None:
+            return self.metadata
+        self._locate(_wall)
+        return self.metadata[_wall]
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,190 @@
+import copy
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, as_completed, wait
+from structural.elements import CircularSection, RectangularSection, get_circular_section, get_rectangular_section
+from structural.materials import Concrete, get_concrete
+from structural.model import summarise_results
+
+# immutable classes: the arguments of their shared registry, which rebuilds an instance with one of them changed
+_REGISTRIES = {RectangularSection: (("width", "depth"), get_rectangular_section),
+               CircularSection: (("diameter",), get_circular_section),
+               Concrete: (("code", "Name", "CompressionStrength", "UnitWeight", "LightweightFactor"), get_concrete)}
+
+
+def get_rebuilt(_item, _name, _value):
+    """Returns the shared instance of an immutable section or material with one attribute changed."""
+    _names, _registry = _REGISTRIES[type(_item)]
+    if _name not in _names:
+        raise AttributeError("{} of {} cannot be set; it follows from {}.".format(_name, type(_item).__name__,
+                                                                                   ", ".join(_names)))
+    return _registry(*[_value if _n == _name else getattr(_item, _n) for _n in _names])
+
+
+def set_item(_target, _key, _value):
+    """Sets an item of a list (integer key) or an attribute."""
+    if isinstance(_key, int) or _key.isdigit():
+        _target[int(_key)] = _value
+    else:
+        setattr(_target, _key, _value)
+
+
+def apply_parameter(_model, _path, _value):
+    """Sets a model attribute addressed by a dotted path, e.g. "segments.2.section" or "geology.*.phi"."""
+    # integer parts index lists, "*" applies the value to every item of a list; attributes of
+    # immutable sections and materials, e.g. "segments.*.section.depth", replace the instance
+    _targets = [(None, None, _model)]  # (parent, key, item)
+    _parts = _path.split(".")
+    for _part in _parts[:-1]:
+        if _part == "*":
+            _targets = [(_target, i, _item) for _, _, _target in _targets for i, _item in enumerate(_target)]
+        elif _part.isdigit():
+            _targets = [(_target, _part, _target[int(_part)]) for _, _, _target in _targets]
+        else:
+            _targets = [(_target, _part, getattr(_target, _part)) for _, _, _target in _targets]
+    for _parent, _key, _target in _targets:
+        if _parts[-1] == "*":
+            for i in range(0, len(_target)):
+                _target[i] = _value
+        elif type(_target) in _REGISTRIES:
+            set_item(_parent, _key, get_rebuilt(_target, _parts[-1], _value))
+        else:
+            setattr(_target, _parts[-1], _value)
+    return _model
+
+
+def get_parameter_label(_value):
+    """Returns a JSON friendly label for a parameter value (sections and materials by their names)."""
+    if isinstance(_value, (int, float, str, bool)) or _value is None:
+        return _value
+    for _attribute in ("name", "Name"):
+        if isinstance(getattr(_value, _attribute, None), str):
+            return getattr(_value, _attribute)
+    return str(_value)
+
+
+# state of a worker process, set once by _init_worker rather than pickled with every chunk
+_worker_state = {}
+
+
+def _init_worker(_model, _names, _summarise):
+    _worker_state["model"] = _model
+    _worker_state["names"] = _names
+    _worker_state["summarise"] = _summarise
+
+
+def _run_chunk(_chunk):
+    """Analyses a chunk of (case index, parameter values) pairs; returns one record per case."""
+    _records = []
+    for _index, _values in _chunk:
+        _record = {"case": _index,
+                   "parameters": {_name: get_parameter_label(_value)
+                                  for _name, _value in zip(_worker_state["names"], _values)}}
+        try:
+            _model = copy.deepcopy(_worker_state["model"])
+            for _name, _value in zip(_worker_state["names"], _values):
+                apply_parameter(_model, _name, _value)
+            _record.update(_worker_state["summarise"](_model.analyse()))
+        except Exception as _error:
+            # a failed case is recorded, so that it is not re-run on resume
+            _record["error"] = "{}: {}".format(type(_error).__name__, _error)
+        _records.append(_record)
+    return _records
+
+
+class DesignSweep:
+    """Brute force sweep over combinations of wall model parameters."""
+    # Cases are analysed on a process pool in chunks, and their summaries are
+    # streamed to a JSON lines file as chunks complete. The output file is also
+    # the checkpoint: running the sweep again skips every case already in it.
+
+    def __init__(self, _model, _parameters, _output_path):
+        self.model = _model  # base WallModel
+        self.parameters = dict(_parameters)  # {dotted path: list of values}, see apply_parameter
+        self.output_path = _output_path
+        self.chunk_size = 64  # cases per work item
+        self.workers = None  # number of processes; None for one per CPU, 1 to run in this process
+        self.summarise = summarise_results  # module level function of ElementResults, returning a dict
+
+    def get_num_cases(self):
+        _num = 1
+        for _values in self.parameters.values():
+            _num *= len(_values)
+        return _num
+
+    def get_cases(self, _skip=()):
+        """Yields (case index, parameter values) for every combination of parameters."""
+        for _index, _values in enumerate(itertools.product(*self.parameters.values())):
+            if _index not in _skip:
+                yield _index, _values
+
+    def get_completed_cases(self):
+        """Reads case indices already written to the output file, dropping a partly written last line."""
+        _completed = set()
+        if not os.path.exists(self.output_path):
+            return _completed
+        _good_length = 0
+        with open(self.output_path, "rb") as _file:
+            for _line in _file:
+                if not _line.endswith(b"\n"):
+                    break
+                try:
+                    _completed.add(json.loads(_line)["case"])
+                except (ValueError, KeyError):
+                    break
+                _good_length += len(_line)
+        if _good_length < os.path.getsize(self.output_path):
+            with open(self.output_path, "r+b") as _file:
+                _file.truncate(_good_length)
+        return _completed
+
+    def _get_chunks(self, _skip):
+        _cases = self.get_cases(_skip)
+        while True:
+            _chunk = list(itertools.islice(_cases, self.chunk_size))
+            if not _chunk:
+                return
+            yield _chunk
+
+    def run(self):
+        """Runs all outstanding cases and returns the number of cases analysed."""
+        _completed = self.get_completed_cases()
+        _names = list(self.parameters.keys())
+        _chunks = self._get_chunks(_completed)
+        _count = 0
+
+        with open(self.output_path, "a") as _output:
+            def _write(_records):
+                for _record in _records:
+                    _output.write(json.dumps(_record) + "\n")
+                _output.flush()
+                os.fsync(_output.fileno())
+                return len(_records)
+
+            if self.workers == 1:
+                _init_worker(self.model, _names, self.summarise)
+                for _chunk in _chunks:
+                    _count += _write(_run_chunk(_chunk))
+                return _count
+
+            _workers = self.workers or os.cpu_count() or 1
+            with ProcessPoolExecutor(max_workers=_workers, initializer=_init_worker,
+                                     initargs=(self.model, _names, self.summarise)) as _pool:
+                # keep a bounded number of chunks in flight, so the case list is never materialised
+                _max_pending = 2 * _workers
+                _pending = set()
+                for _chunk in _chunks:
+                    _pending.add(_pool.submit(_run_chunk, _chunk))
+                    if len(_pending) >= _max_pending:
+                        _done, _pending = wait(_pending, return_when=FIRST_COMPLETED)
+                        for _future in _done:
+                            _count += _write(_future.result())
+                for _future in as_completed(_pending):
+                    _count += _write(_future.result())
+
+        return _count
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,21 @@
+import structural.elements as e
+import structural.materials as mat
+import structural.model as mdl
+
+
+def get_test_model():
+    model = mdl.WallModel("Test Wall")
+    soil = e.Soil()
+    soil.layer_thickness = 3.0
+    model.geology.append(soil)
+    concrete = mat.Concrete(mat.Aci31814, "C35/45", 35, 25)
+    for i, height in enumerate([1.0, 2.0]):
+        wall = e.Wall(i)
+        wall.height = height
+        wall.material = concrete
+        wall.section = e.RectangularSection(1000, 250)
+        model.segments.append(wall)
+    model.loads.append(e.LinearLoad(-10, -10, 0, 3.0))
+    model.supports = [(0, "pinned"), (3.0, "pinned")]
+    model.max_element_length = 0.25
+    return model
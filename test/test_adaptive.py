@@ -0,0 +1,72 @@
+import unittest
+import numpy as np
+import structural.elements as e
+import structural.adaptive as ad
+from helpers import get_test_model
+
+
+class TestAdaptive(unittest.TestCase):
+    def get_model(self):
+        model = get_test_model()
+        model.supports = [(0, "fixed"), (3.0, "pinned")]
+        force = e.PointForce()
+        force.fx = -20
+        force.y = 1.7
+        model.loads = [e.LinearLoad(-10, -30, 0, 3.0), force]
+        return model
+
+    def test_refinement_meets_tolerance_with_few_nodes(self):
+        model = self.get_model()
+        refinement = ad.AdaptiveRefinement(model, 0.005)
+        results = refinement.run()
+        self.assertLessEqual(refinement.history[-1][1], 0.005)
+        self.assertLess(refinement.mesh.num_nodes, 60)
+
+        model.max_element_length = 0.005
+        reference = model.analyse()
+        self.assertAlmostEqual(results.nodal_moments.max(), reference.nodal_moments.max(), delta=0.1)
+        self.assertAlmostEqual(results.nodal_moments.min(), reference.nodal_moments.min(), delta=0.1)
+
+    def test_mandatory_points_and_warm_start(self):
+        # supports, dredge level and loads off the initial grid are nodes of every mesh
+        model = self.get_model()
+        model.supports = [(0.37, "pinned")]
+        model.dredge_level = 1.93
+        model.soil_springs = "linear"
+        model.loads[1].y = 1.71
+        refinement = ad.AdaptiveRefinement(model, 0.02)
+        refinement.run()
+        for point in (0.37, 1.93, 1.71):
+            self.assertIn(point, refinement.mesh.y)
+        self.assertGreater(len(refinement.history), 1)
+
+        # cracked sections start from the solution on the previous mesh
+        model = self.get_model()
+        for wall in model.segments:
+            wall.reinforcement_area = 1000.0
+        model.cracked_sections = True
+        refinement = ad.AdaptiveRefinement(model, 0.005)
+        starts = []
+        solve_mesh = model.solve_mesh
+        model.solve_mesh = lambda mesh, initial=None: starts.append(initial) or solve_mesh(mesh, initial)
+        refinement.run()
+        self.assertIsNone(starts[0])
+        self.assertTrue(all(start is not None for start in starts[1:]))
+        self.assertGreater(len(starts), 1)
+
+    def test_interpolate_displacements_is_exact_for_cubics(self):
+        positions = np.array([0.0, 1.0, 2.5])
+        cubic = lambda x: 0.3 * x ** 3 - x ** 2 + 2
+        slope = lambda x: 0.9 * x ** 2 - 2 * x
+        displacements = np.empty(6)
+        displacements[0::2] = cubic(positions)
+        displacements[1::2] = slope(positions)
+        new_positions = np.array([0.2, 1.0, 1.7, 2.5])
+        interpolated = ad.interpolate_displacements(positions, displacements, new_positions)
+        np.testing.assert_allclose(interpolated[0::2], cubic(new_positions))
+        np.testing.assert_allclose(interpolated[1::2], slope(new_positions))
+
+
+if __name__ == '__main__':
+    # run the tests
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+import numpy as np
+import structural.elements as e
+import structural.matrices as m
+import structural.mesh as msh
+import structural.analysis as a
+
+
+class TestAnalysis(unittest.TestCase):
+    def setUp(self):
+        self.mesh = msh.BeamMesh.from_points(np.linspace(0, 4, 41))
+        self.supports = [(0, "fixed"), (40, "pinned")]
+
+    def get_reference(self, load):
+        matrix = m.assemble_global_matrix(self.mesh)
+        load = load.copy()
+        for node, condition in self.supports:
+            matrix, load = m.set_nodal_boundary_conditions(node, matrix, load, _condition=condition)
+        return np.linalg.solve(matrix, load)
+
+    def test_factorize_once_for_many_loads(self):
+        loads = np.random.default_rng(1).normal(size=(82, 4))
+        for storage in ["dense", "banded"]:
+            analysis = a.LinearAnalysis(self.mesh, self.supports, _storage=storage)
+            results = analysis.solve(loads)
+            single = analysis.solve(loads[:, 2])
+            self.assertEqual(analysis.num_factorizations, 1)
+            for k in range(0, 4):
+                np.testing.assert_allclose(results[:, k], self.get_reference(loads[:, k]), rtol=1e-7, atol=1e-12)
+            np.testing.assert_allclose(single, results[:, 2], rtol=1e-7, atol=1e-12)
+
+    def test_element_results_per_load_case(self):
+        loads = np.zeros((82, 2))
+        loads[0::2, 0] = -1000
+        loads[0::2, 1] = -2000
+        analysis = a.LinearAnalysis(self.mesh, self.supports)
+        results = analysis.get_element_results(analysis.solve(loads))
+        self.assertEqual(results.nodal_moments.shape, (41, 2))
+        np.testing.assert_allclose(results.nodal_moments[:, 1], 2 * results.nodal_moments[:, 0], atol=1e-9)
+        single = analysis.get_element_results(analysis.solve(loads[:, 0]))
+        np.testing.assert_allclose(single.nodal_shears, results.nodal_shears[:, 0])
+
+    def test_incremental_section_update(self):
+        loads = np.zeros((82, 2))
+        loads[0::2, 0] = -1000
+        loads[40, 1] = 5000
+        section = e.RectangularSection(1000, 250)
+        lower = self.mesh.y[:-1] >= 2.5
+        for storage in ["dense", "banded"]:
+            mesh = msh.BeamMesh.from_points(self.mesh.y)
+            analysis = a.LinearAnalysis(mesh, self.supports, _storage=storage)
+            analysis.solve(loads)
+            analysis.update_elements(lower, _section=section)
+            updated = analysis.solve(loads)
+            self.assertEqual(analysis.num_factorizations, 1)
+            self.assertIsNotNone(analysis.update)
+
+            reference = a.LinearAnalysis(mesh, self.supports, _storage=storage).solve(loads)
+            np.testing.assert_allclose(updated, reference, rtol=1e-7, atol=1e-12)
+
+    def test_large_update_refactorizes(self):
+        analysis = a.LinearAnalysis(self.mesh, self.supports)
+        analysis.max_update_dofs = 10
+        analysis.solve(np.ones(82))
+        analysis.update_elements(slice(0, 20), _section=e.RectangularSection(1000, 250))
+        self.assertEqual(analysis.num_factorizations, 2)
+        self.assertIsNone(analysis.update)
+
+
+if __name__ == '__main__':
+    # run the tests
+    unittest.main()
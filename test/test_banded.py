@@ -0,0 +1,52 @@
+import unittest
+import numpy as np
+import structural.elements as e
+import structural.matrices as m
+import structural.banded as b
+
+
+def get_test_elements(_num_elements, _length=0.1):
+    nodes = [e.Node(i, 0, i * _length) for i in range(0, _num_elements + 1)]
+    return [e.BeamFiniteElement(i, nodes[i], nodes[i + 1]) for i in range(0, _num_elements)]
+
+
+class TestBanded(unittest.TestCase):
+    def test_banded_matches_dense_assembly(self):
+        elements = get_test_elements(7)
+        dense = m.assemble_global_matrix(elements)
+        banded = m.assemble_global_matrix(elements, _storage="banded")
+        np.testing.assert_allclose(banded.to_dense(), dense)
+
+    def test_banded_dot(self):
+        elements = get_test_elements(5)
+        banded = m.assemble_global_matrix(elements, _storage="banded")
+        vector = np.arange(12, dtype=float)
+        np.testing.assert_allclose(banded.dot(vector), banded.to_dense() @ vector)
+
+    def test_banded_solve_matches_dense(self):
+        for num_elements in [1, 2, 5, 8, 33]:
+            elements = get_test_elements(num_elements)
+            num_nodes = num_elements + 1
+            solutions = []
+            for storage in ["dense", "banded"]:
+                matrix = m.assemble_global_matrix(elements, _storage=storage)
+                load = m.get_empty_load_matrix(num_nodes)
+                load = m.set_udl_between_nodes(-10, 0, num_nodes - 1, elements, load)
+                matrix, load = m.set_nodal_boundary_conditions(0, matrix, load, _condition="fixed")
+                matrix, load = m.set_nodal_boundary_conditions(num_nodes - 1, matrix, load, _condition="pinned")
+                solutions.append(m.solve_global_system(matrix, load))
+            np.testing.assert_allclose(solutions[1], solutions[0], rtol=1e-9, atol=1e-15)
+
+    def test_banded_solve_load_block(self):
+        elements = get_test_elements(10)
+        matrix = m.assemble_global_matrix(elements, _storage="banded")
+        loads = np.random.default_rng(0).normal(size=(22, 3))
+        matrix, loads[:, 0] = m.set_nodal_boundary_conditions(0, matrix, loads[:, 0], _condition="fixed")
+        loads[0:2] = 0
+        result = b.solve_banded_system(matrix, loads)
+        np.testing.assert_allclose(matrix.to_dense() @ result, loads, atol=1e-6)
+
+
+if __name__ == '__main__':
+    # run the tests
+    unittest.main()
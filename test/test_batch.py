@@ -0,0 +1,69 @@
+import unittest
+import numpy as np
+import structural.elements as e
+import structural.batch as bt
+from helpers import get_test_model
+
+
+class TestBatch(unittest.TestCase):
+    def get_models(self):
+        models = []
+        for depth, height, q in [(150, 2.0, -10), (250, 2.0, -12), (350, 2.5, -8), (200, 2.0, -5)]:
+            model = get_test_model()
+            model.segments[1].section = e.RectangularSection(1000, depth)
+            model.segments[1].height = height
+            model.loads[0] = e.LinearLoad(q, 2 * q, 0, 1.0 + height)
+            model.supports = [(0, "fixed"), (1.0 + height, "pinned")]
+            models.append(model)
+        return models
+
+    def test_batch_matches_individual_analyses(self):
+        models = self.get_models()
+        for storage in ["banded", "dense"]:
+            batch_results = bt.analyse_batch(models, _storage=storage)
+            for model, results in zip(models, batch_results):
+                single = model.analyse()
+                np.testing.assert_allclose(results.x, single.x)
+                np.testing.assert_allclose(results.deflection, single.deflection, rtol=1e-6, atol=1e-12)
+                np.testing.assert_allclose(results.nodal_moments, single.nodal_moments, rtol=1e-6, atol=1e-6)
+                np.testing.assert_allclose(results.nodal_shears, single.nodal_shears, rtol=1e-6, atol=1e-6)
+
+    def test_guided_supports_and_props(self):
+        models = self.get_models()
+        models[0].supports = [(0, "guided"), (3.0, "pinned")]
+        models[1].props = [e.Prop("Prop", 1.3, 1e4)]
+        models[2].props = [e.Prop("Prop", 0.4, 1e5), e.Prop("Prop", 2.1, 1e5)]
+        for storage in ["banded", "dense"]:
+            for model, results in zip(models, bt.analyse_batch(models, _storage=storage)):
+                single = model.analyse()
+                np.testing.assert_allclose(results.deflection, single.deflection, rtol=1e-6, atol=1e-12)
+                np.testing.assert_allclose(results.nodal_moments, single.nodal_moments, rtol=1e-6, atol=1e-6)
+
+    def test_soil_springs(self):
+        # embedded walls on linear soil springs, with no supports below the dredge level
+        models = self.get_models()
+        for model in models:
+            model.supports = [(0, "pinned")]
+            model.dredge_level = 1.5
+            model.soil_springs = "linear"
+        for model, results in zip(models, bt.analyse_batch(models)):
+            single = model.analyse()
+            np.testing.assert_allclose(results.deflection, single.deflection, rtol=1e-6, atol=1e-12)
+            np.testing.assert_allclose(results.nodal_moments, single.nodal_moments, rtol=1e-6, atol=1e-6)
+        models[1].soil_springs = "nonlinear"
+        self.assertRaises(ValueError, bt.analyse_batch, models)
+
+    def test_cracked_sections(self):
+        models = self.get_models()
+        models[2].cracked_sections = True
+        self.assertRaises(ValueError, bt.analyse_batch, models)
+
+    def test_restrained_dofs_mask(self):
+        mask = bt.get_restrained_dofs_mask([(0, "fixed"), (1, "guided"), (2, "pinned"), (3, "free")], 4)
+        np.testing.assert_array_equal(mask, [True, True, False, True, True, False, False, False])
+        self.assertRaises(ValueError, bt.get_restrained_dofs_mask, [(0, "roller")], 4)
+
+
+if __name__ == '__main__':
+    # run the tests
+    unittest.main()
@@ -0,0 +1,28 @@
+import unittest
+from benchmark import benchmarks as b
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_run_benchmarks(self):
+        results = b.run_benchmarks(["solve_banded", "solve_dense"], [100, b.DENSE_LIMIT + 1], _repeat=1)
+        runs = [(record["benchmark"], record["elements"]) for record in results["results"]]
+        self.assertEqual(runs, [("solve_banded", 100), ("solve_banded", b.DENSE_LIMIT + 1), ("solve_dense", 100)])
+        for record in results["results"]:
+            self.assertGreater(record["time"], 0)
+            self.assertGreater(record["peak_memory"], 0)
+
+    def test_check_regressions(self):
+        baseline = {"results": [{"benchmark": "solve_banded", "elements": 100, "time": 0.01, "peak_memory": 1e6},
+                                {"benchmark": "mesh", "elements": 100, "time": 1e-5, "peak_memory": 1e3}]}
+        results = {"results": [{"benchmark": "solve_banded", "elements": 100, "time": 0.02, "peak_memory": 1e6},
+                               {"benchmark": "mesh", "elements": 100, "time": 1e-4, "peak_memory": 1e3},
+                               {"benchmark": "mesh", "elements": 1000, "time": 1.0, "peak_memory": 1e9}]}
+        messages = b.check_regressions(results, baseline)
+        self.assertEqual(len(messages), 1)
+        self.assertTrue(messages[0].startswith("solve_banded"))
+        self.assertEqual(b.check_regressions(results, baseline, _tolerance=3.0), [])
+
+
+if __name__ == '__main__':
+    # run the tests
+    unittest.main()
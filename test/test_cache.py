@@ -0,0 +1,120 @@
+import io
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import structural.cache as ca
+import structural.pipeline as pl
+import structural.schema as sch
+from structural.materials import Aci31810
+from helpers import get_test_model
+
+
+class TestModelKey(unittest.TestCase):
+    def test_stable(self):
+        model = get_test_model()
+        self.assertEqual(ca.get_model_key(model), ca.get_model_key(get_test_model()))
+        self.assertEqual(ca.get_model_key(model), ca.get_model_key(sch.model_to_dict(model)))
+
+    def test_name_ignored(self):
+        model = get_test_model()
+        key = ca.get_model_key(model)
+        model.name = "Chainage 120"
+        self.assertEqual(ca.get_model_key(model), key)
+
+    def test_inputs_change_key(self):
+        key = ca.get_model_key(get_test_model())
+        changes = [lambda m: setattr(m.loads[0], "q1", -11),
+                   lambda m: setattr(m.geology[0], "phi", 31),
+                   lambda m: setattr(m.segments[0], "height", m.segments[0].height + 0.1),
+                   lambda m: m.supports.pop(),
+                   lambda m: setattr(m, "max_element_length", 0.1)]
+        for change in changes:
+            model = get_test_model()
+            change(model)
+            self.assertNotEqual(ca.get_model_key(model), key)
+
+    def test_code_changes_key(self):
+        data = sch.model_to_dict(get_test_model())
+        key = ca.get_model_key(data)
+        data["code"] = Aci31810.CodeName
+        self.assertNotEqual(ca.get_model_key(data), key)
+
+
+class TestResultCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.model = get_test_model()
+        self.results = self.model.analyse()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_round_trip(self):
+        cache = ca.ResultCache(self.directory)
+        key = ca.get_model_key(self.model)
+        self.assertIsNone(cache.get(key))
+        cache.put(key, self.results)
+        cached = cache.get(key)
+        np.testing.assert_array_equal(cached.nodal_moments, self.results.nodal_moments)
+        np.testing.assert_array_equal(cached.element_moments, self.results.element_moments)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        # a second process sees the entry
+        self.assertIsNotNone(ca.ResultCache(self.directory).get(key))
+
+    def test_analyse(self):
+        cache = ca.ResultCache(self.directory)
+        cache.analyse(self.model)
+        results = cache.analyse(get_test_model())
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        np.testing.assert_array_equal(results.deflection, self.results.deflection)
+
+    def test_eviction(self):
+        cache = ca.ResultCache(self.directory)
+        cache.put("a" * 64, self.results)
+        size = cache.get_size()
+        cache.max_bytes = int(2.5 * size)
+        cache.put("b" * 64, self.results)
+        os.utime(cache._get_file("a" * 64), (0, 0))
+        os.utime(cache._get_file("b" * 64), (1, 1))
+        self.assertIsNotNone(cache.get("a" * 64))  # now the most recently used
+        cache.put("c" * 64, self.results)
+        self.assertLessEqual(cache.get_size(), cache.max_bytes)
+        self.assertIsNone(cache.get("b" * 64))
+        self.assertIsNotNone(cache.get("a" * 64))
+        self.assertIsNotNone(cache.get("c" * 64))
+        cache.clear()
+        self.assertEqual(cache.get_size(), 0)
+
+    def test_corrupt_entry(self):
+        cache = ca.ResultCache(self.directory)
+        key = "d" * 64
+        cache.put(key, self.results)
+        with open(cache._get_file(key), "wb") as file:
+            file.write(b"not an npz file")
+        self.assertIsNone(cache.get(key))
+
+
+class TestPipelineCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_cached_items(self):
+        cache = ca.ResultCache(self.directory)
+        data = sch.model_to_dict(get_test_model())
+        models = [dict(data, name="Wall {}".format(i)) for i in range(0, 3)]
+        first = list(pl.write_results(pl.analyse_models(models, _cache=cache), io.StringIO()))
+        self.assertEqual([item.record.get("cached", False) for item in first], [False, True, True])
+        second = list(pl.analyse_models(models, _cache=cache))
+        self.assertTrue(all(item.record["cached"] for item in second))
+        self.assertIsNone(second[0].mesh)
+        self.assertEqual(second[0].record["max_moment"], first[0].record["max_moment"])
+        self.assertEqual([item.record["name"] for item in second], ["Wall 0", "Wall 1", "Wall 2"])
+
+
+if __name__ == '__main__':
+    unittest.main()
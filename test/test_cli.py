@@ -0,0 +1,62 @@
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+import structural.cli as cli
+import structural.schema as sch
+import structural.store as st
+from helpers import get_test_model
+
+
+class TestCli(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.models = os.path.join(self.directory, "models.json")
+        data = sch.model_to_dict(get_test_model())
+        broken = dict(data, name="Broken", segments=[])
+        with open(self.models, "w") as file:
+            json.dump([data, broken], file)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_run(self):
+        output = io.StringIO()
+        failed = cli.run([self.models, os.path.join(self.directory, "missing.json")], output, _full=True)
+        records = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual(failed, 2)
+        self.assertEqual(len(records), 3)
+        self.assertAlmostEqual(records[0]["min_moment"], get_test_model().analyse().nodal_moments.min())
+        self.assertEqual(len(records[0]["results"]["moment"]), len(records[0]["results"]["x"]))
+        self.assertIn("error", records[1])
+        self.assertTrue(records[2]["error"].startswith("FileNotFoundError"))
+
+    def test_main_without_plotting_imports(self):
+        output = os.path.join(self.directory, "results.jsonl")
+        statistics = os.path.join(self.directory, "statistics.json")
+        code = "import sys; from structural.cli import main; status = main(sys.argv[1:]); " \
+               "assert 'matplotlib' not in sys.modules; sys.exit(status)"
+        process = subprocess.run([sys.executable, "-c", code, self.models, "-o", output, "--statistics", statistics],
+                                 cwd=os.path.dirname(os.path.dirname(os.path.abspath(cli.__file__))))
+        self.assertEqual(process.returncode, 1)  # the broken model
+        with open(output) as file:
+            self.assertEqual(len(file.readlines()), 2)
+        with open(statistics) as file:
+            self.assertEqual(json.load(file)["solve"]["calls"], 1)
+
+    def test_store(self):
+        store = os.path.join(self.directory, "store")
+        self.assertEqual(cli.main([self.models, "-o", os.path.join(self.directory, "results.jsonl"),
+                                   "--store", store]), 1)
+        results = st.ResultStore(store)
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results.get_metadata(0)["name"], "Test Wall")
+
+
+if __name__ == '__main__':
+    # run the tests
+    unittest.main()
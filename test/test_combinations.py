@@ -0,0 +1,106 @@
+import unittest
+import numpy as np
+import structural.combinations as cmb
+import structural.elements as e
+import structural.materials as mat
+from helpers import get_test_model
+
+
+def get_cases():
+    return [cmb.LoadCase("Self weight", "D", [e.LinearLoad(-2, -2, 0, 3.0)]),
+            cmb.LoadCase("Traffic", "L", [e.LinearLoad(-10, 0, 0, 1.5)]),
+            cmb.LoadCase("Earth", "H", [e.EarthPressureLoad("active", -1.0)]),
+            cmb.LoadCase("Wind", "W", [e.LinearLoad(3, 3, 0, 1.0)])]
+
+
+class TestCodeCombinations(unittest.TestCase):
+    def test_codes(self):
+        for code in mat.CodeType:
+            combinations = cmb.get_code_combinations(code)
+            self.assertGreater(len(combinations), 30)
+            self.assertEqual(len(set(c.name for c in combinations)), len(combinations))
+        self.assertEqual(len(cmb.get_code_combinations(mat.Aci31814)), len(cmb.get_code_combinations(mat.Aci31819)))
+        names = [c.name for c in cmb.get_code_combinations(mat.Aci31814)]
+        self.assertIn("(5.3.1a) 1.4D + 1.4F + 1.6H", names)
+        self.assertIn("(5.3.1f) 0.9D + 0.9H - 1W", names)
+        self.assertIn("(9-6) 0.9D + 1.6H + 1.6W", [c.name for c in cmb.get_code_combinations(mat.Aci31810)])
+        self.assertRaises(ValueError, cmb.get_code_combinations, "EC2")
+        self.assertRaises(ValueError, cmb.LoadCase, "Ice", "I")
+
+    def test_factor_matrix(self):
+        combinations = [cmb.LoadCombination("A", {"D": 1.4}), cmb.LoadCombination("B", {"D": 1.2, "L": 1.6})]
+        factors = cmb.get_factor_matrix(get_cases()[:2], combinations)
+        np.testing.assert_array_equal(factors, [[1.4, 1.2], [0.0, 1.6]])
+
+
+class TestCombinationAnalysis(unittest.TestCase):
+    def setUp(self):
+        self.model = get_test_model()
+        self.cases = get_cases()
+        self.combinations = cmb.CombinationAnalysis(self.model, self.cases)
+
+    def test_superposition(self):
+        results = self.combinations.get_results()
+        self.assertEqual(self.combinations.analysis.num_factorizations, 1)
+        self.assertEqual(results.nodal_moments.shape, (self.combinations.mesh.num_nodes,
+                                                       len(self.combinations.combinations)))
+        # a factored combination solved directly, with the factors on the loads
+        for k in (0, 7, len(self.combinations.combinations) - 1):
+            combination = self.combinations.combinations[k]
+            model = get_test_model()
+            model.loads = []
+            for case in self.cases:
+                factor = combination.factors.get(case.category, 0.0)
+                for load in case.loads:
+                    if isinstance(load, e.EarthPressureLoad):
+                        model.loads.append(e.EarthPressureLoad(load.state, factor * load.factor))
+                    else:
+                        model.loads.append(e.LinearLoad(factor * load.q1, factor * load.q2, load.top, load.bottom))
+            expected = model.analyse()
+            np.testing.assert_allclose(results.nodal_moments[:, k], expected.nodal_moments, atol=1e-9)
+            np.testing.assert_allclose(results.nodal_shears[:, k], expected.nodal_shears, atol=1e-9)
+            np.testing.assert_allclose(results.deflection[:, k], expected.deflection, atol=1e-15)
+
+    def test_unique_combinations(self):
+        # without roof, snow, rain, fluid and earthquake cases, many combinations coincide
+        self.assertLess(len(self.combinations.combinations), len(cmb.get_code_combinations(mat.Aci31814)))
+        self.assertEqual(np.unique(self.combinations.factors, axis=1).shape[1], len(self.combinations.combinations))
+        # named after the categories of the cases only
+        names = [c.name for c in self.combinations.combinations]
+        self.assertEqual(names[0], "(5.3.1a) 1.4D + 1.6H")
+        self.assertIn("(5.3.1b) 1.2D + 1.6L + 1.6H", names)
+        self.assertFalse(any(category in name for name in names for category in ("F", "Lr", "S", "R", "E")))
+        self.assertEqual(len(set(names)), len(names))
+
+    def test_envelope(self):
+        results = self.combinations.get_results()
+        envelope = self.combinations.get_envelope()
+        np.testing.assert_array_equal(envelope.maxima["nodal_moments"], np.max(results.nodal_moments, axis=1))
+        np.testing.assert_array_equal(envelope.minima["nodal_shears"], np.min(results.nodal_shears, axis=1))
+        node = int(np.argmin(envelope.minima["deflection"]))
+        case = envelope.min_cases["deflection"][node]
+        self.assertEqual(results.deflection[node, case], envelope.minima["deflection"][node])
+
+    def test_code_of_model(self):
+        model = get_test_model()
+        concrete = mat.Concrete(mat.Aci31810, "C35/45", 35, 25)
+        for wall in model.segments:
+            wall.material = concrete
+        combinations = cmb.CombinationAnalysis(model, self.cases)
+        self.assertTrue(all(c.name.startswith("(9-") for c in combinations.combinations))
+        model.segments[0].material = mat.Concrete(mat.Aci31814, "C35/45", 35, 25)
+        self.assertRaises(ValueError, cmb.CombinationAnalysis, model, self.cases)
+
+    def test_nonlinear_model(self):
+        model = get_test_model()
+        model.cracked_sections = True
+        self.assertRaises(ValueError, cmb.CombinationAnalysis, model, self.cases)
+        model = get_test_model()
+        model.dredge_level = 1.0
+        self.assertRaises(ValueError, cmb.CombinationAnalysis, model, self.cases)
+        model.soil_springs = "linear"
+        self.assertIsNotNone(cmb.CombinationAnalysis(model, self.cases).get_envelope())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,158 @@
+import unittest
+import numpy as np
+import structural.analysis as a
+import structural.constraints as c
+import structural.elements as e
+import structural.matrices as m
+import structural.mesh as msh
+import structural.schema as sch
+from helpers import get_test_model
+
+
+class TestConstraints(unittest.TestCase):
+    def setUp(self):
+        self.mesh = msh.BeamMesh.from_points(np.linspace(0, 4, 41))
+        self.EI = self.mesh.EI[0]
+
+    def test_symmetric_elimination(self):
+        load = np.random.default_rng(2).normal(size=82)
+        reference = m.assemble_global_matrix(self.mesh)
+        reference_load = load.copy()
+        for node, condition in [(0, "fixed"), (40, "pinned")]:
+            reference, reference_load = m.set_nodal_boundary_conditions(node, reference, reference_load, condition)
+        expected = np.linalg.solve(reference, reference_load)
+
+        constraints = c.Constraints(41).add_support(0, "fixed").add_support(40, "pinned")
+        for storage in ("dense", "banded"):
+            matrix, constrained = constraints.apply(m.assemble_global_matrix(self.mesh, _storage=storage), load)
+            dense = matrix.to_dense() if storage == "banded" else matrix
+            np.testing.assert_array_equal(dense, dense.T)
+            self.assertGreater(np.min(np.linalg.eigvalsh(dense)), 0)
+            np.testing.assert_allclose(np.linalg.solve(dense, constrained), expected, rtol=1e-8, atol=1e-14)
+
+    def test_guided_support(self):
+        # fixed at the top and guided at the bottom: deflection P L^3 / 12 EI under an end force P
+        load = m.set_point_force(-10, 40, m.get_empty_load_matrix(41))
+        analysis = a.LinearAnalysis(self.mesh, [(0, "fixed"), (40, "guided")])
+        results = analysis.solve(load)
+        self.assertAlmostEqual(results[80], -10000 * 4 ** 3 / (12 * self.EI))
+        self.assertAlmostEqual(results[81], 0)
+
+    def test_prescribed_displacement(self):
+        # a fixed-ended beam with a settlement d of one end: end moments 6 EI d / L^2
+        constraints = c.Constraints(41).prescribe(40, _displacement=0.01)
+        for storage in ("dense", "banded"):
+            analysis = a.LinearAnalysis(self.mesh, [(0, "fixed"), (40, "fixed")], storage, constraints)
+            displacements = analysis.solve(np.zeros(82))
+            self.assertAlmostEqual(displacements[80], 0.01)
+            results = analysis.get_element_results(displacements)
+            np.testing.assert_allclose(np.abs(results.nodal_moments[[0, -1]]), 6 * self.EI * 0.01 / 16 / 1000,
+                                       rtol=1e-6)
+
+            # a stiffer upper half is applied incrementally, prescribed displacement and all
+            analysis.update_elements(slice(0, 20), _section=e.RectangularSection(1000, 600))
+            updated = analysis.solve(np.zeros(82))
+            reference = a.LinearAnalysis(self.mesh, [(0, "fixed"), (40, "fixed")], storage, constraints)
+            np.testing.assert_allclose(updated, reference.solve(np.zeros(82)), rtol=1e-7, atol=1e-12)
+            self.mesh = msh.BeamMesh.from_points(np.linspace(0, 4, 41))
+
+    def test_prop_between_nodes(self):
+        # a stiff prop within an element acts as a support at its depth
+        load = m.set_udl_between_nodes(-10, 0, 40, self.mesh, m.get_empty_load_matrix(41))
+        points = np.union1d(np.linspace(0, 4, 41), [1.55])
+        meshed = msh.BeamMesh.from_points(points)
+        meshed_load = m.set_udl_between_nodes(-10, 0, 41, meshed, m.get_empty_load_matrix(42))
+        supports = [(0, "pinned"), (int(np.argmin(np.abs(points - 1.55))), "pinned"), (41, "pinned")]
+        expected = a.LinearAnalysis(meshed, supports).solve(meshed_load)
+
+        constraints = c.Constraints(41).add_prop(self.mesh, 1.55, 1e13)
+        for storage in ("dense", "banded"):
+            results = a.LinearAnalysis(self.mesh, [(0, "pinned"), (40, "pinned")], storage, constraints).solve(load)
+            on_nodes = np.isin(points, self.mesh.y)
+            np.testing.assert_allclose(results[0::2], expected[0::2][on_nodes], rtol=2e-3,
+                                       atol=1e-3 * np.max(np.abs(expected)))
+
+    def test_springs(self):
+        # a nodal spring takes its share of a force, k / (k + k_beam)
+        load = m.set_point_force(-10, 40, m.get_empty_load_matrix(41))
+        beam = 3 * self.EI / 4 ** 3
+        constraints = c.Constraints(41).add_spring(40, beam)
+        results = a.LinearAnalysis(self.mesh, [(0, "fixed")], "banded", constraints).solve(load)
+        self.assertAlmostEqual(results[80], -10000 / (2 * beam))
+
+    def test_bad_input(self):
+        constraints = c.Constraints(41)
+        self.assertRaises(ValueError, constraints.add_support, 41, "fixed")
+        self.assertRaises(ValueError, constraints.add_support, [0, -1], "pinned")
+        self.assertRaises(ValueError, constraints.add_support, 0, "roller")
+        self.assertRaises(ValueError, constraints.add_spring, 3, -1.0)
+        self.assertRaises(ValueError, constraints.add_prop, self.mesh, 4.5, 1e6)
+        for storage in ("dense", "banded"):
+            matrix = m.assemble_global_matrix(self.mesh, _storage=storage)
+            self.assertRaises(ValueError, m.set_nodal_boundary_conditions, 41, matrix, np.zeros(82))
+
+    @unittest.skipIf(a._get_scipy_linalg() is None, "needs scipy")
+    def test_cholesky(self):
+        load = m.set_udl_between_nodes(-10, 0, 40, self.mesh, m.get_empty_load_matrix(41))
+        analysis = a.LinearAnalysis(self.mesh, [(0, "fixed"), (40, "pinned")])
+        banded = analysis.solve(load)
+        self.assertIsInstance(analysis.factorization, a.BandedCholeskyFactorization)
+        analysis = a.LinearAnalysis(self.mesh, [(0, "fixed"), (40, "pinned")], "dense")
+        np.testing.assert_allclose(analysis.solve(load), banded, rtol=1e-8, atol=1e-14)
+        self.assertEqual(analysis.factorization.method, "cholesky")
+
+    def test_dense_factorization_without_scipy(self):
+        # the numpy fallback: Cholesky, or LU with partial pivoting for unsymmetric matrices, factorised once
+        linalg = a._get_scipy_linalg()
+        a._scipy["linalg"] = None
+        try:
+            load = m.set_udl_between_nodes(-10, 0, 40, self.mesh, m.get_empty_load_matrix(41))
+            analysis = a.LinearAnalysis(self.mesh, [(0, "fixed"), (40, "pinned")], "dense")
+            block = np.stack((load, 2 * load), axis=1)
+            expected = np.linalg.solve(analysis.assemble(), analysis.get_constrained_loads(block))
+            np.testing.assert_allclose(analysis.solve(block), expected, rtol=1e-10, atol=1e-15)
+            self.assertEqual(analysis.factorization.method, "cholesky")
+            matrix = np.random.default_rng(5).uniform(-1, 1, size=(30, 30))
+            matrix[0, 0] = 0.0  # needs pivoting
+            factorization = a.DenseFactorization(matrix)
+            self.assertEqual(factorization.method, "lu")
+            loads = np.random.default_rng(6).uniform(-1, 1, size=(30, 3))
+            np.testing.assert_allclose(factorization.solve(loads), np.linalg.solve(matrix, loads), rtol=1e-8)
+            np.testing.assert_allclose(factorization.solve(loads[:, 0]), np.linalg.solve(matrix, loads[:, 0]),
+                                       rtol=1e-8)
+            self.assertRaises(np.linalg.LinAlgError, a.DenseFactorization, np.array([[1.0, 2.0], [2.0, 4.0]]))
+        finally:
+            a._scipy["linalg"] = linalg
+
+
+class TestModelProps(unittest.TestCase):
+    def test_props(self):
+        model = get_test_model()
+        model.supports = [(model.get_vertical_points()[-1], "fixed")]
+        unpropped = model.analyse()
+        model.props = [e.Prop("Prop 1", 0.33, 1e5), e.Prop("Prop 2", 1.27, 1e5)]
+        propped = model.analyse()
+        self.assertLess(np.max(np.abs(propped.deflection)), 0.5 * np.max(np.abs(unpropped.deflection)))
+
+        data = sch.model_to_dict(model)
+        self.assertEqual(data["props"][1], {"name": "Prop 2", "depth": 1.27, "stiffness": 1e5})
+        np.testing.assert_allclose(sch.model_from_dict(data).analyse().deflection, propped.deflection)
+
+    def test_levels_are_nodes(self):
+        # supports and props between the nodes of the wall mesh become nodes, they are not moved
+        model = get_test_model()
+        model.supports = [(0.333, "pinned"), (model.get_vertical_points()[-1], "fixed")]
+        model.props = [e.Prop("Prop 1", 1.271, 1e5)]
+        mesh = model.build_mesh()
+        self.assertIn(0.333, mesh.y)
+        self.assertIn(1.271, mesh.y)
+        self.assertEqual(mesh.y[model.get_supports(mesh)[0][0]], 0.333)
+        self.assertAlmostEqual(model.analyse().deflection[np.searchsorted(mesh.y, 0.333)], 0.0)
+        # a mesh without a node at a support
+        self.assertRaises(ValueError, model.get_supports, get_test_model().build_mesh())
+        model.props = [e.Prop("Prop 1", 100.0, 1e5)]
+        self.assertRaises(ValueError, model.build_mesh)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+import numpy as np
+import structural.analysis as a
+import structural.cracking as cr
+import structural.elements as e
+import structural.loads as ld
+import structural.materials as mat
+import structural.matrices as m
+import structural.mesh as msh
+from helpers import get_test_model
+
+
+class TestCracking(unittest.TestCase):
+    def test_cracking_moment(self):
+        # fr = 0.62 sqrt(25) = 3.1 MPa, S = 1000 x 250^2 / 6
+        self.assertAlmostEqual(cr.get_cracking_moment(25, 1000, 250) / 1e6, 3.1 * 250 ** 2 / 6000)
+
+    def test_cracked_moment_of_inertia(self):
+        # neutral axis from b (kd)^2 / 2 = n As (d - kd)
+        width, d, area, n = 1000.0, 200.0, 1000.0, 8.0
+        icr = cr.get_cracked_moment_of_inertia(width, d, area, n)
+        kd = (-n * area + np.sqrt((n * area) ** 2 + 2 * width * n * area * d)) / width
+        self.assertAlmostEqual(icr / (width * kd ** 3 / 3 + n * area * (d - kd) ** 2), 1.0)
+
+    def test_effective_moment_of_inertia(self):
+        moments = np.array([0.0, 50.0, 100.0, 200.0, 1e9])
+        ie14 = cr.get_effective_moment_of_inertia(moments, 100.0, 10.0, 2.0, mat.CodeType.ACI318_14)
+        np.testing.assert_allclose(ie14, [10, 10, 10, 2 + 8 / 8, 2], rtol=1e-6)
+        ie19 = cr.get_effective_moment_of_inertia(moments, 100.0, 10.0, 2.0, mat.CodeType.ACI318_19)
+        np.testing.assert_allclose(ie19[:2], [10, 10])
+        self.assertAlmostEqual(ie19[3], 2 / (1 - (1 / 3) ** 2 * 0.8))
+        self.assertAlmostEqual(ie19[4], 2.0)
+        # Bischoff is softer than Branson just above cracking
+        self.assertLess(cr.get_effective_moment_of_inertia(120.0, 100.0, 10.0, 2.0, mat.CodeType.ACI318_19),
+                        cr.get_effective_moment_of_inertia(120.0, 100.0, 10.0, 2.0, mat.CodeType.ACI318_14))
+        # per element code types, or the mask of ACI 318-19 elements computed once
+        codes = np.array([mat.CodeType.ACI318_19, mat.CodeType.ACI318_14], dtype=object)
+        mixed = cr.get_effective_moment_of_inertia([200.0, 200.0], 100.0, 10.0, 2.0, codes)
+        np.testing.assert_allclose(mixed, [ie19[3], ie14[3]])
+        np.testing.assert_allclose(cr.get_effective_moment_of_inertia([200.0, 200.0], 100.0, 10.0, 2.0,
+                                                                      _is_bischoff=np.array([True, False])), mixed)
+
+    def test_set_moments_of_inertia_is_incremental(self):
+        mesh = msh.BeamMesh.from_discrete_points(0.1, [0, 3.0])
+        load = m.set_udl_between_nodes(-10, 0, mesh.num_nodes - 1, mesh, m.get_empty_load_matrix(mesh.num_nodes))
+        analysis = a.LinearAnalysis(mesh, [(0, "pinned"), (mesh.num_nodes - 1, "fixed")])
+        analysis.solve(load)
+        analysis.set_moments_of_inertia([3, 4, 5], 0.4 * mesh.I[3:6])
+        updated = analysis.solve(load)
+        self.assertEqual(analysis.num_factorizations, 1)
+        expected = a.LinearAnalysis(mesh, analysis.supports).solve(load)
+        np.testing.assert_allclose(updated, expected, rtol=1e-8, atol=1e-15)
+
+    def test_model_cracked_sections(self):
+        model = get_test_model()
+        model.loads = [e.LinearLoad(-40, -40, 0, 3.0)]
+        model.max_element_length = 0.05
+        uncracked = model.analyse()
+        for wall in model.segments:
+            wall.reinforcement_area = 1000.0
+        deflections = []
+        for code in (mat.Aci31814, mat.Aci31819):
+            concrete = mat.get_concrete(code, "C35/45", 35, 25)
+            for wall in model.segments:
+                wall.material = concrete
+            model.cracked_sections = True
+            cracked = model.analyse()
+            # simply supported: same moments, larger deflections
+            np.testing.assert_allclose(cracked.nodal_moments, uncracked.nodal_moments, atol=1e-6)
+            self.assertGreater(cracked.deflection.min() / uncracked.deflection.min(), 1.1)
+            deflections.append(cracked.deflection.min())
+        # Bischoff gives larger deflections than Branson just above the cracking moment
+        self.assertLess(deflections[1], deflections[0])
+
+        # started from the cracked displacements, the effective stiffness is found at once
+        mesh = model.build_mesh()
+        displacements, _ = model.solve_mesh(mesh)
+        analysis = model.get_cracked_analysis(model.get_analysis(mesh), mesh)
+        fixed_end_forces = ld.get_empty_fixed_end_forces(mesh)
+        load = model.get_load_matrix(mesh, _fixed_end_forces=fixed_end_forces)
+        np.testing.assert_allclose(analysis.run(load, displacements, fixed_end_forces)[0], displacements, atol=1e-12)
+        self.assertEqual(len(analysis.history), 1)
+
+    def test_cracked_sections_need_reinforcement(self):
+        model = get_test_model()
+        model.cracked_sections = True
+        self.assertRaises(ValueError, model.analyse)
+
+
+if __name__ == '__main__':
+    # run the tests
+    unittest.main()
@@ -0,0 +1,126 @@
+import unittest
+import numpy as np
+import structural.combinations as cmb
+import structural.design as des
+import structural.elements as e
+import structural.materials as mat
+from helpers import get_test_model
+
+
+class TestSectionDesign(unittest.TestCase):
+    def test_required_area(self):
+        # b = 1000, d = 450, fc = 35, fy = 420: As of 300 kNm has a strength of 300 kNm
+        area = des.get_required_area(300.0, 1000, 450, 35)
+        self.assertAlmostEqual(float(area), 1815.36, places=1)
+        self.assertAlmostEqual(float(des.get_moment_capacity(area, 1000, 450, 35)), 300.0)
+        self.assertTrue(np.isnan(des.get_required_area(3000.0, 1000, 450, 35)))
+        self.assertEqual(des.get_required_area(-300.0, 1000, 450, 35), area)
+
+    def test_minimum_area(self):
+        self.assertAlmostEqual(float(des.get_minimum_area(1000, 500)), 900.0)
+        self.assertAlmostEqual(float(des.get_minimum_area(1000, 500, mat.CodeType.ACI318_14, 280)), 1000.0)
+        self.assertAlmostEqual(float(des.get_minimum_area(1000, 500, mat.CodeType.ACI318_14, 550)), 700.0)
+        self.assertAlmostEqual(float(des.get_minimum_area(1000, 500, mat.CodeType.ACI318_19, 550)), 900.0)
+
+    def test_shear_capacity(self):
+        self.assertAlmostEqual(float(des.get_shear_capacity(1000, 450, 35)), 0.75 * 0.17 * 35 ** 0.5 * 450)
+        # ACI 318-19: size effect and reinforcement ratio reduce Vc of thick, lightly reinforced walls
+        self.assertLess(des.get_shear_capacity(1000, 450, 35, 1820, mat.CodeType.ACI318_19),
+                        des.get_shear_capacity(1000, 450, 35, 1820, mat.CodeType.ACI318_14))
+
+    def test_catalogue(self):
+        catalogue = des.BarCatalogue()
+        self.assertTrue(np.all(np.diff(catalogue.areas) >= 0))
+        choice = catalogue.select([500.0, 1815.0, 1e6], [450.0, 200.0, 450.0])
+        self.assertGreaterEqual(catalogue.areas[choice[0]], 500.0)
+        self.assertLessEqual(catalogue.spacings[choice[1]], 200.0)
+        self.assertEqual(choice[2], -1)
+        # the least area of all arrangements that fit
+        fits = (catalogue.areas >= 1815.0) & (catalogue.spacings <= 200.0)
+        self.assertEqual(catalogue.areas[choice[1]], np.min(catalogue.areas[fits]))
+
+    def test_design_sections(self):
+        results = des.design_sections([300.0, 0.0, 50.0, 3000.0], [100.0, 0.0, 400.0, 50.0], 1000, 500, 35)
+        np.testing.assert_array_equal(results.adequate, [True, True, True, False])
+        self.assertTrue(np.all(results.provided_area[:3] >= results.design_area[:3]))
+        self.assertEqual(results.design_area[1], 900.0)
+        self.assertEqual(results.bars[3], -1)
+        self.assertEqual(results.bar_names[3], "")
+        self.assertLessEqual(results.flexural_utilisation[0], 1.0)
+        self.assertGreater(results.shear_utilisation[2], 1.0)
+        self.assertGreater(results.required_shear_area[2], 0.0)
+        self.assertEqual(results.required_shear_area[0], 0.0)
+
+    def test_tension_controlled(self):
+        # b = 1000, d = 250, fc = 25: 300 kNm is tension controlled, 350 kNm needs steel beyond et = 0.004
+        results = des.design_sections([300.0, 350.0], 0.0, 1000, 300, 25)
+        self.assertGreaterEqual(results.tensile_strain[0], 0.005)
+        self.assertEqual(results.flexure_factor[0], 0.9)
+        self.assertLess(results.tensile_strain[1], des.MIN_TENSILE_STRAIN)
+        self.assertLess(results.flexure_factor[1], 0.9)
+        self.assertGreater(results.flexural_utilisation[1], 1.0)
+        np.testing.assert_array_equal(results.adequate, [True, False])
+        # phi from 0.65 at the yield strain of the steel to 0.9 at 0.005
+        np.testing.assert_allclose(des.get_flexure_factor(np.array([0.001, 0.0021, 0.0035, 0.006])),
+                                   [0.65, 0.65, 0.65 + 0.25 * 1.4 / 2.9, 0.9])
+        # c = a / beta1, with beta1 = 0.8 for fc = 35
+        area = des.get_required_area(300.0, 1000, 450, 35)
+        c = area * 420 / (0.85 * 35 * 1000) / 0.8
+        self.assertAlmostEqual(float(des.get_tensile_strain(area, 1000, 450, 35)), 0.003 * (450 - c) / c)
+
+    def test_batch(self):
+        # a trailing axis of walls gives the same results as every wall on its own
+        moments = np.random.default_rng(3).uniform(-200, 200, size=(50, 4))
+        depths = np.array([300.0, 400.0, 500.0, 600.0])
+        x = np.linspace(0, 5, 50)
+        results = des.design_sections(moments, 0.3 * moments, 1000, depths, 35, _x=x)
+        for k in range(4):
+            wall = des.design_sections(moments[:, k], 0.3 * moments[:, k], 1000, depths[k], 35, _x=x)
+            np.testing.assert_array_equal(results.provided_area[:, k], wall.provided_area)
+            np.testing.assert_array_equal(results.full_bars[:, k], wall.full_bars)
+
+    def test_curtailment(self):
+        # a cantilever moment: full bars near the base, alternate bars stopped above
+        x = np.linspace(0, 6, 121)
+        moments = 800.0 * (x / 6) ** 3
+        results = des.design_sections(moments, 0.0, 1000, 600, 35, _x=x)
+        self.assertEqual(len(results.curtailment), 1)
+        needed = results.design_area > 0.5 * np.max(results.provided_area)
+        top = x[np.argmax(needed)]
+        extension = max(550, 12 * results.bar_diameters[-1]) / 1000
+        self.assertAlmostEqual(results.curtailment[0], top - extension, delta=0.05)
+        self.assertFalse(results.full_bars[0])
+        self.assertTrue(results.full_bars[-1])
+        # where half of the bars are less than the minimum area, no bars are stopped
+        self.assertTrue(np.all(des.design_sections(moments / 4, 0.0, 1000, 600, 35, _x=x).full_bars))
+
+
+class TestWallDesign(unittest.TestCase):
+    def test_design_wall(self):
+        model = get_test_model()
+        cases = [cmb.LoadCase("Earth", "H", [e.EarthPressureLoad("active", -1.0)]),
+                 cmb.LoadCase("Traffic", "L", [e.LinearLoad(-10, -10, 0, 3.0)])]
+        combinations = cmb.CombinationAnalysis(model, cases)
+        envelope = combinations.get_envelope()
+        design = des.design_wall(combinations.mesh, envelope)
+        self.assertEqual(set(design), {"positive", "negative"})
+        for face, moments in (("positive", envelope.maxima["nodal_moments"]),
+                              ("negative", -envelope.minima["nodal_moments"])):
+            results = design[face]
+            self.assertEqual(results.provided_area.shape, (combinations.mesh.num_nodes,))
+            self.assertTrue(np.all(results.adequate))
+            self.assertTrue(np.all(results.moment_capacity >= np.maximum(moments, 0) - 1e-9))
+
+    def test_node_sections(self):
+        model = get_test_model()
+        model.segments[1].section = e.RectangularSection(1000, 300)
+        mesh = model.build_mesh()
+        width, depth, fc, lightweight, code_type = des.get_node_sections(mesh)
+        self.assertEqual(depth[0], 250)
+        self.assertEqual(depth[np.argmin(np.abs(mesh.y - 1.0))], 250)
+        self.assertEqual(depth[-1], 300)
+        self.assertEqual(code_type[0], mat.CodeType.ACI318_14)
+
+
+if __name__ == '__main__':
+    unittest.main()
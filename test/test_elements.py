@@ -1,5 +1,8 @@
+import copy
+import pickle
 import unittest
 import structural.elements as e
+import structural.materials as mat
 
 
 class TestElements(unittest.TestCase):
@@ -57,6 +60,43 @@ class TestElements(unittest.TestCase):
         result = test_soil.k0()[0]
         self.assertEqual(result, 0)
 
+    def test_registry_returns_shared_instances(self):
+        self.assertIs(e.get_rectangular_section(1000, 250), e.get_rectangular_section(1000, 250))
+        self.assertIs(mat.get_concrete(mat.Aci31814, "C35", 35, 25), mat.get_concrete(mat.Aci31814, "C35", 35, 25))
+        node1 = e.Node(0, 0, 0)
+        node2 = e.Node(1, 0, 1)
+        self.assertIs(e.BeamFiniteElement(0, node1, node2).section, e.BeamFiniteElement(1, node1, node2).section)
+
+    def test_sections_and_materials_are_immutable(self):
+        section = e.get_rectangular_section(1000, 250)
+        with self.assertRaises(AttributeError):
+            section.depth = 300
+        with self.assertRaises(AttributeError):
+            mat.get_concrete(mat.Aci31814, "C35", 35, 25).CompressionStrength = 45
+        self.assertIs(copy.deepcopy(section), section)
+        restored = pickle.loads(pickle.dumps(section))
+        self.assertEqual((restored.width, restored.depth, restored.Izz), (1000, 250, section.Izz))
+
+    def test_lightweight_concrete(self):
+        self.assertIs(mat.get_concrete(mat.Aci31814, "C35", 35, 25), mat.get_concrete(mat.Aci31814, "C35", 35, 25, 1.0))
+        lightweight = mat.get_concrete(mat.Aci31814, "LC35", 35, 18, 0.85)
+        self.assertEqual(lightweight.LightweightFactor, 0.85)
+        self.assertEqual(pickle.loads(pickle.dumps(lightweight)).LightweightFactor, 0.85)
+
+    def test_beam_element_slots_and_cached_ei(self):
+        node1 = e.Node(0, 0, 0)
+        node2 = e.Node(1, 0, 2)
+        element = e.BeamFiniteElement(0, node1, node2)
+        with self.assertRaises(AttributeError):
+            element.unknown = 1
+        concrete = mat.get_concrete(mat.Aci31814, "C35", 35, 25)
+        section = e.get_rectangular_section(1000, 250)
+        element.material = concrete
+        element.section = section
+        element.refresh()
+        self.assertAlmostEqual(element.EI, concrete.Modulus * 1e6 * section.Izz / 1000 ** 4)
+        self.assertAlmostEqual(element.stiffness_matrix[0, 0], 12 * element.EI / 8)
+
 
 if __name__ == '__main__':
     # run the tests
@@ -0,0 +1,89 @@
+import unittest
+import numpy as np
+import structural.elements as e
+import structural.influence as inf
+import structural.loads as ld
+import structural.matrices as m
+import structural.pressure as pr
+from helpers import get_test_model
+
+
+class TestStripPressure(unittest.TestCase):
+    def test_wide_strip(self):
+        # a surcharge over the whole surface pushes on a rigid wall with its own magnitude
+        pressures = pr.get_strip_surcharge_pressure(np.array([0.5, 1.0, 3.0]), 0.0, 1e9, 10.0)
+        np.testing.assert_allclose(pressures, 10.0, rtol=1e-6)
+
+    def test_distant_strip(self):
+        pressures = pr.get_strip_surcharge_pressure(np.linspace(0, 5, 11), 2.0, 1.0, 10.0)
+        self.assertEqual(pressures[0], 0)
+        self.assertTrue(np.all(pressures[1:] > 0))
+        self.assertLess(np.max(pr.get_strip_surcharge_pressure(np.linspace(0, 5, 11), 20.0, 1.0, 10.0)),
+                        0.1 * np.max(pressures))
+
+
+class TestInfluence(unittest.TestCase):
+    def setUp(self):
+        self.model = get_test_model()
+        self.mesh = self.model.build_mesh()
+        self.influence = inf.get_influence_analysis(self.model, self.mesh)
+
+    def solve(self, load, fixed_end_forces):
+        analysis = self.model.get_analysis(self.mesh)
+        return m.compute_element_results(analysis.solve(load), self.mesh, fixed_end_forces)
+
+    def test_strips(self):
+        offsets = np.linspace(0, 10, 101)
+        results = self.influence.get_strip_results(offsets, 2.0, 20.0)
+        self.assertEqual(results.nodal_moments.shape, (self.mesh.num_nodes, 101))
+        self.assertEqual(self.influence.analysis.num_factorizations, 1)
+        for k in (0, 17, 100):
+            pressures = self.influence.get_strip_pressures(offsets[k], 2.0, 20.0)[:, 0]
+            fixed_end_forces = ld.get_empty_fixed_end_forces(self.mesh)
+            load = ld.add_element_linear_loads(pressures[:-1], pressures[1:], self.mesh,
+                                               m.get_empty_load_matrix(self.mesh.num_nodes), True, fixed_end_forces)
+            expected = self.solve(load, fixed_end_forces)
+            np.testing.assert_allclose(results.nodal_moments[:, k], expected.nodal_moments, atol=1e-9)
+            np.testing.assert_allclose(results.deflection[:, k], expected.deflection, atol=1e-15)
+
+    def test_uniform_loads(self):
+        load = e.UniformLoad()
+        load.x, load.length, load.magnitude = 1.5, 3.0, 15.0
+        results = self.influence.get_uniform_load_results([load])
+        expected = self.influence.get_strip_results(1.5, 3.0, 15.0)
+        np.testing.assert_array_equal(results.nodal_shears, expected.nodal_shears)
+
+    def test_point_forces(self):
+        depths = np.linspace(0, self.mesh.y[-1], 57)
+        results = self.influence.get_point_results(depths, -50.0)
+        for k in (0, 20, 56):
+            fixed_end_forces = ld.get_empty_fixed_end_forces(self.mesh)
+            load = ld.add_point_load(-50.0, depths[k], self.mesh, m.get_empty_load_matrix(self.mesh.num_nodes), True,
+                                     fixed_end_forces)
+            expected = self.solve(load, fixed_end_forces)
+            np.testing.assert_allclose(results.nodal_moments[:, k], expected.nodal_moments, atol=1e-9)
+            np.testing.assert_allclose(results.nodal_shears[:, k], expected.nodal_shears, atol=1e-9)
+
+    def test_envelope(self):
+        depths = np.linspace(0, self.mesh.y[-1], 31)
+        results = self.influence.get_point_results(depths, -50.0)
+        envelope = self.influence.get_point_envelope(depths, -50.0)
+        np.testing.assert_array_equal(envelope.maxima["nodal_moments"], np.max(results.nodal_moments, axis=1))
+        np.testing.assert_array_equal(envelope.minima["deflection"], np.min(results.deflection, axis=1))
+        node = int(np.argmax(envelope.maxima["nodal_moments"]))
+        case = envelope.max_cases["nodal_moments"][node]
+        self.assertEqual(results.nodal_moments[node, case], envelope.maxima["nodal_moments"][node])
+
+    def test_nonlinear_model(self):
+        model = get_test_model()
+        model.cracked_sections = True
+        self.assertRaises(ValueError, inf.get_influence_analysis, model)
+        model = get_test_model()
+        model.dredge_level = 1.0
+        self.assertRaises(ValueError, inf.get_influence_analysis, model)
+        model.soil_springs = "linear"
+        self.assertIsNotNone(inf.get_influence_analysis(model).get_strip_results(1.0, 1.0, 10.0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import json
+import os
+import tempfile
+import unittest
+import structural.instrument as ins
+import structural.matrices as m
+from helpers import get_test_model
+
+
+class TestInstrument(unittest.TestCase):
+    def tearDown(self):
+        ins.disable()
+        ins.reset()
+
+    def test_disabled_records_nothing(self):
+        ins.reset()
+        get_test_model().analyse()
+        self.assertEqual(ins.get_statistics(), {})
+
+    def test_model_stages(self):
+        model = get_test_model()
+        with ins.Recording() as recording:
+            model.analyse()
+            model.analyse()
+        statistics = recording.get_statistics()
+        for name in ("mesh", "loads", "assembly", "boundary_conditions", "factorization", "solve", "post_processing",
+                     "structural.matrices.assemble_global_matrix", "structural.mesh.build_wall_mesh"):
+            self.assertEqual(statistics[name]["calls"], 2, name)
+            self.assertGreaterEqual(statistics[name]["time"], 0)
+        num_elements = model.build_mesh().num_elements
+        self.assertEqual(statistics["assembly"]["max_size"], num_elements)
+        self.assertEqual(statistics["structural.matrices.assemble_global_matrix"]["total_size"], 2 * num_elements)
+        self.assertFalse(ins.is_enabled())
+
+    def test_function_sizes_and_export(self):
+        ins.reset()
+        ins.enable()
+        m.get_empty_load_matrix(10)
+        m.set_point_force(1, 2, m.get_empty_load_matrix(10))
+        ins.disable()
+        m.get_empty_load_matrix(10)
+        statistics = ins.get_statistics()
+        self.assertEqual(statistics["structural.matrices.get_empty_load_matrix"]["calls"], 2)
+        self.assertEqual(statistics["structural.matrices.set_point_force"]["max_size"], 20)
+
+        path = os.path.join(tempfile.mkdtemp(), "statistics.json")
+        ins.export_json(path)
+        with open(path) as file:
+            self.assertEqual(json.load(file), statistics)
+        self.assertEqual(json.loads(ins.to_json()), statistics)
+
+
+if __name__ == '__main__':
+    # run the tests
+    unittest.main()
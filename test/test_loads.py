@@ -0,0 +1,116 @@
+import unittest
+import numpy as np
+import structural.constraints as c
+import structural.matrices as m
+import structural.mesh as msh
+import structural.loads as ld
+
+
+class TestLoads(unittest.TestCase):
+    def setUp(self):
+        self.mesh = msh.BeamMesh.from_points([0, 1.0, 2.5, 3.0])
+        self.EI = self.mesh.EI[0]
+
+    def solve(self, load, supports):
+        matrix = m.assemble_global_matrix(self.mesh, _storage="banded")
+        for node, condition in supports:
+            matrix, load = m.set_nodal_boundary_conditions(node, matrix, load, _condition=condition)
+        return m.solve_global_system(matrix, load)
+
+    def solve_symmetric(self, load, supports, mesh=None):
+        # restrained dofs eliminated symmetrically, so that the reactions follow from K u - f
+        mesh = self.mesh if mesh is None else mesh
+        constraints = c.Constraints(mesh.num_nodes)
+        for node, condition in supports:
+            constraints.add_support(node, condition)
+        return np.linalg.solve(*constraints.apply(m.assemble_global_matrix(mesh), load))
+
+    def test_consistent_udl_cantilever_tip_deflection(self):
+        load = ld.add_udl(-10, 0, 3.0, self.mesh, m.get_empty_load_matrix(4), _consistent=True)
+        result = self.solve(load, [(0, "fixed")])
+        self.assertAlmostEqual(result[-2] / (-10000 * 3.0 ** 4 / (8 * self.EI)), 1.0, places=9)
+
+    def test_cantilever_udl_moments_and_shears(self):
+        # q = 10 kN/m over a 3 m cantilever fixed at the top: M = q (L - x)^2 / 2, V = -q (L - x)
+        x = ld.get_node_positions(self.mesh)
+        midpoints = 0.5 * (x[:-1] + x[1:])
+        for consistent in (False, True):
+            fixed_end_forces = ld.get_empty_fixed_end_forces(self.mesh)
+            load = ld.add_udl(-10, 0, 3.0, self.mesh, m.get_empty_load_matrix(4), consistent, fixed_end_forces)
+            results = m.compute_element_results(self.solve(load, [(0, "fixed")]), self.mesh, fixed_end_forces)
+            np.testing.assert_allclose(results.nodal_moments, 10 * (3.0 - x) ** 2 / 2, atol=1e-9)
+            np.testing.assert_allclose(results.element_moments[:, 1], 10 * (3.0 - x[1:]) ** 2 / 2, atol=1e-9)
+            np.testing.assert_allclose(results.element_shears, -10 * (3.0 - midpoints), atol=1e-9)
+
+        # without its fixed-end forces, a consistent load is off by about q L^2 / 12 per element
+        load = ld.add_udl(-10, 0, 3.0, self.mesh, m.get_empty_load_matrix(4), _consistent=True)
+        results = m.compute_element_results(self.solve(load, [(0, "fixed")]), self.mesh)
+        self.assertGreater(abs(results.nodal_moments[0] - 45.0), 0.5)
+
+    def test_propped_cantilever_udl_moments_and_shears(self):
+        # fixed at the top, pinned at the bottom: M = q L^2 / 8 - 5 q L x / 8 + q x^2 / 2, V = -(5 q L / 8 - q x)
+        moment = lambda x: 10 * 3.0 ** 2 / 8 - 5 * 10 * 3.0 * x / 8 + 10 * x ** 2 / 2
+        shear = lambda x: -(5 * 10 * 3.0 / 8 - 10 * x)
+        supports = [(0, "fixed"), (3, "pinned")]
+        for mesh in (self.mesh, msh.BeamMesh.from_points([0, 1.0, 2.0, 3.0])):
+            x = ld.get_node_positions(mesh)
+            fixed_end_forces = ld.get_empty_fixed_end_forces(mesh)
+            load = ld.add_udl(-10, 0, 3.0, mesh, m.get_empty_load_matrix(4), True, fixed_end_forces)
+            displacements = self.solve_symmetric(load, supports, mesh)
+            results = m.compute_element_results(displacements, mesh, fixed_end_forces)
+            np.testing.assert_allclose(results.nodal_moments, moment(x), atol=1e-9)
+            np.testing.assert_allclose(results.element_shears, shear(0.5 * (x[:-1] + x[1:])), atol=1e-9)
+            # reactions: 5 q L / 8 at the fixed end and 3 q L / 8 at the prop
+            reactions = m.assemble_global_matrix(mesh) @ displacements - load
+            np.testing.assert_allclose(reactions[[0, 6]], [18750, 11250], rtol=1e-9)
+        # on equal elements nodal shears are exact as well
+        np.testing.assert_allclose(results.nodal_shears, shear(x), atol=1e-9)
+
+    def test_propped_cantilever_point_load_moments(self):
+        # P at a from the fixed end, b = L - a: M = P a b (L + b) / (2 L^2) at the fixed end
+        fixed_end_forces = ld.get_empty_fixed_end_forces(self.mesh)
+        load = ld.add_point_load(-20, 1.8, self.mesh, m.get_empty_load_matrix(4), True, fixed_end_forces)
+        displacements = self.solve_symmetric(load, [(0, "fixed"), (3, "pinned")])
+        results = m.compute_element_results(displacements, self.mesh, fixed_end_forces)
+        fixed = 20 * 1.8 * 1.2 * (3.0 + 1.2) / (2 * 3.0 ** 2)
+        reaction = 20 - 20 * 1.8 ** 2 * (3 * 3.0 - 1.8) / (2 * 3.0 ** 3)
+        x = ld.get_node_positions(self.mesh)
+        expected = fixed - reaction * x + 20 * np.clip(x - 1.8, 0, None)
+        np.testing.assert_allclose(results.nodal_moments, expected, atol=1e-9)
+
+    def test_partial_linear_load_resultant(self):
+        load = ld.add_linear_load(-4, -10, 0.4, 2.8, self.mesh, m.get_empty_load_matrix(4))
+        positions = ld.get_node_positions(self.mesh)
+        force = -7 * 2.4 * 1000
+        centroid = 0.4 + 2.4 * (-4 + 2 * -10) / (3 * (-4 + -10))
+        self.assertAlmostEqual(load[0::2].sum(), force, places=6)
+        # moment of forces about the top, plus the applied nodal moments
+        self.assertAlmostEqual((load[0::2] * positions).sum() + load[1::2].sum(), force * centroid, places=6)
+
+    def test_point_load_gives_exact_nodal_deflections(self):
+        load = ld.add_point_load(-20, 1.8, self.mesh, m.get_empty_load_matrix(4), _consistent=True)
+        result = self.solve(load, [(0, "pinned"), (3, "pinned")])
+        # simply supported span 3.0, load at a = 1.8, deflection at x = 1.0 (x < a)
+        span, a, x = 3.0, 1.8, 1.0
+        b = span - a
+        expected = -20000 * b * x * (span ** 2 - b ** 2 - x ** 2) / (6 * span * self.EI)
+        self.assertAlmostEqual(result[2] / expected, 1.0, places=9)
+
+    def test_nodal_profile_matches_linear_loads(self):
+        q = np.array([0.0, -5.0, -12.5, -15.0])
+        profile = ld.add_nodal_profile_load(q, self.mesh, m.get_empty_load_matrix(4))
+        linear = m.get_empty_load_matrix(4)
+        positions = ld.get_node_positions(self.mesh)
+        for i in range(0, 3):
+            linear = ld.add_linear_load(q[i], q[i + 1], positions[i], positions[i + 1], self.mesh, linear)
+        np.testing.assert_allclose(profile, linear, atol=1e-9)
+
+    def test_lumped_udl_wrapper_unchanged(self):
+        load = m.set_udl_between_nodes(-10, 0, 3, self.mesh.elements, m.get_empty_load_matrix(4))
+        np.testing.assert_allclose(load[0::2], [-5000, -12500, -10000, -2500])
+        np.testing.assert_allclose(load[1::2], 0)
+
+
+if __name__ == '__main__':
+    # run the tests
+    unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+import numpy as np
+import structural.matrices as m
+import structural.mesh as msh
+
+
+class TestMatrices(unittest.TestCase):
+    def solve_simply_supported_udl(self, udl, span=4.0, num_elements=40):
+        mesh = msh.BeamMesh.from_points(np.linspace(0, span, num_elements + 1))
+        matrix = m.assemble_global_matrix(mesh, _storage="banded")
+        load = m.get_empty_load_matrix(mesh.num_nodes)
+        load = m.set_udl_between_nodes(udl, 0, mesh.num_nodes - 1, mesh.elements, load)
+        matrix, load = m.set_nodal_boundary_conditions(0, matrix, load, _condition="pinned")
+        matrix, load = m.set_nodal_boundary_conditions(mesh.num_nodes - 1, matrix, load, _condition="pinned")
+        return mesh, m.solve_global_system(matrix, load)
+
+    def test_compute_element_results_simply_supported(self):
+        mesh, result = self.solve_simply_supported_udl(-10)
+        results = m.compute_element_results(result, mesh)
+        self.assertAlmostEqual(results.x[-1], 4.0)
+        self.assertAlmostEqual(results.nodal_moments[20], -10 * 4.0 ** 2 / 8, places=6)
+        self.assertAlmostEqual(results.nodal_shears[0], -20.0, places=6)
+        self.assertEqual(results.element_moments.shape, (40, 2))
+
+    def test_get_element_results_matches_arrays(self):
+        mesh, result = self.solve_simply_supported_udl(-10)
+        x, y, theta, element_moments, nodal_moments, nodal_shears = m.get_element_results(result, mesh.elements)
+        results = m.compute_element_results(result, mesh)
+        np.testing.assert_allclose(nodal_moments, np.round(results.nodal_moments, 3))
+        np.testing.assert_allclose(nodal_shears, np.round(results.nodal_shears, 3))
+        self.assertEqual(len(element_moments), 40)
+
+
+if __name__ == '__main__':
+    # run the tests
+    unittest.main()
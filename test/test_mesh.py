@@ -0,0 +1,79 @@
+import unittest
+import numpy as np
+import structural.elements as e
+import structural.matrices as m
+import structural.mesh as msh
+
+
+class TestMesh(unittest.TestCase):
+    def test_local_matrices_match_single_element(self):
+        lengths = np.array([0.1, 0.25, 1.3])
+        EI = np.array([1e6, 2.5e7, 3e8])
+        batched = m.assemble_local_matrices(lengths, EI)
+        for i in range(0, 3):
+            np.testing.assert_allclose(batched[i], m.assemble_local_matrix(lengths[i], EI[i]))
+
+    def test_mesh_assembly_matches_elements(self):
+        points = [0, 0.1, 0.3, 0.35, 0.8]
+        nodes = [e.Node(i, 0, point) for i, point in enumerate(points)]
+        elements = [e.BeamFiniteElement(i, nodes[i], nodes[i + 1]) for i in range(0, len(nodes) - 1)]
+        section = e.RectangularSection(1000, 250)
+        elements[2].section = section
+        mesh = msh.BeamMesh.from_points(points)
+        mesh.set_section(section, [2])
+        np.testing.assert_allclose(m.assemble_global_matrix(mesh), m.assemble_global_matrix(elements))
+
+    def test_element_view(self):
+        mesh = msh.BeamMesh.from_points([0, 0.5, 1.5])
+        section = e.RectangularSection(1000, 150)
+        element = mesh.elements[1]
+        element.section = section
+        self.assertIs(element.section, section)
+        self.assertAlmostEqual(element.length, 1.0)
+        self.assertEqual(element.node1.y, 0.5)
+        self.assertAlmostEqual(element.get_EI(), mesh.EI[1])
+        np.testing.assert_allclose(element.get_stiffness_matrix(), mesh.get_stiffness_matrices()[1])
+
+    def test_node_view_updates_lengths(self):
+        mesh = msh.BeamMesh.from_points([0, 0.5, 1.5])
+        mesh.nodes[1].y = 1.0
+        np.testing.assert_allclose(mesh.lengths, [1.0, 0.5])
+
+    def test_discrete_points(self):
+        points = m.get_discrete_points(0.1, [0, 0.5, 0.52, 1.2])
+        np.testing.assert_allclose(points[:7], [0, 0.1, 0.2, 0.3, 0.4, 0.5, 0.52])
+        self.assertEqual(points[-1], 1.2)
+        self.assertEqual(len(points), 14)
+        self.assertEqual(m.get_cumulative_discrete_lengths(0.1, [0, 0.5, 0.52, 1.2]), points.tolist())
+
+    def test_interval_index(self):
+        index = msh.IntervalIndex([0.5, 1.0, 3.0], [1.0, 2.0, 4.0])
+        np.testing.assert_array_equal(index.lookup([0.2, 0.5, 0.99, 1.0, 2.5, 3.5, 5.0]), [-1, 0, 0, 1, -1, 2, -1])
+
+    def test_build_wall_mesh(self):
+        geology = []
+        for i, (thickness, offset) in enumerate([(1.0, 0.5), (2.0, 0.0)]):
+            soil = e.Soil()
+            soil.layer_thickness = thickness
+            soil.top_offset = offset
+            soil.isTopLayer = i == 0
+            geology.append(soil)
+        segments = []
+        for i, (height, depth) in enumerate([(1.0, 150), (1.5, 250)]):
+            wall = e.Wall(i)
+            wall.height = height
+            wall.section = e.get_rectangular_section(1000, depth)
+            wall.material = e.get_concrete(e.Aci31814, "C35", 35, 25)
+            segments.append(wall)
+        mesh = msh.build_wall_mesh(geology, segments, 0.25)
+        self.assertEqual(mesh.y[-1], 3.5)
+        midpoints = mesh.get_midpoints()
+        np.testing.assert_array_equal(mesh.segment_index, np.where(midpoints < 1.0, 0, 1))
+        np.testing.assert_array_equal(mesh.layer_index, np.where(midpoints < 0.5, -1, np.where(midpoints < 1.5, 0, 1)))
+        self.assertIs(mesh.elements[0].section, segments[0].section)
+        self.assertIs(mesh.elements[-1].section, segments[1].section)
+
+
+if __name__ == '__main__':
+    # run the tests
+    unittest.main()
@@ -0,0 +1,98 @@
+import io
+import itertools
+import json
+import os
+import shutil
+import tempfile
+import unittest
+import structural.elements as e
+import structural.pipeline as pl
+import structural.schema as sch
+from helpers import get_test_model
+
+CSV = """model,kind,code,name,weight,phi,thickness,height,depth,fc,type,q1,q2,top,bottom,y,condition,max_element_length
+Wall A,model,ACI318-14,,,,,,,,,,,,,,,0.25
+Wall A,soil,,Sand,18,30,3.0,,,,,,,,,,,
+Wall A,segment,,Top,,,,1.0,250,35,,,,,,,,
+Wall A,segment,,Bottom,,,,2.0,250,35,,,,,,,,
+Wall A,load,,,,,,,,,linear,-10,-10,0,3.0,,,
+Wall A,support,,,,,,,,,,,,,,0,pinned,
+Wall A,support,,,,,,,,,,,,,,3.0,pinned,
+Wall B,soil,,Clay,19,25,3.0,,,,,,,,,,,
+Wall B,segment,,Stem,,,,3.0,300,40,,,,,,,,
+Wall B,load,,,,,,,,,earth_pressure,,,,,,,
+Wall B,support,,,,,,,,,,,,,,3.0,fixed,
+"""
+
+
+class TestPipeline(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, name, text):
+        path = os.path.join(self.directory, name)
+        with open(path, "w") as file:
+            file.write(text)
+        return path
+
+    def test_read_csv(self):
+        models = list(pl.read_models(self.write("walls.csv", CSV)))
+        self.assertEqual([model["name"] for model in models], ["Wall A", "Wall B"])
+        wall_a = sch.model_from_dict(models[0])
+        expected = get_test_model()
+        self.assertEqual(wall_a.max_element_length, 0.25)
+        self.assertEqual(wall_a.supports, expected.supports)
+        self.assertIs(wall_a.segments[1].section, e.get_rectangular_section(1000, 250))
+        self.assertAlmostEqual(wall_a.analyse().nodal_moments.min(), expected.analyse().nodal_moments.min())
+        wall_b = sch.model_from_dict(models[1])
+        self.assertEqual(wall_b.loads[0].state, "active")
+        self.assertEqual(wall_b.segments[0].material.CompressionStrength, 40)
+
+    def test_run_jsonl(self):
+        data = sch.model_to_dict(get_test_model())
+        lines = [json.dumps(data), "", json.dumps(dict(data, name="Broken", segments=[])), json.dumps(data)]
+        path = self.write("walls.jsonl", "\n".join(lines) + "\n")
+        output = io.StringIO()
+        self.assertEqual(pl.run_pipeline(path, output), (3, 1))
+        records = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual([record["index"] for record in records], [0, 1, 2])
+        self.assertIn("error", records[1])
+        self.assertEqual(records[0]["min_moment"], records[2]["min_moment"])
+        self.assertEqual(records[0]["file"], path)
+
+    def test_malformed_jsonl_line(self):
+        # a line that is not JSON fails its own record, and the models after it are still analysed
+        data = sch.model_to_dict(get_test_model())
+        path = self.write("walls.jsonl", "\n".join([json.dumps(data), "{not json", json.dumps(data)]) + "\n")
+        output = io.StringIO()
+        self.assertEqual(pl.run_pipeline(path, output), (3, 1))
+        records = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual([record["index"] for record in records], [0, 1, 2])
+        self.assertTrue(records[1]["error"].startswith("ValueError: line 2: "))
+        self.assertNotIn("error", records[2])
+        self.assertEqual(records[0]["min_moment"], records[2]["min_moment"])
+
+    def test_streaming(self):
+        # models are analysed as they are pulled, so an endless input is fine
+        data = sch.model_to_dict(get_test_model())
+        items = pl.analyse_models(itertools.repeat(data))
+        results = [item.record["min_moment"] for item in itertools.islice(items, 3)]
+        self.assertEqual(len(set(results)), 1)
+
+    def test_cracked_and_springs(self):
+        data = sch.model_to_dict(get_test_model())
+        for segment in data["segments"]:
+            segment["reinforcement_area"] = 1000.0
+        cracked = dict(data, cracked_sections=True)
+        springs = dict(data, dredge_level=1.0, supports=[])
+        for item, model in zip(pl.analyse_models([cracked, springs]), [cracked, springs]):
+            self.assertFalse(item.failed, item.record)
+            self.assertAlmostEqual(item.record["min_moment"], sch.model_from_dict(model).analyse().nodal_moments.min())
+
+
+if __name__ == '__main__':
+    # run the tests
+    unittest.main()
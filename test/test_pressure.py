@@ -0,0 +1,92 @@
+import unittest
+import numpy as np
+import structural.elements as e
+import structural.loads as ld
+import structural.matrices as m
+import structural.mesh as msh
+import structural.pressure as p
+from helpers import get_test_model
+
+
+def get_test_geology():
+    geology = []
+    for i, (thickness, weight, phi, cohesion) in enumerate([(2.0, 18.0, 30.0, 0.0), (3.0, 20.0, 20.0, 10.0)]):
+        soil = e.Soil("Layer {}".format(i), weight, phi)
+        soil.layer_thickness = thickness
+        soil.cohesion = cohesion
+        soil.isTopLayer = i == 0
+        soil.top_offset = 0.5 if i == 0 else 0.0
+        geology.append(soil)
+    return geology
+
+
+class TestEarthPressure(unittest.TestCase):
+    def test_coefficients_match_soil(self):
+        geology = get_test_geology()
+        profile = p.EarthPressureProfile(geology)
+        for i, soil in enumerate(geology):
+            self.assertAlmostEqual(profile.ka[i], soil.ka()[0], places=3)
+            self.assertAlmostEqual(profile.kp[i], soil.kp()[0], places=3)
+
+    def test_pressures(self):
+        profile = p.EarthPressureProfile(get_test_geology(), _surcharge=10)
+        ka = (1 - np.sin(np.radians(20))) / (1 + np.sin(np.radians(20)))
+        kp = 1 / ka
+        # above the soil, within the first layer, and 1 m into the second layer
+        depths = [0.25, 1.5, 3.5]
+        np.testing.assert_allclose(profile.get_vertical_stress(depths), [0, 28, 66])
+        np.testing.assert_allclose(profile.get_pressure(depths, "active"),
+                                   [0, 28 / 3, 66 * ka - 20 * np.sqrt(ka)])
+        np.testing.assert_allclose(profile.get_pressure(depths, "passive"),
+                                   [0, 28 * 3, 66 * kp + 20 * np.sqrt(kp)])
+        np.testing.assert_allclose(profile.get_pressure(depths, "at rest"),
+                                   [0, 14, 66 * (1 - np.sin(np.radians(20)))])
+
+    def test_active_pressure_is_not_negative(self):
+        geology = get_test_geology()
+        geology[1].cohesion = 100
+        profile = p.EarthPressureProfile(geology)
+        self.assertEqual(profile.get_pressure(3.0, "active"), 0.0)
+
+    def test_element_pressures_jump_at_layer_boundary(self):
+        geology = get_test_geology()
+        profile = p.EarthPressureProfile(geology)
+        mesh = msh.BeamMesh.from_points([0, 0.5, 1.5, 2.5, 3.5])
+        p1, p2 = profile.get_element_pressures(mesh, "at rest")
+        # node at 2.5 m ends an element of the first layer and starts one of the second
+        self.assertAlmostEqual(p2[2], 36 * 0.5)
+        self.assertAlmostEqual(p1[3], 36 * (1 - np.sin(np.radians(20))))
+
+    def test_load_resultant(self):
+        profile = p.EarthPressureProfile(get_test_geology())
+        mesh = msh.BeamMesh.from_points(m.get_discrete_points(0.1, [0, 0.5, 2.5, 5.5]))
+        load = p.add_earth_pressure_load(profile, mesh, m.get_empty_load_matrix(mesh.num_nodes), "at rest")
+        # first layer: triangle of 18 kPa over 2 m; second layer: trapezoid from 36 to 96 kPa, times k0
+        k0 = 1 - np.sin(np.radians(20))
+        self.assertAlmostEqual(load[::2].sum() / 1000, 18 + 3 * 66 * k0)
+
+    def test_element_linear_loads_match_nodal_profile(self):
+        mesh = msh.BeamMesh.from_points([0, 0.3, 1.0, 1.4])
+        q = np.array([0.0, 2.0, 5.0, 1.0])
+        expected = ld.add_nodal_profile_load(q, mesh, m.get_empty_load_matrix(4))
+        for i in range(0, 3):
+            expected_element = ld.add_linear_load(q[i], q[i + 1], mesh.y[i], mesh.y[i + 1], mesh,
+                                                  m.get_empty_load_matrix(4))
+            np.testing.assert_allclose(
+                ld.add_element_linear_loads(q[i:i + 1], q[i + 1:i + 2], msh.BeamMesh.from_points(mesh.y[i:i + 2]),
+                                            np.zeros(4)), expected_element[2 * i:2 * i + 4])
+        self.assertAlmostEqual(expected[::2].sum() / 1000, 0.3 + 0.7 * 3.5 + 0.4 * 3)
+
+    def test_model_earth_pressure_load(self):
+        model = get_test_model()
+        model.loads = [e.EarthPressureLoad("active", -1.0)]
+        mesh = model.build_mesh()
+        load = model.get_load_matrix(mesh)
+        # triangle of 54 kPa * ka = 18 kPa at 3 m, acting in the negative direction
+        self.assertAlmostEqual(load[::2].sum() / 1000, -0.5 * 3 * 18)
+        self.assertLess(model.analyse().nodal_moments.min(), 0)
+
+
+if __name__ == '__main__':
+    # run the tests
+    unittest.main()
@@ -0,0 +1,50 @@
+import json
+import unittest
+import numpy as np
+import structural.elements as e
+import structural.materials as mat
+import structural.schema as sch
+from helpers import get_test_model
+
+
+class TestSchema(unittest.TestCase):
+    def test_round_trip(self):
+        model = get_test_model()
+        model.geology[0].isTopLayer = True
+        model.geology[0].top_offset = 0.5
+        model.loads.append(e.EarthPressureLoad("at rest", -1.0))
+        force = e.PointForce()
+        force.fx, force.y = 5.0, 1.5
+        model.loads.append(force)
+        model.segments[1].reinforcement_area = 800.0
+        model.segments[1].material = mat.get_concrete(mat.Aci31814, "LC35", 35, 18, 0.85)
+        data = json.loads(json.dumps(sch.model_to_dict(model)))
+        self.assertNotIn("lightweight", data["segments"][0]["material"])
+        copy = sch.model_from_dict(data)
+        self.assertEqual(sch.model_to_dict(copy), data)
+        self.assertIs(copy.segments[0].section, e.get_rectangular_section(1000, 250))
+        self.assertIs(copy.segments[0].material.code, mat.Aci31814)
+        self.assertEqual(copy.segments[1].material.LightweightFactor, 0.85)
+        np.testing.assert_allclose(copy.analyse().nodal_moments, model.analyse().nodal_moments)
+
+    def test_defaults(self):
+        model = sch.model_from_dict({"code": "ACI318-19",
+                                     "geology": [{"thickness": 3.0}],
+                                     "segments": [{"height": 3.0, "section": {"depth": 300}}],
+                                     "loads": [{"q1": -10, "top": 0, "bottom": 3.0}],
+                                     "supports": [{"depth": 0}, {"depth": 3.0, "condition": "fixed"}]})
+        self.assertEqual(model.name, "Wall")
+        self.assertIs(model.segments[0].material.code, mat.Aci31819)
+        self.assertTrue(model.geology[0].isTopLayer)
+        self.assertEqual(model.loads[0].q2, -10)
+        self.assertEqual(model.supports, [(0, "pinned"), (3.0, "fixed")])
+        self.assertIsNone(model.dredge_level)
+
+    def test_errors(self):
+        self.assertRaises(ValueError, mat.get_code, "EC2")
+        self.assertRaises(ValueError, sch.load_from_dict, {"type": "snow"})
+
+
+if __name__ == '__main__':
+    # run the tests
+    unittest.main()
@@ -0,0 +1,112 @@
+import unittest
+import numpy as np
+import structural.elements as e
+import structural.matrices as m
+import structural.mesh as msh
+import structural.springs as sp
+from helpers import get_test_model
+
+
+def get_cantilever_model():
+    model = get_test_model()
+    model.geology[0].layer_thickness = 8.0
+    model.segments[1].height = 7.0
+    model.supports = []
+    model.loads = [e.EarthPressureLoad("active", -1.0)]
+    model.dredge_level = 4.0
+    model.max_element_length = 0.1
+    return model
+
+
+class TestSprings(unittest.TestCase):
+    def test_tributary_lengths(self):
+        mesh = msh.BeamMesh.from_points([0, 1.0, 2.0, 2.5, 3.0])
+        np.testing.assert_allclose(sp.get_tributary_lengths(mesh, 1.5), [0, 0.25, 0.5, 0.5, 0.25])
+
+    def test_uniform_load_on_linear_springs(self):
+        # a beam on uniform springs under a uniform load translates without bending
+        mesh = msh.BeamMesh.from_discrete_points(0.1, [0, 2.0])
+        stiffness = 1e6 * sp.get_tributary_lengths(mesh)
+        load = m.set_udl_between_nodes(-10, 0, mesh.num_nodes - 1, mesh, m.get_empty_load_matrix(mesh.num_nodes))
+        for storage in ("dense", "banded"):
+            analysis = sp.SpringAnalysis(mesh, [], sp.SoilSprings(stiffness), _storage=storage)
+            results = analysis.solve(load)
+            np.testing.assert_allclose(results[0::2], -0.01)
+            np.testing.assert_allclose(results[1::2], 0, atol=1e-9)
+
+    def test_nonlinear_springs(self):
+        model = get_cantilever_model()
+        mesh = model.build_mesh()
+        load = model.get_load_matrix(mesh)
+        springs = sp.get_soil_springs(model.geology, mesh, model.dredge_level)
+        results = {}
+        for storage in ("dense", "banded"):
+            analysis = sp.SpringAnalysis(mesh, [], springs, _storage=storage)
+            results[storage] = analysis.solve(load)
+            self.assertLess(analysis.num_iterations, 20)
+            self.assertEqual(analysis.num_factorizations, 1)
+        np.testing.assert_allclose(results["dense"], results["banded"], rtol=1e-6)
+
+        # soil reactions balance the earth pressure, and no spring exceeds its limits
+        reactions = springs.get_reactions(results["banded"][0::2])
+        self.assertAlmostEqual((reactions.sum() + load[0::2].sum()) / 1000, 0, places=3)
+        self.assertTrue(np.all(reactions[mesh.y < model.dredge_level] == 0))
+        self.assertTrue(np.any(springs.get_yielded(results["banded"][0::2])))
+
+        # started from its solution, Newton iteration stops at once
+        analysis = sp.SpringAnalysis(mesh, [], springs)
+        np.testing.assert_allclose(analysis.solve(load, results["banded"]), results["banded"])
+        self.assertEqual(analysis.num_iterations, 1)
+
+    def test_active_and_passive_limits(self):
+        # near failure, the cantilever rotates: the front soil yields at its passive pressure above
+        # the pivot, and the retained soil behind the toe at its passive less its active pressure
+        model = get_cantilever_model()
+        model.loads = [e.EarthPressureLoad("active", -1.03)]
+        mesh = model.build_mesh()
+        load = model.get_load_matrix(mesh)
+        springs = sp.get_soil_springs(model.geology, mesh, model.dredge_level)
+        displacements = sp.SpringAnalysis(mesh, [], springs).solve(load)[0::2]
+        reactions = springs.get_reactions(displacements)
+        yielded = springs.get_yielded(displacements) & (springs.stiffness > 0)
+
+        soil = model.geology[0]
+        ka, kp = soil.ka()[0], soil.kp()[0]
+        lengths = sp.get_tributary_lengths(mesh, model.dredge_level)
+        stress = soil.weight * mesh.y
+        back = yielded & (displacements > 0)
+        front = yielded & (displacements < 0)
+        self.assertTrue(back[-1])
+        self.assertGreater(np.sum(front), np.sum(back))
+        np.testing.assert_allclose(reactions[back], -1000 * (kp - ka) * stress[back] * lengths[back], rtol=1e-3)
+        np.testing.assert_allclose(reactions[front],
+                                   1000 * kp * (stress[front] - soil.weight * model.dredge_level) * lengths[front],
+                                   rtol=1e-3)
+        # equilibrium of the wall with the mobilised reactions
+        self.assertAlmostEqual((reactions.sum() + load[0::2].sum()) / 1000, 0, places=3)
+
+    def test_nonlinear_springs_within_limits_are_linear(self):
+        model = get_cantilever_model()
+        mesh = model.build_mesh()
+        load = model.get_load_matrix(mesh)
+        linear = sp.get_soil_springs(model.geology, mesh, model.dredge_level, _nonlinear=False)
+        limits = np.full(mesh.num_nodes, 1e12)
+        nonlinear = sp.SoilSprings(linear.stiffness, -limits, limits)
+        analysis = sp.SpringAnalysis(mesh, [], nonlinear)
+        np.testing.assert_allclose(analysis.solve(load), sp.SpringAnalysis(mesh, [], linear).solve(load))
+        self.assertEqual(analysis.num_iterations, 1)
+
+    def test_model_with_springs(self):
+        model = get_cantilever_model()
+        results = model.analyse()
+        self.assertTrue(np.any(np.isclose(model.build_mesh().y, model.dredge_level)))
+        # a cantilever: (nearly) no moment at the free top and toe
+        peak = np.abs(results.nodal_moments).max()
+        self.assertLess(abs(results.nodal_moments[0]), 1e-3 * peak)
+        self.assertLess(abs(results.nodal_moments[-1]), 1e-3 * peak)
+        self.assertLess(results.nodal_moments.min(), 0)
+
+
+if __name__ == '__main__':
+    # run the tests
+    unittest.main()
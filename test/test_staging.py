@@ -0,0 +1,113 @@
+import unittest
+import numpy as np
+import structural.elements as e
+import structural.springs as sp
+import structural.staging as stg
+from helpers import get_test_model
+
+
+def get_embedded_model():
+    model = get_test_model()
+    model.geology[0].layer_thickness = 8.0
+    model.segments[1].height = 7.0
+    model.supports = []
+    model.loads = [e.EarthPressureLoad("active", -1.0)]
+    model.max_element_length = 0.1
+    return model
+
+
+def get_stages():
+    prop = stg.Prop("Temporary prop", 0.5, 1e5)
+    return [stg.Stage("Excavate to 2 m", 2.0),
+            stg.Stage("Install prop", props=[prop]),
+            stg.Stage("Excavate to 4 m", 4.0, loads=[e.EarthPressureLoad("active", -1.2)]),
+            stg.Stage("Remove prop", props=[])]
+
+
+def solve_directly(model, mesh, level):
+    """Analyses the final state of a wall in one step, with linear soil springs below a level."""
+    springs = sp.get_soil_springs(model.geology, mesh, level, _nonlinear=False)
+    analysis = sp.SpringAnalysis(mesh, model.get_supports(mesh), springs, _storage=model.storage,
+                                 _constraints=model.get_constraints(mesh))
+    return analysis.solve(model.get_load_matrix(mesh))
+
+
+class TestStaging(unittest.TestCase):
+    def test_single_stage(self):
+        model = get_embedded_model()
+        staged = stg.StagedAnalysis(model, [stg.Stage("Excavate", 3.0)])
+        results = staged.run()
+        np.testing.assert_allclose(results[0].displacements, solve_directly(model, staged.mesh, 3.0),
+                                   rtol=1e-6, atol=1e-12)
+
+    def test_locked_in_prop(self):
+        for storage in ("dense", "banded"):
+            model = get_embedded_model()
+            model.storage = storage
+            staged = stg.StagedAnalysis(model, get_stages())
+            results = staged.run()
+            node = staged.get_prop_node(get_stages()[1].props[0])
+
+            # installing a prop locks in the displacements: no force and no movement
+            np.testing.assert_allclose(results[1].displacements, results[0].displacements)
+            self.assertEqual(results[1].prop_forces, {"Temporary prop": 0.0})
+
+            # excavating further loads the prop, which then holds the wall back
+            force = results[2].prop_forces["Temporary prop"]
+            self.assertGreater(force, 0)
+            moved = results[2].displacements[2 * node] - results[1].displacements[2 * node]
+            self.assertAlmostEqual(force, -1e5 * moved)
+
+            # removing the prop releases its force: the linear wall ends where a single step would take it
+            self.assertEqual(results[3].prop_forces, {})
+            model.loads = get_stages()[2].loads
+            np.testing.assert_allclose(results[3].displacements, solve_directly(model, staged.mesh, 4.0),
+                                       rtol=1e-6, atol=1e-12)
+
+    def test_model_props(self):
+        # props of the model are in place from the start and are not removed with the stage props
+        model = get_embedded_model()
+        model.props = [stg.Prop("Anchor", 1.25, 5e4)]
+        staged = stg.StagedAnalysis(model, get_stages())
+        results = staged.run()
+        self.assertEqual(set(results[3].prop_forces), {"Anchor"})
+        self.assertGreater(results[3].prop_forces["Anchor"], 0)
+        model.loads = get_stages()[2].loads
+        np.testing.assert_allclose(results[3].displacements, solve_directly(model, staged.mesh, 4.0),
+                                   rtol=1e-6, atol=1e-12)
+
+    def test_mesh_nodes(self):
+        staged = stg.StagedAnalysis(get_embedded_model(), get_stages())
+        mesh = staged.build_mesh()
+        for depth in (0.5, 2.0, 4.0):
+            self.assertAlmostEqual(np.min(np.abs(mesh.y - depth)), 0)
+
+    def test_factorization_reuse(self):
+        model = get_embedded_model()
+        props = [stg.Prop("Prop {}".format(i), 0.5 * i) for i in range(1, 4)]
+        stages = [stg.Stage("Excavate", 2.0)]
+        for i in range(1, 10):
+            stages.append(stg.Stage("Stage {}".format(i), props=props[:i % 4],
+                                    loads=[e.EarthPressureLoad("active", -1.0 - 0.1 * i)]))
+        staged = stg.StagedAnalysis(model, stages)
+        results = staged.run()
+        self.assertEqual(len(results), 10)
+        self.assertEqual(staged.analysis.num_factorizations, 1)
+        self.assertEqual(sorted(results[3].prop_forces), ["Prop 1", "Prop 2", "Prop 3"])
+        self.assertEqual(results[4].prop_forces, {})
+
+        # deep excavations refactorise instead
+        stages = [stg.Stage("Excavate to {} m".format(0.5 * i), 0.5 * i) for i in range(1, 11)]
+        staged = stg.StagedAnalysis(model, stages)
+        results = staged.run()
+        self.assertLess(staged.analysis.num_factorizations, 10)
+        np.testing.assert_allclose(results[-1].displacements, solve_directly(model, staged.mesh, 5.0),
+                                   rtol=1e-6, atol=1e-12)
+
+    def test_rising_excavation(self):
+        staged = stg.StagedAnalysis(get_embedded_model(), [stg.Stage("Down", 3.0), stg.Stage("Up", 2.0)])
+        self.assertRaises(ValueError, staged.run)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import structural.store as st
+from helpers import get_test_model
+
+
+class TestStore(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "store")
+        self.results = []
+        for i in range(0, 5):
+            model = get_test_model()
+            model.max_element_length = 0.1 + 0.05 * i  # walls of different node counts
+            model.loads[0].q1 = -10 - i
+            self.results.append(model.analyse())
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, results):
+        with st.ResultWriter(self.path, _chunk_size=2) as writer:
+            for i, result in enumerate(results):
+                self.assertEqual(writer.add(result, {"name": "Wall {}".format(i)}), i)
+
+    def test_round_trip(self):
+        self.write(self.results)
+        store = st.ResultStore(self.path)
+        self.assertEqual(len(store), 5)
+        self.assertEqual(len(store.manifest["chunks"]), 3)
+        for i, expected in enumerate(self.results):
+            stored = store.get_results(i)
+            for quantity in st.NODAL_QUANTITIES + st.ELEMENT_QUANTITIES:
+                np.testing.assert_array_equal(getattr(stored, quantity), getattr(expected, quantity))
+            self.assertEqual(store.get_metadata(i), {"name": "Wall {}".format(i)})
+        self.assertIsInstance(store.get(3, "nodal_moments"), np.memmap)
+        self.assertRaises(IndexError, store.get, 5, "x")
+
+    def test_quantity_across_walls(self):
+        self.write(self.results)
+        store = st.ResultStore(self.path)
+        np.testing.assert_array_equal(store.reduce_quantity("nodal_moments", np.minimum),
+                                      [result.nodal_moments.min() for result in self.results])
+        self.assertEqual([len(values) for values in store.iter_quantity("deflection")],
+                         [len(result.x) for result in self.results])
+
+    def test_append_after_interrupted_chunk(self):
+        self.write(self.results[:2])
+        # metadata of a chunk whose manifest was never written
+        with open(os.path.join(self.path, "metadata.jsonl"), "a") as file:
+            file.write('{"name": "lost"}\n')
+        with st.ResultWriter(self.path) as writer:
+            self.assertEqual(writer.add(self.results[2], {"name": "Wall 2"}), 2)
+        store = st.ResultStore(self.path)
+        self.assertEqual(len(store), 3)
+        self.assertEqual([item["name"] for item in store.get_metadata()], ["Wall 0", "Wall 1", "Wall 2"])
+
+    def test_single_case_only(self):
+        result = self.results[0]
+        results = type(result)(result.x, np.stack([result.deflection] * 2, axis=1), result.rotation,
+                               result.element_moments, result.nodal_moments, result.element_shears,
+                               result.nodal_shears)
+        writer = st.ResultWriter(self.path)
+        self.assertRaises(ValueError, writer.add, results)
+
+
+if __name__ == '__main__':
+    # run the tests
+    unittest.main()
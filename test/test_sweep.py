@@ -0,0 +1,103 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+import structural.elements as e
+import structural.sweep as sw
+from helpers import get_test_model
+
+
+class TestSweep(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.output = os.path.join(self.directory, "sweep.jsonl")
+        self.parameters = {"segments.*.section": [e.RectangularSection(1000, d) for d in [150, 250, 350]],
+                           "segments.1.height": [2.0, 2.5]}
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def read_records(self):
+        with open(self.output) as file:
+            return [json.loads(line) for line in file]
+
+    def test_apply_parameter(self):
+        model = sw.apply_parameter(get_test_model(), "segments.*.height", 1.5)
+        self.assertEqual([wall.height for wall in model.segments], [1.5, 1.5])
+        model = sw.apply_parameter(model, "geology.0.phi", 35)
+        self.assertEqual(model.geology[0].phi, 35)
+
+    def test_apply_parameter_to_sections_and_materials(self):
+        # immutable sections and materials are replaced by shared instances with the new value
+        model = sw.apply_parameter(get_test_model(), "segments.*.section.depth", 300)
+        self.assertEqual([wall.section.depth for wall in model.segments], [300, 300])
+        self.assertIs(model.segments[0].section, e.get_rectangular_section(1000, 300))
+        model = sw.apply_parameter(model, "segments.1.material.CompressionStrength", 45)
+        self.assertEqual([wall.material.CompressionStrength for wall in model.segments], [35, 45])
+        self.assertEqual(model.segments[1].material.Modulus, round(4700 * 45 ** 0.5))
+        model = sw.apply_parameter(model, "segments.*.material.LightweightFactor", 0.75)
+        self.assertEqual([wall.material.LightweightFactor for wall in model.segments], [0.75, 0.75])
+        self.assertRaises(AttributeError, sw.apply_parameter, model, "segments.0.section.Izz", 1e9)
+
+    def test_sweep_section_depth(self):
+        sweep = sw.DesignSweep(get_test_model(), {"segments.*.section.depth": [200, 300]}, self.output)
+        sweep.workers = 1
+        self.assertEqual(sweep.run(), 2)
+        records = sorted(self.read_records(), key=lambda record: record["case"])
+        self.assertNotIn("error", records[0])
+        self.assertLess(records[0]["min_deflection"], records[1]["min_deflection"])
+
+    def test_sweep_in_process(self):
+        sweep = sw.DesignSweep(get_test_model(), self.parameters, self.output)
+        sweep.workers = 1
+        sweep.chunk_size = 4
+        self.assertEqual(sweep.run(), 6)
+        records = self.read_records()
+        self.assertEqual(sorted(record["case"] for record in records), list(range(0, 6)))
+        self.assertEqual(records[0]["parameters"]["segments.*.section"], "REC_1000x150")
+        # thicker sections deflect less
+        by_case = {record["case"]: record for record in records}
+        self.assertLess(by_case[0]["min_deflection"], by_case[4]["min_deflection"])
+
+    def test_sweep_resumes(self):
+        sweep = sw.DesignSweep(get_test_model(), self.parameters, self.output)
+        sweep.workers = 1
+        sweep.chunk_size = 2
+        sweep.run()
+        # simulate an interruption: keep two records and a partly written third
+        with open(self.output) as file:
+            lines = file.readlines()
+        with open(self.output, "w") as file:
+            file.writelines(lines[:2])
+            file.write(lines[2][:10])
+        self.assertEqual(sweep.run(), 4)
+        self.assertEqual(sorted(record["case"] for record in self.read_records()), list(range(0, 6)))
+
+    def test_sweep_resumes_record_without_newline(self):
+        sweep = sw.DesignSweep(get_test_model(), self.parameters, self.output)
+        sweep.workers = 1
+        sweep.chunk_size = 2
+        sweep.run()
+        # a complete third record, interrupted before its newline, is analysed again
+        with open(self.output) as file:
+            lines = file.readlines()
+        with open(self.output, "w") as file:
+            file.writelines(lines[:2])
+            file.write(lines[2].rstrip("\n"))
+        self.assertEqual(sweep.get_completed_cases(), {json.loads(line)["case"] for line in lines[:2]})
+        self.assertEqual(sweep.run(), 4)
+        records = self.read_records()
+        self.assertEqual(sorted(record["case"] for record in records), list(range(0, 6)))
+
+    def test_sweep_process_pool(self):
+        sweep = sw.DesignSweep(get_test_model(), self.parameters, self.output)
+        sweep.workers = 2
+        sweep.chunk_size = 2
+        self.assertEqual(sweep.run(), 6)
+        self.assertEqual(len(self.read_records()), 6)
+
+
+if __name__ == '__main__':
+    # run the tests
+    unittest.main()